@@ -0,0 +1,90 @@
+"""
+Micro-benchmark do armazenamento: CSV de texto contra o armazenamento colunar tipado (Parquet por temporada).
+
+Uso:
+    python -m benchmarks.bench_armazenamento [--replicas 20] [--mesmas-temporadas] [--repeticoes 3]
+
+Os dados limpos de classificação e a matriz de features são replicados
+`--replicas` vezes, deslocando 'Ano' a cada réplica para simular mais
+temporadas; com `--mesmas-temporadas`, as réplicas ficam nas temporadas
+originais (como se outras categorias, F2 e F3, entrassem no histórico).
+Para cada formato são medidos o tamanho em disco, o tempo de leitura e a
+memória ocupada pelo DataFrame, lendo tudo, só uma temporada e (na matriz
+de features) só as colunas de momentum.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.armazenamento import colunar
+from src.modelos.features import CAMINHO_QUALI, gerar_matriz_features
+
+
+def replicar(df, replicas, mesmas_temporadas=False):
+    if mesmas_temporadas:
+        return pd.concat([df] * replicas, ignore_index=True)
+    anos = df['Ano'].max() - df['Ano'].min() + 1
+    return pd.concat([df.assign(Ano=df['Ano'] + i * anos) for i in range(replicas)], ignore_index=True)
+
+
+def tamanho_em_disco(caminho):
+    if os.path.isfile(caminho):
+        return os.path.getsize(caminho)
+    return sum(os.path.getsize(os.path.join(raiz, n)) for raiz, _, nomes in os.walk(caminho) for n in nomes)
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        df = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replicas', type=int, default=20)
+    parser.add_argument('--mesmas-temporadas', action='store_true')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    quali = replicar(pd.read_csv(CAMINHO_QUALI, dtype={'Ano': 'Int64'}).dropna(subset=['Ano']), args.replicas, args.mesmas_temporadas)
+    features = replicar(gerar_matriz_features(), args.replicas, args.mesmas_temporadas)
+    momentum = [c for c in features.columns if c.startswith('momentum_')]
+    ano = int(quali['Ano'].max())
+
+    with tempfile.TemporaryDirectory() as pasta:
+        csv_quali = os.path.join(pasta, 'classificacao.csv')
+        csv_features = os.path.join(pasta, 'features.csv')
+        quali.to_csv(csv_quali, index=False, encoding='utf-8-sig')
+        features.to_csv(csv_features, index=False, encoding='utf-8-sig')
+        colunar.gravar(quali, 'classificacao', diretorio=pasta)
+        colunar.gravar(features, 'features', diretorio=pasta)
+
+        casos = [
+            ('classificacao', 'tudo', lambda: pd.read_csv(csv_quali), lambda: colunar.ler('classificacao', diretorio=pasta)),
+            ('classificacao', f'só {ano}', lambda: (lambda df: df[df['Ano'] == ano])(pd.read_csv(csv_quali)),
+             lambda: colunar.ler('classificacao', anos=[ano], diretorio=pasta)),
+            ('features', 'tudo', lambda: pd.read_csv(csv_features), lambda: colunar.ler('features', diretorio=pasta)),
+            ('features', 'só momentum', lambda: pd.read_csv(csv_features, usecols=momentum),
+             lambda: colunar.ler('features', colunas=momentum, diretorio=pasta)),
+        ]
+
+        print(f"{len(quali)} linhas de classificação e {len(features)} de features, {quali['Ano'].nunique()} temporadas")
+        print(f"{'conjunto':<15}{'disco CSV':>11}{'disco Parquet':>15}")
+        for nome, csv in (('classificacao', csv_quali), ('features', csv_features)):
+            print(f"{nome:<15}{tamanho_em_disco(csv) / 2**20:>9.1f}MB{tamanho_em_disco(colunar.caminho_dataset(nome, pasta)) / 2**20:>13.1f}MB")
+
+        print(f"\n{'conjunto':<15}{'leitura':<14}{'CSV (ms)':>10}{'Parquet (ms)':>14}{'CSV (MB)':>10}{'Parquet (MB)':>14}")
+        for nome, leitura, ler_csv, ler_parquet in casos:
+            t_csv, m_csv = medir(ler_csv, args.repeticoes)
+            t_parquet, m_parquet = medir(ler_parquet, args.repeticoes)
+            print(f"{nome:<15}{leitura:<14}{1000 * t_csv:>10.1f}{1000 * t_parquet:>14.1f}{m_csv / 2**20:>10.1f}{m_parquet / 2**20:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
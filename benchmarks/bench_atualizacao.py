@@ -0,0 +1,89 @@
+"""
+Atualização incremental contra treino do zero a cada corrida, num replay da temporada corrida a corrida.
+
+Uso:
+    python -m benchmarks.bench_atualizacao [--ano 2024] [--arvores 5 10 20] [--max-arvores 100]
+                                           [--janela 4] [--limite-drift 1.3]
+
+Um modelo base é treinado com as temporadas anteriores a `--ano` e os
+hiperparâmetros da última busca. Depois, as corridas de `--ano` chegam uma a
+uma, na ordem do calendário ('race_id'), e cada estratégia prevê a corrida
+com o modelo que tem antes de incorporá-la:
+
+    congelado          O modelo base, sem atualização.
+    completo           `Atualizador` com teto de 0 árvores incrementais: treino do zero a cada corrida.
+    incremental-<n>    `Atualizador` com n árvores por corrida e a política de `--max-arvores`,
+                       `--janela` e `--limite-drift`.
+
+A tabela mostra o tempo de atualização por corrida (médio, mediano e máximo),
+os treinos do zero, as árvores do modelo ao fim e, sobre as previsões fora da
+amostra de toda a temporada, o MAE e as métricas de `metricas_por_corrida`.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from src.modelos.atualizacao import POLITICA_PADRAO, Atualizador
+from src.modelos.avaliacao import metricas_por_corrida, resumir
+from src.modelos.features import colunas_de_features, gerar_matriz_features, montar_x
+from src.modelos.modelo_momentum import carregar_melhores_parametros
+from src.modelos.previsao import ANO_TESTE, treinar_modelo
+
+
+def replay(atualizador, corridas, congelado=False):
+    """Prevê cada corrida com o modelo do momento e a incorpora; devolve as previsões e os resultados de `incorporar`."""
+    previsoes, resultados = [], []
+    for corrida in corridas:
+        df = atualizador.linhas(corrida)
+        previsoes.append(pd.Series(atualizador.prever(df), index=df.index))
+        if not congelado:
+            resultados.append(atualizador.incorporar(corrida))
+    return pd.concat(previsoes), resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ano', type=int, default=ANO_TESTE)
+    parser.add_argument('--arvores', type=int, nargs='+', default=[POLITICA_PADRAO['arvores_por_corrida']])
+    parser.add_argument('--max-arvores', type=int, default=POLITICA_PADRAO['max_arvores_incrementais'])
+    parser.add_argument('--janela', type=int, default=POLITICA_PADRAO['janela_drift'])
+    parser.add_argument('--limite-drift', type=float, default=POLITICA_PADRAO['limite_drift'])
+    args = parser.parse_args()
+
+    df = gerar_matriz_features()
+    if df is None:
+        return
+    features = colunas_de_features(df)
+    params = carregar_melhores_parametros(args.ano) or {}
+    print(f"Hiperparâmetros: {params}")
+    df_base = df[df['Ano'] < args.ano]
+    base = treinar_modelo(montar_x(df_base, features), df_base['Pos_Corrida'], params).get_booster()
+    corridas_base = df_base[['race_id', 'Ano', 'GP']].drop_duplicates('race_id').sort_values('race_id')
+    corridas_base = list(corridas_base[['Ano', 'GP']].itertuples(index=False, name=None))
+
+    estrategias = [('congelado', {'max_arvores_incrementais': 0}), ('completo', {'max_arvores_incrementais': 0})]
+    estrategias += [(f'incremental-{n}', {'arvores_por_corrida': n, 'max_arvores_incrementais': args.max_arvores,
+                                          'janela_drift': args.janela, 'limite_drift': args.limite_drift})
+                    for n in args.arvores]
+
+    df_ano = df[df['Ano'] == args.ano]
+    print(f"\n{args.ano}: {df_ano['race_id'].nunique()} corridas, modelo base com {base.num_boosted_rounds()} árvores")
+    print(f"{'estratégia':<17}{'médio (ms)':>11}{'p50 (ms)':>10}{'máx (ms)':>10}{'do zero':>9}{'árvores':>9}"
+          f"{'MAE':>7}{'vencedor':>10}{'pódio':>8}{'top 10':>8}{'Spearman':>10}")
+    for nome, politica in estrategias:
+        atualizador = Atualizador(base.copy(), features, params, df, corridas_base, politica=politica)
+        corridas = atualizador.corridas_novas()
+        previsto, resultados = replay(atualizador, corridas, congelado=nome == 'congelado')
+        real = df_ano['Pos_Corrida'].loc[previsto.index]
+        resumo = resumir(metricas_por_corrida(df_ano.loc[previsto.index, ['Ano', 'GP', 'Pos_Corrida']].assign(Posicao_Prevista=previsto)))
+        tempos = np.array([r['tempo_s'] for r in resultados] or [0.0]) * 1000
+        do_zero = sum(r['acao'] == 'completo' for r in resultados)
+        print(f"{nome:<17}{tempos.mean():>11.0f}{np.median(tempos):>10.0f}{tempos.max():>10.0f}{do_zero:>9}"
+              f"{atualizador.booster.num_boosted_rounds():>9}{np.abs(previsto - real).mean():>7.3f}"
+              f"{resumo['acuracia_vencedor']:>10.2%}{resumo['acuracia_podio']:>8.2%}{resumo['acuracia_top10']:>8.2%}"
+              f"{resumo['spearman']:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
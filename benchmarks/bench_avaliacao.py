@@ -0,0 +1,97 @@
+"""
+Micro-benchmark das métricas por corrida: o laço por GP que ficava em
+`previsao.py` contra `metricas_por_corrida`.
+
+Uso:
+    python -m benchmarks.bench_avaliacao [--corridas 200 2000 20000] [--pilotos 20] [--repeticoes 3] [--max-laco 2000]
+
+As corridas são sintéticas: cada uma tem `--pilotos` pilotos com posição real
+aleatória e previsão igual à posição real mais ruído. Além dos tempos, confere
+as acurácias contra o laço e, numa amostra de corridas, o Spearman, o Kendall
+e o NDCG@10 contra `scipy.stats` e `sklearn.metrics.ndcg_score`. O laço,
+quadrático no número de corridas, só roda até `--max-laco` corridas.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.modelos.avaliacao import metricas_por_corrida, resumir
+
+
+def corridas_sinteticas(n_corridas, n_pilotos, semente=0):
+    rng = np.random.default_rng(semente)
+    real = np.argsort(rng.random((n_corridas, n_pilotos)), axis=1) + 1
+    return pd.DataFrame({
+        'Ano': np.repeat(2000 + np.arange(n_corridas) // 25, n_pilotos),
+        'GP': np.repeat([f'GP_{i % 25}' for i in range(n_corridas)], n_pilotos),
+        'Piloto': np.tile([f'Piloto_{i}' for i in range(n_pilotos)], n_corridas),
+        'Pos_Corrida': real.ravel().astype(float),
+        'Posicao_Prevista': (real + rng.normal(0, 4, real.shape)).ravel(),
+    })
+
+
+def acuracias_em_laco(df_resultados):
+    """Caminho anterior: filtra, copia e ordena cada corrida (aqui por Ano e GP, para comparar com o vetorizado)."""
+    acertos_vencedor = acertos_podio = acertos_top10 = 0
+    corridas = df_resultados[['Ano', 'GP']].drop_duplicates().itertuples(index=False)
+    for ano, gp in corridas:
+        df_gp = df_resultados[(df_resultados['Ano'] == ano) & (df_resultados['GP'] == gp)].copy()
+        df_gp_real = df_gp.sort_values('Pos_Corrida')
+        df_gp_previsto = df_gp.sort_values('Posicao_Prevista')
+        acertos_vencedor += df_gp_real.iloc[0]['Piloto'] == df_gp_previsto.iloc[0]['Piloto']
+        acertos_podio += len(set(df_gp_real.head(3)['Piloto']) & set(df_gp_previsto.head(3)['Piloto']))
+        acertos_top10 += len(set(df_gp_real.head(10)['Piloto']) & set(df_gp_previsto.head(10)['Piloto']))
+    return {'acertos_vencedor': acertos_vencedor, 'acertos_podio': acertos_podio, 'acertos_top10': acertos_top10}
+
+
+def conferir_ordenacao(df, metricas, amostra=50):
+    from scipy.stats import kendalltau, spearmanr
+    from sklearn.metrics import ndcg_score
+
+    maior_erro = 0.0
+    for (ano, gp), df_gp in list(df.groupby(['Ano', 'GP'], sort=False))[:amostra]:
+        real, previsto = df_gp['Pos_Corrida'].to_numpy(), df_gp['Posicao_Prevista'].to_numpy()
+        posicao_real = np.argsort(np.argsort(real, kind='stable'), kind='stable')
+        relevancia = np.maximum(10 - posicao_real, 0)
+        esperado = [spearmanr(real, previsto)[0], kendalltau(real, previsto)[0], ndcg_score([relevancia], [-previsto], k=10)]
+        obtido = metricas.loc[(ano, gp), ['spearman', 'kendall', 'ndcg10']].to_numpy(dtype=float)
+        maior_erro = max(maior_erro, np.abs(obtido - esperado).max())
+    return maior_erro
+
+
+def medir(funcao, df, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corridas', type=int, nargs='+', default=[200, 2000, 20000])
+    parser.add_argument('--pilotos', type=int, default=20)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--max-laco', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'corridas':>9}{'laço (s)':>11}{'vetorizado (s)':>16}{'aceleração':>12}{'acurácias iguais':>18}{'erro máx. ordenação':>21}")
+    for n_corridas in args.corridas:
+        df = corridas_sinteticas(n_corridas, args.pilotos)
+        metricas = metricas_por_corrida(df)
+        resumo = resumir(metricas)
+        erro = conferir_ordenacao(df, metricas)
+        t_vetorizado = medir(lambda d: resumir(metricas_por_corrida(d)), df, args.repeticoes)
+        if n_corridas > args.max_laco:
+            print(f"{n_corridas:>9}{'-':>11}{t_vetorizado:>16.4f}{'-':>12}{'-':>18}{erro:>21.1e}")
+            continue
+        iguais = all(resumo[chave] == valor for chave, valor in acuracias_em_laco(df).items())
+        t_laco = medir(acuracias_em_laco, df, args.repeticoes)
+        print(f"{n_corridas:>9}{t_laco:>11.3f}{t_vetorizado:>16.4f}{t_laco / t_vetorizado:>11.0f}x{str(iguais):>18}{erro:>21.1e}")
+
+
+if __name__ == '__main__':
+    main()
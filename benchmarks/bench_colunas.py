@@ -0,0 +1,65 @@
+"""
+Micro-benchmark da unificação de colunas sinônimas dos CSVs brutos:
+`df.T.groupby(level=0).first().T` contra `unificar_colunas`.
+
+Uso:
+    python -m benchmarks.bench_colunas [--replicas 100] [--repeticoes 3]
+
+Cada CSV bruto em dados/brutos é replicado `--replicas` vezes antes da medição;
+a leitura do arquivo fica fora do tempo medido.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.limpeza import limpeza_corrida, limpeza_quali
+from src.limpeza.colunas import get_clean_column_name, mapa_de_renomeacao, unificar_colunas
+
+
+def unificar_transpondo(df, colunas_desejadas):
+    """Caminho anterior: renomeia, transpõe, agrupa pelo nome e transpõe de volta."""
+    df = df.copy()
+    df.columns = [get_clean_column_name(c) for c in df.columns]
+    df.rename(columns=mapa_de_renomeacao(), inplace=True)
+    df = df.T.groupby(level=0).first().T
+    for col in colunas_desejadas:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df[colunas_desejadas]
+
+
+def medir(funcao, df, colunas, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df, colunas)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replicas', type=int, default=100)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    arquivos = {
+        'corrida': (limpeza_corrida.ARQUIVO_BRUTO, limpeza_corrida.COLUNAS_DESEJADAS),
+        'classificacao': (limpeza_quali.ARQUIVO_BRUTO, limpeza_quali.COLUNAS_DESEJADAS),
+    }
+
+    print(f"{'arquivo':<15}{'linhas':>10}{'colunas':>9}{'transposição (s)':>18}{'vetorizado (s)':>16}{'aceleração':>12}{'idênticos':>11}")
+    for nome, (caminho, colunas) in arquivos.items():
+        bruto = pd.read_csv(caminho, header=0, dtype=str)
+        df = pd.concat([bruto] * args.replicas, ignore_index=True)
+        identicos = unificar_colunas(df, colunas).equals(unificar_transpondo(df, colunas))
+        t_transposicao = medir(unificar_transpondo, df, colunas, args.repeticoes)
+        t_vetorizado = medir(unificar_colunas, df, colunas, args.repeticoes)
+        print(f"{nome:<15}{len(df):>10}{df.shape[1]:>9}{t_transposicao:>18.2f}{t_vetorizado:>16.3f}"
+              f"{t_transposicao / t_vetorizado:>11.1f}x{str(identicos):>11}")
+
+
+if __name__ == '__main__':
+    main()
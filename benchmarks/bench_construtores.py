@@ -0,0 +1,150 @@
+"""
+Codificação dos construtores: dummies densos contra a coluna categórica nativa (e um CSR esparso), por escala.
+
+Uso:
+    python -m benchmarks.bench_construtores [--escalas 1 10] [--codificacoes categorica dummies esparsa]
+                                            [--repeticoes 3] [--saida resultados.json]
+
+Para cada escala, `dados_sinteticos` gera os CSVs limpos e a matriz de
+features é montada uma vez (fora da medição). Cada codificação roda num
+processo novo, que mede:
+
+    montagem   Entrada do treino a partir da matriz (`montar_x`; no 'esparsa', um CSR
+               com as features numéricas e um one-hot por nome de construtor).
+    treino     `treinar_modelo` em todas as temporadas menos a última
+               (100 árvores, profundidade 3).
+
+'esparsa' não é uma codificação do pipeline: é o one-hot dos dummies guardado
+como CSR, em que só os uns ocupam memória (as features numéricas entram com
+todos os valores, inclusive os zeros, para não virarem ausentes no XGBoost).
+A tabela mostra as colunas de construtor, o tamanho da entrada do treino, o
+menor tempo das repetições, o pico de memória do processo durante o treino
+(VmHWM, zerado antes dele) e o MAE na última temporada.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import dados_sinteticos
+from src.instrumentacao import memoria_pico_mb, zerar_pico
+
+CODIFICACOES = ['categorica', 'dummies', 'esparsa']
+PARAMS_TREINO = {'n_estimators': 100, 'max_depth': 3, 'learning_rate': 0.1}
+
+
+def _matriz(pasta, caminhos):
+    """Matriz de features da escala, calculada uma vez e guardada na pasta para as codificações seguintes."""
+    from src.modelos.features import gerar_matriz_features
+
+    arquivo = os.path.join(pasta, 'matriz.pkl')
+    if not os.path.exists(arquivo):
+        gerar_matriz_features(caminho_quali=caminhos['quali_limpo'], caminho_corrida=caminhos['corrida_limpo'],
+                              usar_cache=False).to_pickle(arquivo)
+    return pd.read_pickle(arquivo)
+
+
+def _esparsa(df, features):
+    """CSR com as features numéricas (todos os valores guardados) seguidas do one-hot dos construtores."""
+    import scipy.sparse as sp
+
+    from src.modelos import construtores
+
+    numericas = [f for f in features if not construtores.e_coluna_de_construtor(f)]
+    nomes = pd.Index([f[len(construtores.PREFIXO_CONSTRUTOR):] for f in features if f.startswith(construtores.PREFIXO_CONSTRUTOR)])
+    valores = df[numericas].to_numpy(dtype=np.float32, na_value=np.nan)
+    n, k = valores.shape
+    denso = sp.csr_matrix((valores.ravel(), np.tile(np.arange(k), n), np.arange(0, n * k + 1, k)), shape=(n, k))
+    indices = nomes.get_indexer(df[construtores.COLUNA_CONSTRUTOR].astype(str))
+    linhas = np.flatnonzero(indices >= 0)
+    one_hot = sp.csr_matrix((np.ones(len(linhas), dtype=np.float32), (linhas, indices[linhas])), shape=(n, len(nomes)))
+    return sp.hstack([denso, one_hot], format='csr')
+
+
+def _tamanho_mb(X):
+    if hasattr(X, 'memory_usage'):
+        return X.memory_usage(deep=True).sum() / 2 ** 20
+    return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 2 ** 20
+
+
+def _medir(codificacao, pasta, caminhos, repeticoes):
+    """Mede uma codificação no processo atual (um processo novo por codificação)."""
+    from src.modelos import construtores, registro
+    from src.modelos.features import colunas_de_features, montar_x
+    from src.modelos.previsao import treinar_modelo
+
+    df = _matriz(pasta, caminhos)
+    features = colunas_de_features(df, 'dummies' if codificacao == 'esparsa' else codificacao)
+    ultima = df['Ano'].max()
+    df_treino, df_teste = df[df['Ano'] < ultima], df[df['Ano'] == ultima]
+    montar = (lambda d: _esparsa(d, features)) if codificacao == 'esparsa' else (lambda d: montar_x(d, features))
+
+    tempos_montagem, tempos_treino = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        X = montar(df_treino)
+        tempos_montagem.append(time.perf_counter() - inicio)
+    zerar_pico()
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo = treinar_modelo(X, df_treino['Pos_Corrida'], PARAMS_TREINO)
+        tempos_treino.append(time.perf_counter() - inicio)
+    pico = memoria_pico_mb()
+
+    booster = modelo.get_booster()
+    if codificacao == 'esparsa':
+        previsto = booster.inplace_predict(montar(df_teste), validate_features=False)
+    else:
+        previsto = registro.prever(booster, df_teste, features, vocabulario_equipes=construtores.vocabulario(df, features))
+    return {
+        'codificacao': codificacao,
+        'linhas_treino': len(df_treino),
+        'colunas_construtor': sum(construtores.e_coluna_de_construtor(f) for f in features),
+        'entrada_mb': _tamanho_mb(X),
+        'montagem_s': min(tempos_montagem),
+        'treino_s': min(tempos_treino),
+        'tempos_treino_s': tempos_treino,
+        'memoria_pico_mb': pico,
+        'mae': float(np.abs(previsto - df_teste['Pos_Corrida'].to_numpy(dtype=float)).mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--codificacoes', nargs='+', choices=CODIFICACOES, default=CODIFICACOES)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='JSON onde gravar os resultados')
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'escala':>7}  {'codificação':<12}{'colunas':>9}{'entrada (MB)':>14}{'montagem (s)':>14}"
+          f"{'treino (s)':>12}{'pico (MB)':>11}{'MAE':>8}")
+    contexto = multiprocessing.get_context('spawn')
+    for escala in args.escalas:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminhos = dados_sinteticos.gravar(os.path.join(pasta, 'dados'), escala, args.semente)
+            _matriz(pasta, caminhos)
+            for codificacao in args.codificacoes:
+                with contexto.Pool(1, maxtasksperchild=1) as pool:
+                    linha = {'escala': escala, **pool.apply(_medir, (codificacao, pasta, caminhos, args.repeticoes))}
+                resultados.append(linha)
+                pico = linha['memoria_pico_mb'] if linha['memoria_pico_mb'] is not None else float('nan')
+                print(f"{escala:>7}  {codificacao:<12}{linha['colunas_construtor']:>9}{linha['entrada_mb']:>14.1f}"
+                      f"{linha['montagem_s']:>14.3f}{linha['treino_s']:>12.2f}{pico:>11.0f}{linha['mae']:>8.3f}")
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({'benchmark': 'construtores', 'parametros': vars(args), 'params_treino': PARAMS_TREINO,
+                       'resultados': resultados}, f, ensure_ascii=False, indent=1)
+        print(f"\nResultados salvos em: {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark da extração de tabelas: BeautifulSoup + pd.read_html contra lxml direto.
+
+Uso:
+    python -m benchmarks.bench_extracao [--paginas DIR] [--n 20] [--repeticoes 5]
+
+Sem `--paginas`, usa as páginas salvas no cache (dados/cache/paginas) e, se ele
+estiver vazio, páginas sintéticas geradas a partir de dados/limpos.
+"""
+import argparse
+import glob
+import os
+import time
+from io import StringIO
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from benchmarks.paginas_sinteticas import gerar_paginas
+from src.scrapers.cache import DIRETORIO_CACHE
+from src.scrapers.extracao import CLASSIFICADORES, TIPOS_TABELA, extrair_tabelas
+
+
+def extrair_tabelas_bs4(html, tipos=TIPOS_TABELA):
+    """Caminho anterior: html.parser do BeautifulSoup e novo parse da tabela serializada com pd.read_html."""
+    encontradas = {tipo: None for tipo in tipos}
+    soup = BeautifulSoup(html, 'html.parser')
+    for tabela in soup.find_all('table', class_='wikitable'):
+        pendentes = [tipo for tipo, df in encontradas.items() if df is None]
+        if not pendentes:
+            break
+        for sup in tabela.find_all('sup'):
+            sup.decompose()
+        cabecalhos = [th.get_text(strip=True) for th in tabela.find_all('th')]
+        for tipo in pendentes:
+            if CLASSIFICADORES[tipo](cabecalhos):
+                encontradas[tipo] = pd.read_html(StringIO(str(tabela)))[0]
+                break
+    return encontradas
+
+
+def carregar_paginas(diretorio, n):
+    arquivos = sorted(glob.glob(os.path.join(diretorio, '**', '*.html'), recursive=True))[:n]
+    paginas = []
+    for arquivo in arquivos:
+        with open(arquivo, encoding='utf-8') as f:
+            paginas.append(f.read())
+    return paginas
+
+
+def medir(funcao, paginas, repeticoes):
+    melhores = []
+    for html in paginas:
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao(html)
+            tempos.append(time.perf_counter() - inicio)
+        melhores.append(min(tempos))
+    return melhores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paginas', default=DIRETORIO_CACHE, help='Pasta com páginas .html salvas')
+    parser.add_argument('--n', type=int, default=20, help='Número máximo de páginas')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    paginas = carregar_paginas(args.paginas, args.n)
+    origem = args.paginas
+    if not paginas:
+        paginas = gerar_paginas(args.n)
+        origem = 'páginas sintéticas'
+    print(f"{len(paginas)} páginas ({origem}), tamanho médio {sum(map(len, paginas)) / len(paginas) / 1024:.0f} KiB")
+
+    divergencias = 0
+    for html in paginas:
+        antes, depois = extrair_tabelas_bs4(html), extrair_tabelas(html)
+        for tipo in TIPOS_TABELA:
+            if (antes[tipo] is None) != (depois[tipo] is None):
+                divergencias += 1
+            elif antes[tipo] is not None and not antes[tipo].equals(depois[tipo]):
+                divergencias += 1
+    print(f"Tabelas divergentes entre os dois caminhos: {divergencias}")
+
+    t_antes = medir(extrair_tabelas_bs4, paginas, args.repeticoes)
+    t_depois = medir(extrair_tabelas, paginas, args.repeticoes)
+    media_antes = 1000 * sum(t_antes) / len(t_antes)
+    media_depois = 1000 * sum(t_depois) / len(t_depois)
+    print(f"{'caminho':<28}{'ms/página':>12}")
+    print(f"{'bs4 + pd.read_html':<28}{media_antes:>12.2f}")
+    print(f"{'lxml direto':<28}{media_depois:>12.2f}")
+    print(f"Aceleração: {media_antes / media_depois:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark de cada etapa do pipeline sobre dados sintéticos em escala crescente, com resultados em JSON.
+
+Uso:
+    python -m benchmarks.bench_pipeline [--escalas 1 10 100] [--etapas limpeza features treino previsao avaliacao]
+                                        [--repeticoes 3] [--saida resultados.json] [--comparar anterior.json]
+
+Para cada escala, `dados_sinteticos` gera os CSVs brutos e limpos numa pasta
+temporária (escala 1 tem o tamanho dos dados reais de 2014–2024). Cada etapa
+roda num processo novo, que primeiro prepara as entradas (fora da medição) e
+depois a executa `--repeticoes` vezes:
+
+    limpeza     limpar_quali + limpar_corrida dos CSVs brutos (só a saída CSV).
+    features    carregar_e_unir_dados + preparar_dados_final dos CSVs limpos, sem cache.
+    treino      treinar_modelo em todas as temporadas menos a última (100 árvores, profundidade 3).
+    previsao    registro.prever sobre a matriz de features inteira.
+    avaliacao   metricas_por_corrida + resumir sobre essas previsões.
+
+O tempo registrado é o menor das repetições (todas ficam no JSON). A memória
+é a residente antes da etapa, já com as entradas carregadas, e o pico durante
+a etapa (o VmHWM de /proc, zerado antes dela); a diferença é o que a etapa
+acrescentou. O JSON (por padrão benchmarks/resultados/pipeline-<commit>.json)
+guarda também o commit, as versões das bibliotecas e os parâmetros, e
+`--comparar` mostra a razão de tempo e memória contra um JSON anterior.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import dados_sinteticos
+from src.instrumentacao import memoria_mb, memoria_pico_mb, zerar_pico
+
+ETAPAS = ['limpeza', 'features', 'treino', 'previsao', 'avaliacao']
+PARAMS_TREINO = {'n_estimators': 100, 'max_depth': 3, 'learning_rate': 0.1}
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), 'resultados')
+
+
+def _matriz(pasta, caminhos):
+    """Matriz de features da escala, calculada uma vez e guardada na pasta para as etapas seguintes."""
+    from src.modelos.features import gerar_matriz_features
+
+    arquivo = os.path.join(pasta, 'matriz.pkl')
+    if not os.path.exists(arquivo):
+        gerar_matriz_features(caminho_quali=caminhos['quali_limpo'], caminho_corrida=caminhos['corrida_limpo'],
+                              usar_cache=False).to_pickle(arquivo)
+    return pd.read_pickle(arquivo)
+
+
+def _modelo(pasta, df):
+    import xgboost as xgb
+    from src.modelos.features import colunas_de_features, montar_x
+    from src.modelos.previsao import treinar_modelo
+
+    arquivo = os.path.join(pasta, 'modelo.ubj')
+    if not os.path.exists(arquivo):
+        df_treino = df[df['Ano'] < df['Ano'].max()]
+        treinar_modelo(montar_x(df_treino, colunas_de_features(df)), df_treino['Pos_Corrida'], PARAMS_TREINO).save_model(arquivo)
+    return xgb.Booster(model_file=arquivo)
+
+
+def _preparar(etapa, pasta, caminhos):
+    """Devolve (função da etapa, linhas de entrada, função que conta as linhas de saída)."""
+    from src.modelos import registro
+    from src.modelos.avaliacao import metricas_por_corrida, resumir
+    from src.modelos.features import carregar_e_unir_dados, colunas_de_features, montar_x, preparar_dados_final
+    from src.modelos.previsao import treinar_modelo
+
+    if etapa == 'limpeza':
+        from src.limpeza.limpeza_corrida import limpar_corrida
+        from src.limpeza.limpeza_quali import limpar_quali
+
+        def limpeza():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return (limpar_quali(caminhos['quali_bruto'], os.path.join(pasta, 'quali.csv'), formatos=('csv',)),
+                        limpar_corrida(caminhos['corrida_bruto'], os.path.join(pasta, 'corrida.csv'), formatos=('csv',)))
+        entrada = sum(len(pd.read_csv(caminhos[n], usecols=[0])) for n in ('quali_bruto', 'corrida_bruto'))
+        return limpeza, entrada, lambda saida: sum(len(df) for df in saida)
+
+    if etapa == 'features':
+        def features():
+            return preparar_dados_final(carregar_e_unir_dados(caminhos['quali_limpo'], caminhos['corrida_limpo']))
+        entrada = sum(len(pd.read_csv(caminhos[n], usecols=[0])) for n in ('quali_limpo', 'corrida_limpo'))
+        return features, entrada, len
+
+    df = _matriz(pasta, caminhos)
+    features = colunas_de_features(df)
+    if etapa == 'treino':
+        df_treino = df[df['Ano'] < df['Ano'].max()]
+        X, y = montar_x(df_treino, features), df_treino['Pos_Corrida']
+        return (lambda: treinar_modelo(X, y, PARAMS_TREINO)), len(X), lambda modelo: modelo.get_booster().num_boosted_rounds()
+
+    booster = _modelo(pasta, df)
+    if etapa == 'previsao':
+        return (lambda: registro.prever(booster, df, features)), len(df), len
+    if etapa == 'avaliacao':
+        df_resultados = df[['Ano', 'GP', 'Pos_Corrida']].assign(Posicao_Prevista=registro.prever(booster, df, features))
+        return (lambda: resumir(metricas_por_corrida(df_resultados))), len(df_resultados), lambda resumo: resumo['corridas']
+    raise ValueError(f"Etapa desconhecida: {etapa!r}.")
+
+
+def _medir_etapa(etapa, pasta, caminhos, repeticoes):
+    """Roda uma etapa no processo atual (um processo novo por etapa) e devolve as medidas."""
+    funcao, linhas_entrada, contar_saida = _preparar(etapa, pasta, caminhos)
+    memoria_antes = memoria_mb('VmRSS')
+    zerar_pico()
+    tempos, tempos_cpu = [], []
+    for _ in range(repeticoes):
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        saida = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        tempos_cpu.append(time.process_time() - inicio_cpu)
+    return {
+        'etapa': etapa,
+        'linhas_entrada': int(linhas_entrada),
+        'linhas_saida': int(contar_saida(saida)),
+        'tempo_s': min(tempos),
+        'tempos_s': tempos,
+        'cpu_s': min(tempos_cpu),
+        # Sem /proc, fica o pico do processo inteiro, que inclui o do pai.
+        'memoria_pico_mb': memoria_pico_mb(),
+        'memoria_antes_mb': memoria_antes,
+    }
+
+
+def _commit():
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=raiz, capture_output=True, text=True, check=True).stdout.strip()
+        sujo = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=raiz, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-modificado' if sujo else '')
+
+
+def _ambiente():
+    import xgboost as xgb
+    return {'python': platform.python_version(), 'plataforma': platform.platform(), 'nucleos': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'xgboost': xgb.__version__}
+
+
+def comparar(resultados, anteriores):
+    """Mostra, para cada escala e etapa presentes nos dois JSONs, a razão novo/anterior de tempo e de memória."""
+    antes = {(r['escala'], r['etapa']): r for r in anteriores['resultados']}
+    print(f"\nComparação com {anteriores.get('commit') or 'o JSON anterior'} (razão novo / anterior):")
+    print(f"{'escala':>7}  {'etapa':<10}{'tempo':>8}{'memória':>9}")
+    for r in resultados['resultados']:
+        a = antes.get((r['escala'], r['etapa']))
+        if a is None:
+            continue
+        memoria = (r['memoria_pico_mb'] / a['memoria_pico_mb']) if r['memoria_pico_mb'] and a['memoria_pico_mb'] else float('nan')
+        print(f"{r['escala']:>7}  {r['etapa']:<10}{r['tempo_s'] / a['tempo_s']:>8.2f}{memoria:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=ETAPAS)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='JSON de saída (padrão: benchmarks/resultados/pipeline-<commit>.json)')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar')
+    args = parser.parse_args()
+
+    commit = _commit()
+    resultados = {
+        'benchmark': 'pipeline',
+        'commit': commit,
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ambiente': _ambiente(),
+        'parametros': {'escalas': args.escalas, 'etapas': args.etapas, 'repeticoes': args.repeticoes,
+                       'semente': args.semente, 'params_treino': PARAMS_TREINO},
+        'resultados': [],
+    }
+
+    print(f"{'escala':>7}  {'etapa':<10}{'entrada':>10}{'saída':>10}{'tempo (s)':>11}{'CPU (s)':>9}{'pico (MB)':>11}{'+etapa (MB)':>12}")
+    contexto = multiprocessing.get_context('spawn')
+    for escala in args.escalas:
+        with tempfile.TemporaryDirectory() as pasta:
+            inicio = time.perf_counter()
+            caminhos = dados_sinteticos.gravar(os.path.join(pasta, 'dados'), escala, args.semente)
+            print(f"{escala:>7}  (dados gerados em {time.perf_counter() - inicio:.1f}s)")
+            for etapa in args.etapas:
+                with contexto.Pool(1, maxtasksperchild=1) as pool:
+                    linha = pool.apply(_medir_etapa, (etapa, pasta, caminhos, args.repeticoes))
+                linha = {'escala': escala, **linha}
+                resultados['resultados'].append(linha)
+                pico = linha['memoria_pico_mb'] if linha['memoria_pico_mb'] is not None else float('nan')
+                acrescimo = pico - linha['memoria_antes_mb'] if linha['memoria_antes_mb'] is not None else float('nan')
+                print(f"{escala:>7}  {etapa:<10}{linha['linhas_entrada']:>10}{linha['linhas_saida']:>10}"
+                      f"{linha['tempo_s']:>11.3f}{linha['cpu_s']:>9.3f}{pico:>11.0f}{acrescimo:>12.0f}")
+
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"pipeline-{commit or 'sem-git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=1)
+    print(f"\nResultados salvos em: {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Regressão da posição contra ranking por corrida: tempo de treino e acurácia por número de árvores.
+
+Uso:
+    python -m benchmarks.bench_ranking [--anos 2022 2023 2024] [--rodadas 10 25 50 100 150 300]
+                                       [--objetivos reg:squarederror rank:pairwise rank:ndcg]
+
+Para cada temporada de `--anos`, cada objetivo é treinado com todas as
+temporadas anteriores e os hiperparâmetros da última busca (sem o número de
+árvores, que vai até a maior de `--rodadas`). A avaliação na temporada usa
+`metricas_por_corrida`, a mesma do `evaluate`, com o modelo truncado em cada
+número de árvores de `--rodadas`; a tabela mostra as médias ponderadas pelo
+número de corridas. Ao fim, para cada objetivo, o menor número de árvores com
+a acurácia de pódio do regressor completo.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.modelos import registro
+from src.modelos.avaliacao import metricas_por_corrida, resumir
+from src.modelos.features import colunas_de_features, gerar_matriz_features, montar_x
+from src.modelos.modelo_momentum import carregar_melhores_parametros
+from src.modelos.previsao import ANO_TESTE, OBJETIVOS, treinar_modelo
+
+
+def avaliar_por_rodadas(booster, df_teste, features, rodadas):
+    X = registro.matriz_de_entrada(df_teste, features)
+    grupos = df_teste.groupby(['Ano', 'GP'], sort=False).ngroup().to_numpy()
+    linhas = []
+    for n in rodadas:
+        previsto = booster.inplace_predict(X, iteration_range=(0, n), validate_features=False)
+        if registro.e_ranking(registro.objetivo(booster)):
+            previsto = registro.posicoes_dos_escores(previsto, grupos)
+        resumo = resumir(metricas_por_corrida(df_teste[['Ano', 'GP', 'Pos_Corrida']].assign(Posicao_Prevista=previsto)))
+        linhas.append({'rodadas': n, **{c: resumo[c] for c in ('corridas', 'acuracia_vencedor', 'acuracia_podio',
+                                                                 'acuracia_top10', 'spearman', 'ndcg10')}})
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--anos', type=int, nargs='+', default=[2022, 2023, 2024])
+    parser.add_argument('--rodadas', type=int, nargs='+', default=[10, 25, 50, 100, 150, 300])
+    parser.add_argument('--objetivos', nargs='+', choices=OBJETIVOS, default=list(OBJETIVOS))
+    args = parser.parse_args()
+
+    df = gerar_matriz_features()
+    if df is None:
+        return
+    features = colunas_de_features(df)
+    rodadas = sorted(args.rodadas)
+    params = {k: v for k, v in (carregar_melhores_parametros(ANO_TESTE) or {}).items() if k != 'n_estimators'}
+    params['n_estimators'] = rodadas[-1]
+    print(f"Hiperparâmetros: {params}")
+
+    linhas, tempos = [], {}
+    for objetivo in args.objetivos:
+        for ano in args.anos:
+            df_treino, df_teste = df[df['Ano'] < ano], df[df['Ano'] == ano]
+            X = montar_x(df_treino, features)
+            inicio = time.perf_counter()
+            modelo = treinar_modelo(X, df_treino['Pos_Corrida'], params, objetivo=objetivo, grupos=df_treino['race_id'])
+            tempos[objetivo] = tempos.get(objetivo, 0.0) + time.perf_counter() - inicio
+            for linha in avaliar_por_rodadas(modelo.get_booster(), df_teste, features, rodadas):
+                linhas.append({'objetivo': objetivo, 'ano': ano, **linha})
+
+    resultados = pd.DataFrame(linhas)
+    metricas = ['acuracia_vencedor', 'acuracia_podio', 'acuracia_top10', 'spearman', 'ndcg10']
+    media = resultados.groupby(['objetivo', 'rodadas'], sort=False).apply(
+        lambda g: pd.Series({m: np.average(g[m], weights=g['corridas']) for m in metricas}), include_groups=False)
+
+    print(f"\nTemporadas {', '.join(map(str, args.anos))}: {int(resultados.groupby('ano')['corridas'].first().sum())} corridas")
+    print(f"{'objetivo':<18}{'árvores':>8}{'vencedor':>10}{'pódio':>8}{'top 10':>8}{'Spearman':>10}{'NDCG@10':>9}")
+    for (objetivo, n), linha in media.iterrows():
+        print(f"{objetivo:<18}{n:>8}{linha['acuracia_vencedor']:>10.2%}{linha['acuracia_podio']:>8.2%}"
+              f"{linha['acuracia_top10']:>8.2%}{linha['spearman']:>10.4f}{linha['ndcg10']:>9.4f}")
+
+    print(f"\n{'objetivo':<18}{'treino (s)':>11}{'árvores p/ pódio do regressor':>32}")
+    alvo = media.loc[(OBJETIVOS[0], rodadas[-1]), 'acuracia_podio'] if OBJETIVOS[0] in args.objetivos else None
+    for objetivo in args.objetivos:
+        if alvo is None:
+            suficientes = '-'
+        else:
+            atingem = media.loc[objetivo]['acuracia_podio'] >= alvo - 1e-12
+            suficientes = str(atingem.idxmax()) if atingem.any() else f'> {rodadas[-1]}'
+        print(f"{objetivo:<18}{tempos[objetivo]:>11.2f}{suficientes:>32}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Teste de carga do serviço de previsão: latência (p50/p99) e vazão, com e sem lotes.
+
+Uso:
+    python -m benchmarks.bench_servico [--pedidos 2000] [--clientes 1 8 32] [--max-lote 1 64] [--sem-http]
+
+Cada pedido é a classificação de um GP de 2024 (lida do banco de consultas)
+com o grid embaralhado, como um cenário "e se". Os clientes são threads que
+mandam pedidos em sequência pela mesma conexão HTTP (ou, com `--sem-http`,
+chamam `ServicoPrevisao.prever` direto). `--max-lote 1` desliga os lotes:
+cada pedido vira uma chamada ao modelo. Requer um modelo treinado.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+
+import numpy as np
+
+from src.armazenamento.consultas import abrir_banco
+from src.modelos.servico import ServicoPrevisao, servir
+
+
+def cenarios(n, semente=0):
+    rng = np.random.default_rng(semente)
+    with abrir_banco() as banco:
+        classificacoes = [banco.classificacao_do_gp(2024, gp)[['Piloto', 'Construtor', 'Pos', 'Q1', 'Q2', 'Q3', 'Grid']]
+                          for gp in banco.corridas(2024)['GP']]
+    pedidos = []
+    for i in range(n):
+        df = classificacoes[i % len(classificacoes)].copy()
+        df['Grid'] = rng.permutation(len(df)) + 1
+        pedidos.append(df)
+    return pedidos
+
+
+def rodar_clientes(pedidos, n_clientes, enviar):
+    latencias = np.empty(len(pedidos))
+
+    def cliente(indices, conexao):
+        for i in indices:
+            inicio = time.perf_counter()
+            enviar(pedidos[i], conexao)
+            latencias[i] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente, args=(range(k, len(pedidos), n_clientes), {})) for k in range(n_clientes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencias, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pedidos', type=int, default=2000)
+    parser.add_argument('--clientes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--max-lote', type=int, nargs='+', default=[1, 64])
+    parser.add_argument('--sem-http', action='store_true')
+    args = parser.parse_args()
+
+    servico = ServicoPrevisao.carregar()
+    if servico is None:
+        return
+    pedidos = cenarios(args.pedidos)
+    corpos = [json.dumps({'classificacao': p.to_dict(orient='records')}).encode('utf-8') for p in pedidos]
+    por_id = {id(p): corpo for p, corpo in zip(pedidos, corpos)}
+
+    servidor = None
+    if not args.sem_http:
+        servidor = servir(servico, porta=0)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        porta = servidor.server_address[1]
+
+    def enviar_http(pedido, estado):
+        if 'conexao' not in estado:
+            estado['conexao'] = http.client.HTTPConnection('127.0.0.1', porta)
+        estado['conexao'].request('POST', '/prever', por_id[id(pedido)], {'Content-Type': 'application/json'})
+        resposta = estado['conexao'].getresponse()
+        resposta.read()
+        if resposta.status != 200:
+            raise RuntimeError(f'HTTP {resposta.status}')
+
+    def enviar_direto(pedido, _):
+        servico.prever(pedido)
+
+    enviar = enviar_direto if args.sem_http else enviar_http
+    print(f"{args.pedidos} pedidos de {len(pedidos[0])} pilotos, {'direto' if args.sem_http else 'HTTP'}")
+    print(f"{'max_lote':>9}{'clientes':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'pedidos/s':>11}")
+    for max_lote in args.max_lote:
+        servico.max_lote = max_lote
+        servico.iniciar()
+        rodar_clientes(pedidos[:50], 1, enviar)  # aquecimento
+        for n_clientes in args.clientes:
+            latencias, total = rodar_clientes(pedidos, n_clientes, enviar)
+            p50, p99 = np.percentile(latencias * 1000, [50, 99])
+            print(f"{max_lote:>9}{n_clientes:>10}{p50:>10.2f}{p99:>10.2f}{len(pedidos) / total:>11.0f}")
+        servico.parar()
+    if servidor is not None:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark da conversão de tempos: `Series.apply(tempo_para_segundos)` contra `tempos_para_segundos`.
+
+Uso:
+    python -m benchmarks.bench_tempos [--linhas 100000] [--repeticoes 5]
+
+Mede duas colunas sintéticas: uma no formato de Q1/Q2/Q3 e outra no formato
+de 'Tempo/Retirado', ambas com valores ausentes e textos inválidos, e as
+colunas de tempo dos dados limpos, se existirem.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.modelos.features import caminhos_limpos, ler_limpo
+from src.modelos.tempos import tempo_para_segundos, tempos_para_segundos
+
+INVALIDOS_QUALI = ['—', 'Sem tempo', 'Tempo dos 107%: 1:36.000', 'Referência(s):', 'DSQ']
+INVALIDOS_CORRIDA = ['+1 volta', '+2 voltas', 'Motor', 'Acidente', 'Desclassificado', 'Colisão']
+
+
+def coluna_quali(linhas, rng):
+    minutos = rng.integers(1, 2, linhas)
+    segundos = rng.integers(0, 60, linhas)
+    milesimos = rng.integers(0, 1000, linhas)
+    tempos = pd.Series([f'{m}:{s:02d}.{ms:03d}' for m, s, ms in zip(minutos, segundos, milesimos)], dtype=object)
+    sorteio = rng.random(linhas)
+    tempos[sorteio < 0.15] = np.nan
+    invalidos = (sorteio >= 0.15) & (sorteio < 0.20)
+    tempos[invalidos] = rng.choice(INVALIDOS_QUALI, invalidos.sum())
+    return tempos
+
+
+def coluna_corrida(linhas, rng):
+    gaps = pd.Series([f'+{s}.{ms:03d}' for s, ms in zip(rng.integers(0, 90, linhas), rng.integers(0, 1000, linhas))], dtype=object)
+    sorteio = rng.random(linhas)
+    vencedores = sorteio < 0.05
+    gaps[vencedores] = [f'1:{m:02d}:{s:02d}.{ms:03d}' for m, s, ms in
+                        zip(rng.integers(20, 60, vencedores.sum()), rng.integers(0, 60, vencedores.sum()), rng.integers(0, 1000, vencedores.sum()))]
+    invalidos = sorteio >= 0.70
+    gaps[invalidos] = rng.choice(INVALIDOS_CORRIDA, invalidos.sum())
+    return gaps
+
+
+def medir(funcao, coluna, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(coluna)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    colunas = {'Q1/Q2/Q3': coluna_quali(args.linhas, rng), 'Tempo/Retirado': coluna_corrida(args.linhas, rng)}
+    caminho_quali, caminho_corrida = caminhos_limpos()
+    try:
+        quali, corrida = ler_limpo(caminho_quali), ler_limpo(caminho_corrida)
+    except FileNotFoundError:
+        quali = corrida = None
+    if quali is not None and quali['Q1'].dtype == object:
+        colunas.update({f'{coluna} (limpo)': quali[coluna] for coluna in ('Q1', 'Q2', 'Q3')})
+    if corrida is not None:
+        colunas['Tempo/Retirado (limpo)'] = corrida['Tempo/Retirado']
+
+    print(f"{'coluna':<24}{'linhas':>8}{'únicos':>8}{'apply (ms)':>12}{'por valor único (ms)':>22}{'aceleração':>12}{'idênticos':>12}")
+    for nome, coluna in colunas.items():
+        esperado = coluna.apply(tempo_para_segundos)
+        identicos = tempos_para_segundos(coluna).equals(esperado)
+        t_apply = medir(lambda c: c.apply(tempo_para_segundos), coluna, args.repeticoes)
+        t_unicos = medir(tempos_para_segundos, coluna, args.repeticoes)
+        print(f"{nome:<24}{len(coluna):>8}{coluna.nunique():>8}{1000 * t_apply:>12.1f}{1000 * t_unicos:>22.1f}"
+              f"{t_apply / t_unicos:>11.1f}x{str(identicos):>12}")
+
+
+if __name__ == '__main__':
+    main()
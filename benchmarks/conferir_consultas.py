@@ -0,0 +1,75 @@
+"""
+Conferência do banco de consultas com corridas que ainda não estão nele.
+
+Uso:
+    python -m benchmarks.conferir_consultas
+
+Monta, numa pasta temporária, um banco com os dados limpos menos a etapa do
+meio de cada temporada e busca o histórico de todos os pilotos antes de cada
+etapa retirada (o caso da próxima corrida do calendário em
+`EstadoMomentum.do_banco` e no `query --ano --gp`). O histórico tem de trazer
+exatamente as corridas do piloto nas temporadas anteriores e nas etapas
+anteriores da mesma temporada. Antes de um GP fora do calendário, tem de
+trazer a temporada inteira.
+"""
+import os
+import tempfile
+
+import pandas as pd
+
+from src.armazenamento.consultas import abrir_banco, construir_banco
+from src.modelos.features import caminhos_limpos, ler_limpo
+from src.scrapers import calendario
+
+FORA_DO_CALENDARIO = 'Grande_Prêmio_Fora_do_Calendário'
+
+
+def banco_sem(corridas, pasta):
+    """Monta, em `pasta`, um banco com os dados limpos menos as corridas (Ano, GP) informadas."""
+    caminhos = []
+    for caminho, nome in zip(caminhos_limpos(), ('classificacao.csv', 'corrida.csv')):
+        df = ler_limpo(caminho)
+        caminhos.append(os.path.join(pasta, nome))
+        df[~pd.MultiIndex.from_frame(df[['Ano', 'GP']]).isin(corridas)].to_csv(caminhos[-1], index=False)
+    construir_banco(*caminhos, os.path.join(pasta, 'f1.sqlite'))
+    return abrir_banco(os.path.join(pasta, 'f1.sqlite'), *caminhos)
+
+
+def anterior(corrida, ano, gp):
+    """Se a corrida (Ano, GP) vem antes de (ano, gp); um `gp` fora do calendário fica no fim da temporada."""
+    etapa = calendario.rodada(gp, ano)
+    return corrida[0] < ano or (corrida[0] == ano and (etapa is None or calendario.rodada(corrida[1], ano) < etapa))
+
+
+def main():
+    with abrir_banco() as banco:
+        corridas = list(banco.corridas()[['Ano', 'GP']].itertuples(index=False, name=None))
+        pilotos = banco.consultar('SELECT DISTINCT Piloto FROM resultados ORDER BY Piloto')['Piloto']
+        historicos = {piloto: list(banco.historico_do_piloto(piloto)[['Ano', 'GP']].itertuples(index=False, name=None))
+                      for piloto in pilotos}
+
+    retiradas = []
+    for ano in sorted({ano for ano, _ in corridas}):
+        etapas = [gp for gp in calendario.CALENDARIO.get(ano, []) if (ano, gp) in corridas]
+        retiradas.append((ano, etapas[len(etapas) // 2]))
+    casos = retiradas + [(ano, FORA_DO_CALENDARIO) for ano, _ in retiradas]
+
+    errados = []
+    with tempfile.TemporaryDirectory() as pasta, banco_sem(retiradas, pasta) as parcial:
+        for piloto, historico in historicos.items():
+            for ano, gp in casos:
+                esperado = [c for c in historico if c not in retiradas and anterior(c, ano, gp)]
+                obtido = list(parcial.historico_do_piloto(piloto, antes_de=(ano, gp))[['Ano', 'GP']].itertuples(index=False, name=None))
+                if obtido != esperado:
+                    errados.append((piloto, ano, gp, len(esperado), len(obtido)))
+
+    print(f"{len(retiradas)} etapas retiradas ({', '.join(f'{ano} {gp}' for ano, gp in retiradas[-2:])}, ...), "
+          f"{len(casos)} corridas fora do banco, {len(pilotos)} pilotos")
+    for piloto, ano, gp, n_esperado, n_obtido in errados[:10]:
+        print(f"  {piloto} antes de {ano} {gp}: {n_obtido} corridas, esperadas {n_esperado}")
+    print(f"Históricos diferentes do esperado: {len(errados)}")
+    return 1 if errados else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
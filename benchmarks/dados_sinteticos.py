@@ -0,0 +1,428 @@
+"""
+Gerador de dados sintéticos de classificação e corrida, nos formatos bruto e limpo, em qualquer escala.
+
+Uso:
+    python -m benchmarks.dados_sinteticos PASTA [--escala 10] [--pilotos 20] [--corridas 22] [--semente 0]
+
+Cada escala acrescenta um bloco de `temporadas` temporadas (11 por padrão,
+como 2014–2024), de modo que `--escala 100` tem 100 vezes as linhas dos
+dados reais. O histórico tem a forma do real: equipes com força que muda de
+uma temporada para outra e às vezes trocam de nome ou de motor, pilotos que
+entram e saem do grid, eliminação no Q2 e no Q3, punições de grid e largadas
+do pit lane, abandonos com o motivo no lugar do tempo, retardatários com
+'+1 volta' e pontos só para os dez primeiros.
+
+As tabelas limpas saem no formato de dados/limpos, inclusive com as linhas
+de rodapé ('Fonte:', 'Tempo dos 107%', 'Volta mais rápida') que a limpeza
+mantém. As brutas usam, corrida a corrida, as variantes de cabeçalho dos
+CSVs reais (em português e em inglês, com cabeçalhos de dois níveis em
+formato de tupla e colunas vazias como 'Unnamed: 8'), além de números de
+carro faltando e cabeçalhos repetidos no meio da tabela; limpar as brutas
+com `limpar_quali`/`limpar_corrida` reproduz as limpas.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+PONTOS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1])
+MOTIVOS = ['Colisão', 'Acidente', 'Motor', 'Freios', 'Suspensão', 'Câmbio', 'Hidráulica', 'Unidade de potência', 'Rodou']
+EQUIPES = ['Aurora', 'Boreal', 'Cometa', 'Delta', 'Estrela', 'Falcão', 'Galáxia', 'Horizonte', 'Íris', 'Jaguar',
+           'Lince', 'Meteoro', 'Nebulosa', 'Órbita', 'Pulsar', 'Quasar', 'Relâmpago', 'Sirius', 'Tufão', 'Vórtice']
+MOTORES = ['Mercedes', 'Ferrari', 'Renault', 'Honda']
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gustavo', 'Helena', 'Igor', 'Júlia', 'Kevin', 'Lara',
+         'Marcos', 'Nina', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Tiago', 'Vera']
+SOBRENOMES = ['Almeida', 'Barros', 'Campos', 'Duarte', 'Esteves', 'Freitas', 'Gomes', 'Homem', 'Lacerda', 'Moreira',
+              'Nogueira', 'Oliveira', 'Pacheco', 'Queiroz', 'Rezende', 'Sampaio', 'Teixeira', 'Valente', 'Xavier', 'Zanetti']
+CIRCUITOS = ['da_Austrália', 'do_Barém', 'da_China', 'do_Japão', 'de_Miami', 'da_Emília-Romanha', 'de_Mônaco',
+             'do_Canadá', 'da_Espanha', 'da_Áustria', 'da_Grã-Bretanha', 'da_Hungria', 'da_Bélgica', 'dos_Países_Baixos',
+             'da_Itália', 'do_Azerbaijão', 'de_Singapura', 'dos_Estados_Unidos', 'da_Cidade_do_México', 'de_São_Paulo',
+             'de_Las_Vegas', 'do_Catar', 'de_Abu_Dhabi', 'da_Arábia_Saudita']
+
+COLUNAS_QUALI = ['Ano', 'GP', 'Pos', 'No', 'Piloto', 'Construtor', 'Q1', 'Q2', 'Q3', 'Grid']
+COLUNAS_CORRIDA = ['Ano', 'GP', 'Pos', 'No', 'Piloto', 'Construtor', 'Voltas', 'Tempo/Retirado', 'Pontos', 'Grid']
+
+
+def _tupla(*nomes):
+    return str(tuple(nomes))
+
+
+# Cabeçalhos dos CSVs brutos reais: (peso, coluna limpa -> cabeçalho bruto, colunas extras sempre vazias).
+VARIANTES_QUALI = [
+    (0.40, {'Pos': 'Pos.', 'No': 'Nº', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Q1': 'Q1', 'Q2': 'Q2', 'Q3': 'Q3',
+            'Grid': 'Grid', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.20, {'Pos': 'Pos.', 'No': 'Nº', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Q1': 'Q1', 'Q2': 'Q2', 'Q3': 'Q3',
+            'Grid': 'Grid', 'Ano': 'Ano', 'GP': 'GP'}, ['Unnamed: 8', 'Unnamed: 9', 'Unnamed: 10']),
+    (0.10, {'Pos': 'Pos.', 'No': 'Nu.', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Q1': 'Q1', 'Q2': 'Q2', 'Q3': 'Q3',
+            'Grid': 'Grid', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.10, {'Pos': _tupla('Pos.', 'Pos.'), 'No': _tupla('No.', 'No.'), 'Piloto': _tupla('Driver', 'Driver'),
+            'Construtor': _tupla('Constructor', 'Constructor'), 'Q1': _tupla('Qualifying times', 'Q1'),
+            'Q2': _tupla('Qualifying times', 'Q2'), 'Q3': _tupla('Qualifying times', 'Q3'),
+            'Grid': _tupla('Final grid', 'Final grid'), 'Ano': _tupla('Ano', ''), 'GP': _tupla('GP', '')}, []),
+    (0.10, {'Pos': _tupla('Pos.', 'Pos.'), 'No': _tupla('N°', 'N°'), 'Piloto': _tupla('Piloto', 'Piloto'),
+            'Construtor': _tupla('Construtor', 'Construtor'), 'Q1': _tupla('Tempos classificatórios', 'Q1'),
+            'Q2': _tupla('Tempos classificatórios', 'Q2'), 'Q3': _tupla('Tempos classificatórios', 'Q3'),
+            'Grid': _tupla('Grid final', 'Grid final'), 'Ano': _tupla('Ano', ''), 'GP': _tupla('GP', '')}, []),
+    (0.10, {'Pos': _tupla('Pos.', 'Pos.'), 'No': _tupla('No.', 'No.'), 'Piloto': _tupla('Piloto', 'Piloto'),
+            'Construtor': _tupla('Construtora', 'Construtora'), 'Q1': _tupla('Tempos Qualificatórios', 'Q1'),
+            'Q2': _tupla('Tempos Qualificatórios', 'Q2'), 'Q3': _tupla('Tempos Qualificatórios', 'Q3'),
+            'Grid': _tupla('Grid final', 'Grid final'), 'Ano': _tupla('Ano', ''), 'GP': _tupla('GP', '')}, []),
+]
+VARIANTES_CORRIDA = [
+    (0.45, {'Pos': 'Pos.', 'No': 'Nu.', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Voltas': 'Voltas',
+            'Tempo/Retirado': 'Tempo/Retirado', 'Grid': 'Grid', 'Pontos': 'Pontos', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.17, {'Pos': 'Pos.', 'No': 'Nu.', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Voltas': 'Voltas',
+            'Tempo/Retirado': 'Tempo/Retirado', 'Grid': 'Grid', 'Pontos': 'Pontos', 'Ano': 'Ano', 'GP': 'GP'},
+     ['Pit Stop', 'Pneus']),
+    (0.08, {'Pos': 'Pos.', 'No': 'Nu.', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Voltas': 'Voltas',
+            'Tempo/Retirado': 'Tempo/Retirado', 'Grid': 'Grid', 'Pontos': 'Pontos', 'Ano': 'Ano', 'GP': 'GP'},
+     ['Unnamed: 8', 'Unnamed: 9']),
+    (0.08, {'Pos': 'Pos.', 'No': 'N°', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Voltas': 'Laps',
+            'Tempo/Retirado': 'Tempo/Retirada', 'Grid': 'Grid', 'Pontos': 'Pontos', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.08, {'Pos': 'Pos.', 'No': 'No.', 'Piloto': 'Driver', 'Construtor': 'Constructor', 'Voltas': 'Laps',
+            'Tempo/Retirado': 'Time/Retired', 'Grid': 'Grid', 'Pontos': 'Points', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.07, {'Pos': 'Pos.', 'No': 'Nu.', 'Piloto': 'Piloto', 'Construtor': 'Construtor', 'Voltas': "Voltas'",
+            'Tempo/Retirado': 'Tempo/Retirado', 'Grid': 'Grid', 'Pontos': 'Pts.', 'Ano': 'Ano', 'GP': 'GP'}, []),
+    (0.07, {'Pos': 'Pos.', 'No': 'No.', 'Piloto': 'Piloto', 'Construtor': 'Construtora', 'Voltas': 'Voltas',
+            'Tempo/Retirado': 'Tempo/retirada', 'Grid': 'Grid', 'Pontos': 'Pontos', 'Ano': 'Ano', 'GP': 'GP'},
+     ['Pneus', 'Pit', 'Dif']),
+]
+
+
+def _formatar_volta(segundos):
+    """Segundos -> 'M:SS.mmm', como os tempos de Q1/Q2/Q3."""
+    milis = np.rint(np.asarray(segundos) * 1000).astype(np.int64)
+    return [f'{m // 60000}:{m // 1000 % 60:02d}.{m % 1000:03d}' for m in milis]
+
+
+def _formatar_prova(segundos):
+    """Segundos -> 'H:MM:SS.mmm', como o tempo do vencedor."""
+    milis = np.rint(np.asarray(segundos) * 1000).astype(np.int64)
+    return [f'{m // 3600000}:{m // 60000 % 60:02d}:{m // 1000 % 60:02d}.{m % 1000:03d}' for m in milis]
+
+
+def _nome_piloto(i):
+    nome = f'{NOMES[i % len(NOMES)]} {SOBRENOMES[(i // len(NOMES) + i) % len(SOBRENOMES)]}'
+    geracao = i // (len(NOMES) * len(SOBRENOMES))
+    return nome + (f' {geracao + 1}' if geracao else '')
+
+
+def _nome_equipe(base, motor):
+    nome = EQUIPES[base % len(EQUIPES)] + (f' {base // len(EQUIPES) + 1}' if base >= len(EQUIPES) else '')
+    return f'{nome}-{MOTORES[motor]}'
+
+
+def _nome_circuito(r):
+    return 'Grande_Prêmio_' + CIRCUITOS[r % len(CIRCUITOS)] + (f'_{r // len(CIRCUITOS) + 1}' if r >= len(CIRCUITOS) else '')
+
+
+def _escolher(rng, valores, mascara):
+    """Um valor de `valores` sorteado para cada posição verdadeira de `mascara`."""
+    return np.asarray(valores, dtype=object)[rng.integers(len(valores), size=int(mascara.sum()))]
+
+
+def _elencos(rng, n_temporadas, n_pilotos, trocas_por_temporada=3):
+    """Pilotos de cada vaga por temporada: a cada ano, algumas vagas passam a pilotos novos."""
+    elenco = np.empty((n_temporadas, n_pilotos), dtype=np.int64)
+    elenco[0] = np.arange(n_pilotos)
+    proximo = n_pilotos
+    for s in range(1, n_temporadas):
+        elenco[s] = elenco[s - 1]
+        vagas = rng.choice(n_pilotos, size=min(trocas_por_temporada, n_pilotos), replace=False)
+        # Parte das vagas vai para um piloto de outra equipe (troca de lugar), o resto para estreantes.
+        trocas = vagas[:len(vagas) // 2 * 2].reshape(-1, 2)
+        elenco[s, trocas[:, 0]], elenco[s, trocas[:, 1]] = elenco[s, trocas[:, 1]], elenco[s, trocas[:, 0]]
+        if len(vagas) % 2:
+            elenco[s, vagas[-1]] = proximo
+            proximo += 1
+    return elenco, proximo
+
+
+def _equipes(rng, n_temporadas, n_equipes):
+    """Força, nome-base e motor de cada equipe em cada temporada."""
+    forca = np.empty((n_temporadas, n_equipes))
+    base = np.empty((n_temporadas, n_equipes), dtype=np.int64)
+    motor = np.empty((n_temporadas, n_equipes), dtype=np.int64)
+    forca[0] = rng.normal(0, 1, n_equipes)
+    base[0] = np.arange(n_equipes)
+    motor[0] = rng.integers(len(MOTORES), size=n_equipes)
+    proxima_base = n_equipes
+    for s in range(1, n_temporadas):
+        forca[s] = 0.7 * forca[s - 1] + rng.normal(0, 0.55, n_equipes)
+        base[s] = base[s - 1]
+        motor[s] = np.where(rng.random(n_equipes) < 0.1, rng.integers(len(MOTORES), size=n_equipes), motor[s - 1])
+        renomeadas = np.flatnonzero(rng.random(n_equipes) < 0.05)
+        base[s, renomeadas] = proxima_base + np.arange(len(renomeadas))
+        proxima_base += len(renomeadas)
+    return forca, base, motor
+
+
+def _rodapes(chaves, textos, ordem, colunas):
+    """Linhas de rodapé: o mesmo texto em todas as colunas, como o `read_html` lê um `colspan`."""
+    df = pd.DataFrame({c: textos for c in colunas if c not in ('Ano', 'GP')}, index=range(len(chaves['Ano'])))
+    return df.assign(Ano=chaves['Ano'], GP=chaves['GP'], _bloco=chaves['_bloco'], _ordem=ordem)
+
+
+def gerar_limpos(escala=1, temporadas=11, corridas=22, pilotos=20, ano_inicial=2014, semente=0):
+    """
+    Gera as tabelas limpas de classificação e corrida.
+
+    Args:
+        escala (int): Multiplica o número de temporadas.
+        temporadas (int): Temporadas por unidade de escala.
+        corridas (int): Corridas por temporada.
+        pilotos (int): Pilotos por corrida (par: dois por equipe).
+        ano_inicial (int): Primeira temporada.
+        semente (int): Semente do gerador.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: (classificação, corrida), com as colunas de dados/limpos.
+    """
+    rng = np.random.default_rng(semente)
+    S, R, P = temporadas * escala, corridas, pilotos
+    T = P // 2
+    elenco, n_pilotos_total = _elencos(rng, S, P)
+    habilidade = rng.normal(0, 0.5, n_pilotos_total)
+    forca, base, motor = _equipes(rng, S, T)
+    equipe_da_vaga = np.arange(P) // 2
+    nomes_pilotos = np.array([_nome_piloto(i) for i in range(n_pilotos_total)], dtype=object)
+    numeros = np.argsort(rng.random((S, 99)), axis=1)[:, :P] + 1
+    nomes_equipes = np.array([[_nome_equipe(b, m) for b, m in zip(bs, ms)] for bs, ms in zip(base, motor)], dtype=object)
+
+    # Ritmo de cada vaga em cada corrida (maior é mais rápido).
+    potencial = forca[:, equipe_da_vaga] + habilidade[elenco]
+    ritmo_quali = potencial[:, None, :] + rng.normal(0, 0.35, (S, R, P))
+    volta_base = rng.uniform(68, 105, R)[None, :, None]
+    voltas_prova = rng.integers(50, 72, R)
+
+    # Classificação: Q1 para todos, Q2 para os 15 primeiros e Q3 para os 10 primeiros.
+    ordem_quali = np.argsort(-ritmo_quali, axis=2, kind='stable')
+    pos_quali = np.argsort(ordem_quali, axis=2) + 1
+    q1 = volta_base - 0.9 * ritmo_quali + rng.normal(0, 0.1, (S, R, P))
+    q2 = q1 - 0.3 + rng.normal(0, 0.1, (S, R, P))
+    q3 = q2 - 0.3 + rng.normal(0, 0.1, (S, R, P))
+
+    # Grid: punições de 3, 5 ou 10 posições e, raramente, largada do pit lane.
+    punicao = np.where(rng.random((S, R, P)) < 0.05, rng.choice([3, 5, 10], (S, R, P)), 0)
+    pit_lane = rng.random((S, R, P)) < 0.01
+    chave_grid = pos_quali + punicao + 0.5 + np.where(pit_lane, 2 * P, 0)
+    grid = np.argsort(np.argsort(chave_grid, axis=2), axis=2) + 1
+
+    # Corrida: ritmo com mais ruído, vantagem de quem larga na frente, abandonos e desclassificações.
+    ritmo_corrida = potencial[:, None, :] + rng.normal(0, 0.6, (S, R, P)) - 0.04 * grid
+    abandono = rng.random((S, R, P)) < 0.08
+    desclassificado = ~abandono & (rng.random((S, R, P)) < 0.003)
+    voltas_abandono = rng.integers(0, voltas_prova[None, :, None], (S, R, P))
+    chave_corrida = np.where(abandono | desclassificado, 1e6 - np.where(desclassificado, -1, voltas_abandono), -ritmo_corrida)
+    ordem_corrida = np.argsort(chave_corrida, axis=2, kind='stable')
+
+    blocos = np.arange(S * R)
+    corrida_do_bloco = np.tile(np.arange(R), S)
+    corrida_da_linha = np.repeat(corrida_do_bloco, P)
+    anos = np.repeat(ano_inicial + np.arange(S), R)
+    gps = np.array([_nome_circuito(r) for r in range(R)], dtype=object)[corrida_do_bloco]
+
+    def por_linha(matriz_por_vaga, ordem):
+        """Reordena uma matriz (S, R, P) por vaga na ordem das linhas da tabela e achata."""
+        return np.take_along_axis(matriz_por_vaga, ordem, axis=2).reshape(-1)
+
+    def por_vaga(matriz_por_temporada):
+        return np.broadcast_to(matriz_por_temporada[:, None, :], (S, R, P))
+
+    n = S * R * P
+    chaves = {'Ano': np.repeat(anos, P), 'GP': np.repeat(gps, P), '_bloco': np.repeat(blocos, P)}
+    ordem_na_tabela = np.tile(np.arange(P), S * R)
+
+    # --- Classificação
+    vaga = ordem_quali
+    elim_q2 = por_linha(pos_quali, vaga) > min(15, P)
+    elim_q3 = por_linha(pos_quali, vaga) > min(10, P)
+    travessao = np.repeat(rng.random(S * R) < 0.5, P)
+    sem_tempo = '—'
+    q1_txt = np.array(_formatar_volta(por_linha(q1, vaga)), dtype=object)
+    q1_txt[rng.random(n) < 0.004] = np.nan
+    q2_txt = np.array(_formatar_volta(por_linha(q2, vaga)), dtype=object)
+    q2_txt[elim_q2] = np.where(travessao[elim_q2], sem_tempo, None)
+    q3_txt = np.array(_formatar_volta(por_linha(q3, vaga)), dtype=object)
+    q3_txt[elim_q3] = np.where(travessao[elim_q3], sem_tempo, None)
+    grid_quali = por_linha(grid, vaga).astype(object)
+    grid_quali[por_linha(pit_lane, vaga)] = 'PL'
+    quali = pd.DataFrame({
+        **chaves,
+        'Pos': por_linha(pos_quali, vaga).astype(str),
+        'No': por_linha(por_vaga(numeros), vaga).astype(str),
+        'Piloto': nomes_pilotos[por_linha(por_vaga(elenco), vaga)],
+        'Construtor': por_linha(por_vaga(nomes_equipes[:, equipe_da_vaga]), vaga),
+        'Q1': q1_txt, 'Q2': q2_txt, 'Q3': q3_txt,
+        'Grid': grid_quali.astype(str),
+        '_ordem': ordem_na_tabela,
+    })
+    melhor_q1 = q1.min(axis=2).reshape(-1)
+    tem_fonte = rng.random(S * R) < 0.7
+    chaves_bloco = {'Ano': anos, 'GP': gps, '_bloco': blocos}
+    rodapes_quali = [
+        _rodapes(chaves_bloco, np.array(['Tempo dos 107%: ' + t for t in _formatar_volta(melhor_q1 * 1.07)], dtype=object),
+                 P, COLUNAS_QUALI),
+        _rodapes({k: v[tem_fonte] for k, v in chaves_bloco.items()}, 'Fonte:', P + 1, COLUNAS_QUALI),
+    ]
+
+    # --- Corrida
+    vaga = ordem_corrida
+    pos_chegada = ordem_na_tabela + 1
+    saiu = por_linha(abandono, vaga)
+    dsq = por_linha(desclassificado, vaga)
+    classificado = ~saiu & ~dsq
+    voltas_total = voltas_prova[corrida_da_linha]
+    # Retardatários: a partir de uma posição sorteada por corrida, uma volta atrás; seis posições depois, duas.
+    primeiro_retardatario = np.repeat(rng.integers(6, P + 2, S * R), P)
+    atraso_voltas = (pos_chegada >= primeiro_retardatario).astype(np.int64) + (pos_chegada >= primeiro_retardatario + 6)
+    voltas = np.where(saiu, por_linha(voltas_abandono, vaga), voltas_total - atraso_voltas * classificado)
+    tempo_vencedor = voltas_total * volta_base.reshape(-1)[corrida_da_linha] * 1.08
+    diferenca = np.cumsum(rng.exponential(4.0, (S * R, P)), axis=1).reshape(-1)
+    tempo = np.empty(n, dtype=object)
+    vencedor = pos_chegada == 1
+    tempo[vencedor] = _formatar_prova(tempo_vencedor[vencedor])
+    na_mesma_volta = classificado & ~vencedor & (atraso_voltas == 0)
+    tempo[na_mesma_volta] = [f'+{d:.3f}' for d in diferenca[na_mesma_volta]]
+    uma_volta = classificado & (atraso_voltas == 1)
+    tempo[uma_volta] = _escolher(rng, ['+1 volta', '+1 Volta', '+1 lap'], uma_volta)
+    mais_voltas = classificado & (atraso_voltas > 1)
+    tempo[mais_voltas] = [f'+{k} voltas' for k in atraso_voltas[mais_voltas]]
+    tempo[saiu] = _escolher(rng, MOTIVOS, saiu)
+    tempo[dsq] = 'Desclassificado'
+    pos_txt = pos_chegada.astype(str).astype(object)
+    pos_txt[saiu] = 'Ret'
+    pos_txt[dsq] = 'DSQ'
+    pontua = classificado & (pos_chegada <= len(PONTOS))
+    pontos = np.full(n, np.nan, dtype=object)
+    pontos[pontua] = PONTOS[pos_chegada[pontua] - 1].astype(str)
+    grid_corrida = por_linha(grid, vaga).astype(object)
+    grid_corrida[por_linha(pit_lane, vaga)] = 'PL'
+    corrida = pd.DataFrame({
+        **chaves,
+        'Pos': pos_txt,
+        'No': por_linha(por_vaga(numeros), vaga).astype(str),
+        'Piloto': nomes_pilotos[por_linha(por_vaga(elenco), vaga)],
+        'Construtor': por_linha(por_vaga(nomes_equipes[:, equipe_da_vaga]), vaga),
+        'Voltas': voltas.astype(str),
+        'Tempo/Retirado': tempo,
+        'Pontos': pontos,
+        'Grid': grid_corrida.astype(str),
+        '_ordem': ordem_na_tabela,
+    })
+    com_volta_rapida = rng.random(S * R) < 0.4
+    primeiro = corrida['_ordem'].to_numpy() == 0
+    textos = [f'Volta mais rápida: {p} ({c}) – {v} (volta {k})' for p, c, v, k in zip(
+        corrida['Piloto'].to_numpy()[primeiro][com_volta_rapida], corrida['Construtor'].to_numpy()[primeiro][com_volta_rapida],
+        _formatar_volta(volta_base.reshape(-1)[corrida_do_bloco][com_volta_rapida] * 1.02),
+        rng.integers(2, 50, int(com_volta_rapida.sum())))]
+    rodapes_corrida = [
+        _rodapes({k: v[com_volta_rapida] for k, v in chaves_bloco.items()}, np.array(textos, dtype=object), P, COLUNAS_CORRIDA),
+        _rodapes({k: v[tem_fonte] for k, v in chaves_bloco.items()}, 'Fonte:', P + 1, COLUNAS_CORRIDA),
+    ]
+
+    def montar(df, rodapes, colunas):
+        df = pd.concat([df, *rodapes], ignore_index=True)
+        df = df.iloc[np.lexsort((df['_ordem'].to_numpy(), df['_bloco'].to_numpy()))]
+        return df[colunas].reset_index(drop=True)
+
+    return montar(quali, rodapes_quali, COLUNAS_QUALI), montar(corrida, rodapes_corrida, COLUNAS_CORRIDA)
+
+
+def sujar(df_limpo, variantes, semente=0):
+    """
+    Monta a tabela bruta correspondente a uma tabela limpa.
+
+    Cada corrida recebe uma das `variantes` de cabeçalho; a tabela final tem a
+    união das colunas de todas as variantes, vazias fora das corridas que as
+    usam, como no CSV que os scrapers acumulam. Também apaga 2% dos números
+    de carro (a limpeza os recupera das outras corridas do piloto na
+    temporada) e repete o cabeçalho dentro de 2% das corridas.
+
+    Args:
+        df_limpo (pd.DataFrame): Saída de `gerar_limpos`.
+        variantes (list): VARIANTES_QUALI ou VARIANTES_CORRIDA.
+        semente (int): Semente do gerador.
+
+    Returns:
+        pd.DataFrame: A tabela bruta, só com strings.
+    """
+    rng = np.random.default_rng(semente)
+    df = df_limpo.copy()
+    df['Ano'] = df['Ano'].astype(str)
+    bloco = df.groupby(['Ano', 'GP'], sort=False).ngroup().to_numpy()
+    n_blocos = bloco.max() + 1
+
+    eh_piloto = df['Piloto'].to_numpy() != df['Pos'].to_numpy()
+    apagar = eh_piloto & (rng.random(len(df)) < 0.02)
+    df.loc[apagar, 'No'] = np.nan
+
+    # Cabeçalho repetido logo no início de algumas corridas.
+    repetidos = np.flatnonzero(rng.random(n_blocos) < 0.02)
+    primeira_linha = np.flatnonzero(np.r_[True, bloco[1:] != bloco[:-1]])
+    cabecalhos = df.iloc[primeira_linha[repetidos]].copy()
+    for coluna in cabecalhos.columns.difference(['Ano', 'GP']):
+        cabecalhos[coluna] = 'Piloto' if coluna == 'Piloto' else coluna
+    df['_posicao'] = np.arange(len(df), dtype=float)
+    cabecalhos['_posicao'] = primeira_linha[repetidos] - 0.5
+    df = pd.concat([df, cabecalhos]).sort_values('_posicao', kind='stable')
+    bloco = df.groupby(['Ano', 'GP'], sort=False).ngroup().to_numpy()
+
+    pesos = np.array([p for p, _, _ in variantes])
+    variante_do_bloco = rng.choice(len(variantes), size=n_blocos, p=pesos / pesos.sum())
+    partes = []
+    for i, (_, renomear, extras) in enumerate(variantes):
+        linhas = variante_do_bloco[bloco] == i
+        if not linhas.any():
+            continue
+        parte = df.loc[linhas, ['_posicao', *renomear]].rename(columns=renomear)
+        if i == 0 and 'Q1' in renomear:
+            # Na classificação, parte dos anos vem como float ('2014.0').
+            parte[renomear['Ano']] = parte[renomear['Ano']] + '.0'
+        for extra in extras:
+            parte[extra] = np.nan
+        partes.append(parte)
+    bruto = pd.concat(partes, ignore_index=True).sort_values('_posicao', kind='stable')
+    return bruto.drop(columns='_posicao').reset_index(drop=True)
+
+
+def gravar(pasta, escala=1, semente=0, **kwargs):
+    """
+    Gera e grava os quatro CSVs (bruto e limpo de classificação e de corrida) em `pasta`.
+
+    Args:
+        pasta (str): Pasta de destino.
+        escala (int): Ver `gerar_limpos`.
+        semente (int): Semente do gerador.
+        **kwargs: Outros parâmetros de `gerar_limpos`.
+
+    Returns:
+        dict[str, str]: Caminho de cada arquivo: 'quali_bruto', 'corrida_bruto', 'quali_limpo' e 'corrida_limpo'.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    quali, corrida = gerar_limpos(escala, semente=semente, **kwargs)
+    caminhos = {nome: os.path.join(pasta, f'f1_{nome}.csv') for nome in ('quali_bruto', 'corrida_bruto', 'quali_limpo', 'corrida_limpo')}
+    sujar(quali, VARIANTES_QUALI, semente).to_csv(caminhos['quali_bruto'], index=False, encoding='utf-8-sig')
+    sujar(corrida, VARIANTES_CORRIDA, semente + 1).to_csv(caminhos['corrida_bruto'], index=False, encoding='utf-8-sig')
+    quali.to_csv(caminhos['quali_limpo'], index=False, encoding='utf-8-sig')
+    corrida.to_csv(caminhos['corrida_limpo'], index=False, encoding='utf-8-sig')
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pasta')
+    parser.add_argument('--escala', type=int, default=1)
+    parser.add_argument('--temporadas', type=int, default=11)
+    parser.add_argument('--corridas', type=int, default=22)
+    parser.add_argument('--pilotos', type=int, default=20)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+    caminhos = gravar(args.pasta, args.escala, args.semente, temporadas=args.temporadas, corridas=args.corridas, pilotos=args.pilotos)
+    for nome, caminho in caminhos.items():
+        print(f"{nome}: {caminho} ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import html
+import os
+import random
+
+import pandas as pd
+
+DIRETORIO_LIMPOS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'dados', 'limpos'))
+
+PARAGRAFO = (
+    '<p>O <a href="/wiki/GP">Grande Prêmio</a> foi disputado no circuito e contou com '
+    '<b>{n}</b> pilotos inscritos.<sup class="reference"><a href="#cite_note-{n}">[{n}]</a></sup> '
+    'A prova teve condições variáveis de pista e diversas estratégias de pneus.</p>'
+)
+
+
+def _celula(valor, rng, tag='td'):
+    if pd.isna(valor):
+        return f'<{tag}></{tag}>'
+    texto = html.escape(str(valor))
+    if rng.random() < 0.3:
+        texto = f'<span style="display:none">{rng.randint(0, 9999):04d}</span><a href="/wiki/x">{texto}</a>'
+    if rng.random() < 0.15:
+        texto += f'<sup class="reference"><a href="#n">[{rng.randint(1, 30)}]</a></sup>'
+    return f'<{tag}>{texto}</{tag}>'
+
+
+def _linhas(df, colunas, rng):
+    return ''.join('<tr>' + ''.join(_celula(v, rng) for v in linha) + '</tr>' for linha in df[colunas].itertuples(index=False))
+
+
+def tabela_classificacao(df, rng):
+    colunas = ['Pos', 'No', 'Piloto', 'Construtor', 'Q1', 'Q2', 'Q3', 'Grid']
+    if rng.random() < 0.5:
+        cabecalho = ('<tr><th>Pos.</th><th>Nu.</th><th>Piloto</th><th>Construtor</th>'
+                     '<th>Q1</th><th>Q2</th><th>Q3</th><th>Grid<sup>[1]</sup></th></tr>')
+    else:
+        cabecalho = ('<tr><th rowspan="2">Pos.</th><th rowspan="2">No.</th><th rowspan="2">Piloto</th>'
+                     '<th rowspan="2">Construtora</th><th colspan="3">Tempos Qualificatórios</th>'
+                     '<th rowspan="2">Grid<br>final</th></tr><tr><th>Q1</th><th>Q2</th><th>Q3</th></tr>')
+    rodape = '<tr><th colspan="8">Tempo de 107%: 1:36.000</th></tr><tr><th colspan="8">Fontes:<sup>[2]</sup></th></tr>'
+    return f'<table class="wikitable sortable"><tbody>{cabecalho}{_linhas(df, colunas, rng)}{rodape}</tbody></table>'
+
+
+def tabela_corrida(df, rng):
+    colunas = ['Pos', 'No', 'Piloto', 'Construtor', 'Voltas', 'Tempo/Retirado', 'Grid', 'Pontos']
+    cabecalho = ('<tr><th>Pos.</th><th>Nu.</th><th>Piloto</th><th>Construtor</th><th>Voltas</th>'
+                 '<th>Tempo/Retirado</th><th>Grid</th><th>Pontos</th></tr>')
+    rodape = '<tr><th colspan="8">Volta mais rápida: 1:20.000</th></tr><tr><th colspan="8">Fontes:</th></tr>'
+    return f'<table class="wikitable"><tbody>{cabecalho}{_linhas(df, colunas, rng)}{rodape}</tbody></table>'
+
+
+def tabela_campeonato(df, rng):
+    linhas = ''.join(f'<tr><td>{i + 1}</td><td>{html.escape(p)}</td><td>{rng.randint(0, 400)}</td></tr>'
+                     for i, p in enumerate(df['Piloto'].dropna().unique()[:5]))
+    return f'<table class="wikitable"><tbody><tr><th>Pos.</th><th>Piloto</th><th>Pontos</th></tr>{linhas}</tbody></table>'
+
+
+def gerar_pagina(df_quali, df_corrida, rng, paragrafos=120):
+    """
+    Gera uma página HTML no formato das páginas de GP da Wikipédia.
+
+    A página tem texto corrido com referências, as tabelas de classificação
+    (com cabeçalho simples ou de duas linhas), de corrida e de campeonato,
+    células com links, chaves de ordenação ocultas e notas <sup>, e rodapés
+    com colspan.
+
+    Args:
+        df_quali (pd.DataFrame): Linhas limpas de classificação de um GP.
+        df_corrida (pd.DataFrame): Linhas limpas de corrida do mesmo GP.
+        rng (random.Random): Gerador usado para as variações.
+        paragrafos (int): Quantidade de parágrafos de texto, para aproximar o tamanho real das páginas.
+
+    Returns:
+        str: O HTML da página.
+    """
+    texto = ''.join(PARAGRAFO.format(n=i) for i in range(paragrafos))
+    return (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8"><title>GP</title></head><body>'
+        f'<h2><span>Contexto</span></h2>{texto}'
+        f'<h2><span>Classificação</span></h2>{tabela_classificacao(df_quali, rng)}'
+        f'<h2><span>Corrida</span></h2>{tabela_corrida(df_corrida, rng)}'
+        f'<h2><span>Campeonato</span></h2>{tabela_campeonato(df_corrida, rng)}'
+        f'{texto}</body></html>'
+    )
+
+
+def gerar_paginas(n_paginas=20, semente=42):
+    """
+    Gera páginas sintéticas a partir dos dados limpos do repositório.
+
+    Args:
+        n_paginas (int): Número de páginas (GPs) a gerar.
+        semente (int): Semente do gerador aleatório.
+
+    Returns:
+        list[str]: HTML de cada página.
+    """
+    rng = random.Random(semente)
+    df_quali = pd.read_csv(os.path.join(DIRETORIO_LIMPOS, 'f1_classificacao_limpo.csv'), dtype=str)
+    df_corrida = pd.read_csv(os.path.join(DIRETORIO_LIMPOS, 'f1_corrida_limpo.csv'), dtype=str)
+    chaves = df_corrida[['Ano', 'GP']].drop_duplicates().values.tolist()
+    rng.shuffle(chaves)
+
+    paginas = []
+    for ano, gp in chaves[:n_paginas]:
+        q = df_quali[(df_quali['Ano'] == ano) & (df_quali['GP'] == gp)]
+        c = df_corrida[(df_corrida['Ano'] == ano) & (df_corrida['GP'] == gp)]
+        paginas.append(gerar_pagina(q, c, rng))
+    return paginas
@@ -1,6 +1,8 @@
-import requests
 from bs4 import BeautifulSoup
-import time
+
+from src.scrapers.cache import CachePaginas
+from src.scrapers.calendario import url_da_corrida
+from src.scrapers.coletor import Coletor
 
 FIRST_RACE_OF_YEAR = {
     2014: 'Grande_Prêmio_da_Austrália',
@@ -17,8 +19,11 @@ FIRST_RACE_OF_YEAR = {
 }
 
 
+coletor = Coletor(user_agent='Meu-Projeto-de-Dados-F1-Explorer/2.0', max_workers=1, taxa_por_host=1.0, rajada=1,
+                  cache=CachePaginas.do_ambiente())
+
 for ano, gp in FIRST_RACE_OF_YEAR.items():
-    url = f"https://pt.wikipedia.org/wiki/{gp}_de_{ano}"
+    url = url_da_corrida(gp, ano)
     
     print(f"\n===================================================================")
     print(f"Analisando página para o ano de {ano}: {gp.replace('_', ' ')}")
@@ -26,10 +31,10 @@ for ano, gp in FIRST_RACE_OF_YEAR.items():
     print(f"===================================================================")
     
     try:
-        response = requests.get(url, headers={'User-Agent': 'Meu-Projeto-de-Dados-F1-Explorer/2.0'})
+        html = coletor.buscar(url)
         
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+        if html is not None:
+            soup = BeautifulSoup(html, 'html.parser')
             todas_as_tabelas = soup.find_all('table', class_='wikitable')
             
             if not todas_as_tabelas:
@@ -57,12 +62,12 @@ for ano, gp in FIRST_RACE_OF_YEAR.items():
                     print("Esta tabela não possui cabeçalhos (<th>).")
 
         else:
-            print(f"--> ERRO: Página não encontrada (Status: {response.status_code}).")
+            print("--> ERRO: Página não encontrada ou indisponível no cache.")
     
     except Exception as e:
         print(f"--> ERRO: Falha ao processar a página. Detalhes: {e}")
-    
-    time.sleep(1) 
+
+coletor.fechar()
 
 print("\n===================================================================")
 print("Exploração geral de tabelas finalizada.")
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+Armazenamento colunar tipado dos dados do pipeline (dados/parquet).
+
+Cada conjunto de dados é uma pasta de arquivos Parquet comprimidos com zstd,
+particionada por temporada no formato Hive (`Ano=2024/…`). Os tipos vêm de um
+esquema declarativo (ESQUEMAS) ou, para os brutos e a matriz de features, são
+inferidos na gravação; a leitura aceita projeção de colunas e filtros que são
+aplicados antes de ler os arquivos (partições de outras temporadas nem chegam
+a ser abertas).
+"""
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_PARQUET = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'parquet'))
+
+COLUNA_PARTICAO = 'Ano'
+# Ordem original das linhas: as partições por temporada não preservam a ordem
+# dos CSVs (gravados GP a GP), então ela é guardada e restaurada na leitura.
+COLUNA_ORDEM = '_linha'
+
+ESQUEMAS = {
+    'corrida': {
+        'Ano': 'int16', 'GP': 'categoria', 'Pos': 'int8', 'No': 'int8', 'Piloto': 'categoria',
+        'Construtor': 'categoria', 'Voltas': 'int16', 'Tempo/Retirado': 'texto', 'Pontos': 'float32', 'Grid': 'int8',
+    },
+    'classificacao': {
+        'Ano': 'int16', 'GP': 'categoria', 'Pos': 'int8', 'No': 'int8', 'Piloto': 'categoria',
+        'Construtor': 'categoria', 'Q1': 'segundos', 'Q2': 'segundos', 'Q3': 'segundos', 'Grid': 'int8',
+    },
+}
+
+_INTEIROS = {'int8': np.int8, 'int16': np.int16, 'int32': np.int32}
+
+
+def _tipos_arrow():
+    import pyarrow as pa
+
+    return {
+        'int8': pa.int8(), 'int16': pa.int16(), 'int32': pa.int32(),
+        'float32': pa.float32(), 'segundos': pa.float32(), 'bool': pa.bool_(),
+        'categoria': pa.dictionary(pa.int32(), pa.string()), 'texto': pa.string(),
+    }
+
+
+def caminho_dataset(nome, diretorio=DIRETORIO_PARQUET):
+    """Pasta do conjunto de dados `nome`."""
+    return os.path.join(diretorio, nome)
+
+
+def existe(nome, diretorio=DIRETORIO_PARQUET):
+    """Indica se o conjunto de dados `nome` já foi gravado."""
+    return os.path.isdir(caminho_dataset(nome, diretorio))
+
+
+def arquivos_do_dataset(nome, diretorio=DIRETORIO_PARQUET):
+    """
+    Lista os arquivos Parquet de um conjunto de dados, em ordem estável.
+
+    Args:
+        nome (str): Nome do conjunto de dados.
+        diretorio (str): Raiz do armazenamento.
+
+    Returns:
+        list[str]: Caminhos dos arquivos.
+    """
+    arquivos = []
+    for raiz, _, nomes in os.walk(caminho_dataset(nome, diretorio)):
+        arquivos.extend(os.path.join(raiz, n) for n in nomes if n.endswith('.parquet'))
+    return sorted(arquivos)
+
+
+def inferir_esquema(df, limite_categoria=0.5):
+    """
+    Escolhe o tipo compacto de cada coluna de um DataFrame sem esquema declarado.
+
+    Inteiros ficam com o menor tipo que comporta os valores, floats viram
+    float32 e textos viram categoria quando têm poucos valores distintos.
+
+    Args:
+        df (pd.DataFrame): Dados a gravar.
+        limite_categoria (float): Proporção máxima de valores distintos para uma coluna de texto virar categoria.
+
+    Returns:
+        dict: Coluna -> tipo do esquema.
+    """
+    esquema = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_bool_dtype(serie):
+            esquema[coluna] = 'bool'
+        elif pd.api.types.is_integer_dtype(serie):
+            minimo, maximo = (serie.min(), serie.max()) if serie.notna().any() else (0, 0)
+            esquema[coluna] = next(tipo for tipo, np_tipo in _INTEIROS.items()
+                                   if np.iinfo(np_tipo).min <= minimo and maximo <= np.iinfo(np_tipo).max)
+        elif pd.api.types.is_float_dtype(serie):
+            esquema[coluna] = 'float32'
+        else:
+            distintos = serie.nunique(dropna=True)
+            esquema[coluna] = 'categoria' if distintos <= limite_categoria * max(len(serie), 1) else 'texto'
+    if COLUNA_PARTICAO in esquema:
+        esquema[COLUNA_PARTICAO] = 'int16'
+    return esquema
+
+
+def esquema_bruto(colunas):
+    """
+    Esquema dos CSVs brutos: tudo texto, como veio das páginas, exceto a temporada usada na partição.
+
+    Args:
+        colunas (Iterable[str]): Cabeçalhos do CSV bruto.
+
+    Returns:
+        dict: Coluna -> tipo do esquema.
+    """
+    return {coluna: 'int16' if coluna == COLUNA_PARTICAO else 'texto' for coluna in colunas}
+
+
+def tipar(df, esquema):
+    """
+    Converte as colunas de `df` para os tipos do esquema.
+
+    Textos que não cabem no tipo (como 'Ret' numa posição ou '25+1' nos pontos)
+    viram nulos, como no `pd.to_numeric(errors='coerce')` das features; colunas
+    do tipo 'segundos' são tempos em texto convertidos por `tempos_para_segundos`.
+    Colunas do esquema ausentes em `df` saem inteiramente nulas.
+
+    Args:
+        df (pd.DataFrame): Dados, normalmente com colunas de texto.
+        esquema (dict): Coluna -> tipo ('int8', 'int16', 'int32', 'float32', 'segundos', 'bool', 'categoria' ou 'texto').
+
+    Returns:
+        pd.DataFrame: Apenas as colunas do esquema, com tipos pandas compactos.
+    """
+    from src.modelos.tempos import tempos_para_segundos
+
+    tipadas = {}
+    for coluna, tipo in esquema.items():
+        serie = df[coluna] if coluna in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+        if tipo in _INTEIROS:
+            if pd.api.types.is_float_dtype(serie) or pd.api.types.is_object_dtype(serie):
+                valores = pd.to_numeric(serie, errors='coerce')
+                limites = np.iinfo(_INTEIROS[tipo])
+                valores = valores.where(valores.between(limites.min, limites.max) & (valores == np.round(valores)))
+                serie = valores
+            tipadas[coluna] = serie.astype(tipo.capitalize())
+        elif tipo == 'float32':
+            tipadas[coluna] = pd.to_numeric(serie, errors='coerce').astype(np.float32)
+        elif tipo == 'segundos':
+            if not pd.api.types.is_numeric_dtype(serie):
+                serie = tempos_para_segundos(serie)
+            tipadas[coluna] = serie.astype(np.float32)
+        elif tipo == 'bool':
+            tipadas[coluna] = serie.astype(bool)
+        elif tipo == 'categoria':
+            tipadas[coluna] = serie.astype('category')
+        else:
+            tipadas[coluna] = serie.astype(object).where(serie.notna(), None)
+    return pd.DataFrame(tipadas, index=df.index)
+
+
+def _esquema_arrow(esquema):
+    import pyarrow as pa
+
+    tipos = _tipos_arrow()
+    return pa.schema([(coluna, tipos[tipo]) for coluna, tipo in esquema.items()] + [(COLUNA_ORDEM, pa.int64())])
+
+
+def _particionamento():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([(COLUNA_PARTICAO, pa.int16())]), flavor='hive')
+
+
+def gravar(df, nome, esquema=None, diretorio=DIRETORIO_PARQUET, acrescentar=False):
+    """
+    Grava `df` como o conjunto de dados `nome`, particionado por temporada.
+
+    Sem `acrescentar`, a versão anterior só é substituída depois que a nova foi
+    escrita por completo. Com `acrescentar`, as linhas entram como novos
+    arquivos ao lado dos existentes (usado pela limpeza em blocos) e devem
+    seguir o mesmo esquema.
+
+    Args:
+        df (pd.DataFrame): Dados a gravar; precisa da coluna 'Ano'.
+        nome (str): Nome do conjunto de dados (pasta dentro de `diretorio`).
+        esquema (dict, optional): Coluna -> tipo. Por padrão, ESQUEMAS[nome] ou o inferido de `df`.
+        diretorio (str): Raiz do armazenamento.
+        acrescentar (bool): Acrescenta as linhas em vez de substituir o conjunto.
+
+    Returns:
+        str: A pasta do conjunto de dados.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    esquema = esquema or ESQUEMAS.get(nome) or inferir_esquema(df)
+    destino = caminho_dataset(nome, diretorio)
+    tipado = tipar(df, esquema)
+
+    inicio = 0
+    if acrescentar and os.path.isdir(destino):
+        inicio = sum(pq.read_metadata(arquivo).num_rows for arquivo in arquivos_do_dataset(nome, diretorio))
+    tipado[COLUNA_ORDEM] = np.arange(inicio, inicio + len(tipado), dtype=np.int64)
+    tabela = pa.Table.from_pandas(tipado, schema=_esquema_arrow(esquema), preserve_index=False)
+    tabela = tabela.replace_schema_metadata({'colunas': json.dumps(list(esquema), ensure_ascii=False)})
+
+    pasta = destino if acrescentar else f'{destino}.{uuid.uuid4().hex}.tmp'
+    ds.write_dataset(
+        tabela, pasta, format='parquet', partitioning=_particionamento(),
+        basename_template=f'parte-{uuid.uuid4().hex[:12]}-{{i}}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+    )
+    if not acrescentar:
+        publicar(pasta, nome, diretorio)
+    return destino
+
+
+def publicar(pasta, nome, diretorio=DIRETORIO_PARQUET):
+    """
+    Troca o conjunto de dados `nome` pelo conteúdo de `pasta`, escrita à parte.
+
+    Args:
+        pasta (str): Pasta com o conjunto de dados completo.
+        nome (str): Nome do conjunto de dados a substituir.
+        diretorio (str): Raiz do armazenamento.
+
+    Returns:
+        str: A pasta do conjunto de dados.
+    """
+    destino = caminho_dataset(nome, diretorio)
+    antiga = f'{destino}.{uuid.uuid4().hex}.antiga'
+    if os.path.isdir(destino):
+        os.replace(destino, antiga)
+    os.replace(pasta, destino)
+    shutil.rmtree(antiga, ignore_errors=True)
+    return destino
+
+
+def ler(nome, colunas=None, filtros=None, anos=None, diretorio=DIRETORIO_PARQUET):
+    """
+    Lê um conjunto de dados gravado por `gravar`, na ordem original das linhas.
+
+    Exemplos:
+        ler('classificacao', anos=[2024])
+        ler('features', colunas=['Ano', 'GP', 'Piloto', 'momentum_pos_5r'])
+        ler('corrida', filtros=[('Piloto', '==', 'Lewis Hamilton'), ('Ano', '>=', 2020)])
+
+    Args:
+        nome (str): Nome do conjunto de dados.
+        colunas (list[str], optional): Colunas a ler; por padrão, todas.
+        filtros (list[tuple], optional): Condições (coluna, operador, valor), combinadas com E,
+            no formato de `pyarrow.parquet.filters_to_expression`.
+        anos (Iterable[int], optional): Atalho para filtrar temporadas; só as partições pedidas são lidas.
+        diretorio (str): Raiz do armazenamento.
+
+    Returns:
+        pd.DataFrame: Os dados, com inteiros anuláveis ('Int8', 'Int16'), float32 e categorias.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = ds.dataset(caminho_dataset(nome, diretorio), format='parquet', partitioning=_particionamento())
+    expressao = pq.filters_to_expression(filtros) if filtros else None
+    if anos is not None:
+        filtro_anos = ds.field(COLUNA_PARTICAO).isin([int(ano) for ano in anos])
+        expressao = filtro_anos if expressao is None else expressao & filtro_anos
+
+    if colunas is None:
+        # A coluna de partição sai dos arquivos; a ordem original fica nos metadados.
+        metadados = dataset.schema.metadata or {}
+        nomes = json.loads(metadados[b'colunas']) if b'colunas' in metadados else [c for c in dataset.schema.names if c != COLUNA_ORDEM]
+    else:
+        nomes = list(colunas)
+    tabela = dataset.to_table(columns=nomes + [COLUNA_ORDEM], filter=expressao)
+    tabela = tabela.sort_by(COLUNA_ORDEM).drop_columns([COLUNA_ORDEM])
+
+    inteiros = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype()}
+    return tabela.to_pandas(ignore_metadata=True, types_mapper=inteiros.get)
+
+
+def para_tipos_numpy(df):
+    """
+    Converte um DataFrame lido do armazenamento para os tipos que `pd.read_csv` produziria.
+
+    Inteiros anuláveis viram int64 (ou float64, se tiverem nulos), float32 vira
+    float64 e categorias voltam a ser texto; é a forma esperada pelo código de
+    features, escrito sobre o resultado dos CSVs.
+
+    Args:
+        df (pd.DataFrame): Saída de `ler`.
+
+    Returns:
+        pd.DataFrame: Uma cópia com tipos NumPy.
+    """
+    convertidas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            convertidas[coluna] = serie.astype(object).where(serie.notna(), np.nan)
+        elif pd.api.types.is_extension_array_dtype(serie) and pd.api.types.is_integer_dtype(serie):
+            convertidas[coluna] = serie.astype('float64') if serie.isna().any() else serie.astype('int64')
+        elif pd.api.types.is_float_dtype(serie):
+            convertidas[coluna] = serie.astype('float64')
+        else:
+            convertidas[coluna] = serie
+    return pd.DataFrame(convertidas, index=df.index)
+
+
+def exportar_csv(nome, caminho_csv, diretorio=DIRETORIO_PARQUET, **kwargs):
+    """
+    Exporta um conjunto de dados para CSV (UTF-8 com BOM, como os demais CSVs do projeto).
+
+    Args:
+        nome (str): Nome do conjunto de dados.
+        caminho_csv (str): Arquivo de destino.
+        diretorio (str): Raiz do armazenamento.
+        **kwargs: Repassados para `ler` (por exemplo `colunas` ou `anos`).
+
+    Returns:
+        str: O caminho gravado.
+    """
+    df = ler(nome, diretorio=diretorio, **kwargs)
+    os.makedirs(os.path.dirname(os.path.abspath(caminho_csv)), exist_ok=True)
+    df.to_csv(caminho_csv, index=False, encoding='utf-8-sig')
+    return caminho_csv
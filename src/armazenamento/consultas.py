@@ -0,0 +1,330 @@
+"""
+Banco de consultas local (SQLite) com o histórico de corridas e classificações.
+
+O banco é montado a partir dos dados limpos (CSV ou armazenamento colunar) e
+refeito sozinho quando eles mudam (ou quando muda o calendário). Cada corrida
+recebe um `race_id` na ordem cronológica usada pelas features
+(`ordem_das_corridas`), e as tabelas têm índices para as
+buscas que o resto do código faz: uma corrida por (Ano, GP), o histórico de um
+piloto em ordem de corrida e os resultados de uma equipe numa temporada. Essas
+buscas viram consultas pontuais ou por intervalo no índice, em vez de filtros
+sobre todas as linhas de um DataFrame.
+"""
+import hashlib
+import os
+import sqlite3
+import uuid
+
+import numpy as np
+import pandas as pd
+
+CAMINHO_BANCO = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'banco', 'f1.sqlite'))
+
+COLUNAS_RESULTADOS = {
+    'Ano': 'INTEGER', 'GP': 'TEXT', 'Pos': 'INTEGER', 'No': 'INTEGER', 'Piloto': 'TEXT', 'Construtor': 'TEXT',
+    'Voltas': 'INTEGER', 'Tempo/Retirado': 'TEXT', 'Pontos': 'REAL', 'Grid': 'INTEGER',
+}
+COLUNAS_CLASSIFICACAO = {
+    'Ano': 'INTEGER', 'GP': 'TEXT', 'Pos': 'INTEGER', 'No': 'INTEGER', 'Piloto': 'TEXT', 'Construtor': 'TEXT',
+    'Q1': 'REAL', 'Q2': 'REAL', 'Q3': 'REAL', 'Grid': 'INTEGER',
+}
+
+_ESQUEMA = """
+CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE corridas (race_id INTEGER PRIMARY KEY, Ano INTEGER NOT NULL, GP TEXT NOT NULL, UNIQUE (Ano, GP));
+CREATE TABLE resultados (race_id INTEGER NOT NULL REFERENCES corridas, {resultados});
+CREATE TABLE classificacao (race_id INTEGER NOT NULL REFERENCES corridas, {classificacao});
+CREATE INDEX resultados_ano_gp ON resultados (Ano, GP);
+CREATE INDEX resultados_piloto_corrida ON resultados (Piloto, race_id);
+CREATE INDEX resultados_construtor_ano ON resultados (Construtor, Ano);
+CREATE INDEX classificacao_ano_gp ON classificacao (Ano, GP);
+CREATE INDEX classificacao_piloto_corrida ON classificacao (Piloto, race_id);
+CREATE INDEX classificacao_construtor_ano ON classificacao (Construtor, Ano);
+"""
+
+
+def _definicao(colunas):
+    return ', '.join(f'"{nome}" {tipo}' for nome, tipo in colunas.items())
+
+
+def impressao_dos_dados(caminhos):
+    """
+    Calcula o SHA-256 do conteúdo dos dados limpos (CSVs ou pastas Parquet).
+
+    Args:
+        caminhos (list[str]): CSVs ou pastas Parquet.
+
+    Returns:
+        str: SHA-256 hexadecimal.
+    """
+    from src.armazenamento import colunar
+
+    h = hashlib.sha256()
+    for caminho in caminhos:
+        arquivos = colunar.arquivos_do_dataset(os.path.basename(caminho), os.path.dirname(caminho)) if os.path.isdir(caminho) else [caminho]
+        for arquivo in arquivos:
+            h.update(os.path.relpath(arquivo, caminho).encode('utf-8'))
+            with open(arquivo, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    h.update(bloco)
+    return h.hexdigest()
+
+
+def _impressao_do_banco(caminho_quali, caminho_corrida):
+    """Impressão dos dados limpos e do calendário, que define o `race_id` de cada corrida."""
+    from src.scrapers import calendario
+
+    return impressao_dos_dados([caminho_quali, caminho_corrida, calendario.__file__])
+
+
+def _preparar(df, colunas):
+    """Reduz um conjunto limpo às colunas do banco, com números e tempos (em segundos) já convertidos."""
+    from src.modelos.tempos import tempos_para_segundos
+
+    df = df.reindex(columns=list(colunas)).copy()
+    for coluna, tipo in colunas.items():
+        if tipo == 'TEXT':
+            df[coluna] = df[coluna].astype(object).where(df[coluna].notna(), None)
+        elif coluna in ('Q1', 'Q2', 'Q3') and not pd.api.types.is_numeric_dtype(df[coluna]):
+            df[coluna] = tempos_para_segundos(df[coluna])
+        else:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    return df.dropna(subset=['Ano', 'GP', 'Piloto'])
+
+
+def construir_banco(caminho_quali, caminho_corrida, caminho=CAMINHO_BANCO):
+    """
+    Monta o banco a partir dos dados limpos, substituindo o anterior de forma atômica.
+
+    Args:
+        caminho_quali (str): CSV ou pasta Parquet de classificação.
+        caminho_corrida (str): CSV ou pasta Parquet de corrida.
+        caminho (str): Arquivo SQLite de destino.
+
+    Returns:
+        str: O caminho gravado.
+    """
+    from src.modelos.features import ler_limpo, ordem_das_corridas
+
+    resultados = _preparar(ler_limpo(caminho_corrida), COLUNAS_RESULTADOS)
+    classificacao = _preparar(ler_limpo(caminho_quali), COLUNAS_CLASSIFICACAO)
+
+    corridas = pd.concat([resultados[['Ano', 'GP']], classificacao[['Ano', 'GP']]]).drop_duplicates().astype({'Ano': int})
+    corridas.insert(0, 'race_id', ordem_das_corridas(corridas))
+    corridas = corridas.sort_values('race_id').reset_index(drop=True)
+    ids = corridas.set_index(['Ano', 'GP'])['race_id']
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f'{caminho}.{uuid.uuid4().hex}.tmp'
+    try:
+        with sqlite3.connect(temporario) as conexao:
+            conexao.executescript(_ESQUEMA.format(resultados=_definicao(COLUNAS_RESULTADOS),
+                                                  classificacao=_definicao(COLUNAS_CLASSIFICACAO)))
+            conexao.executemany('INSERT INTO corridas VALUES (?, ?, ?)', corridas.itertuples(index=False, name=None))
+            for tabela, df in (('resultados', resultados), ('classificacao', classificacao)):
+                df = df.astype({'Ano': int})
+                df.insert(0, 'race_id', ids.reindex(pd.MultiIndex.from_frame(df[['Ano', 'GP']])).to_numpy())
+                df = df.astype(object).where(df.notna(), None)
+                marcadores = ', '.join('?' * df.shape[1])
+                conexao.executemany(f'INSERT INTO {tabela} VALUES ({marcadores})', df.itertuples(index=False, name=None))
+            conexao.execute("INSERT INTO meta VALUES ('impressao', ?)", (_impressao_do_banco(caminho_quali, caminho_corrida),))
+            conexao.execute('ANALYZE')
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return caminho
+
+
+class BancoF1:
+    """
+    Consultas ao histórico de corridas e classificações gravado por `construir_banco`.
+
+    Os métodos devolvem DataFrames com os nomes de colunas dos dados limpos;
+    corridas são identificadas por (Ano, GP) e ordenadas por `race_id`.
+
+    Args:
+        caminho (str): Arquivo SQLite.
+    """
+
+    def __init__(self, caminho=CAMINHO_BANCO):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(f'file:{caminho}?mode=ro', uri=True, check_same_thread=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def fechar(self):
+        self.conexao.close()
+
+    def consultar(self, sql, parametros=()):
+        """
+        Executa uma consulta somente leitura.
+
+        Args:
+            sql (str): Consulta SQL, com `?` no lugar dos parâmetros.
+            parametros (tuple): Valores dos parâmetros.
+
+        Returns:
+            pd.DataFrame: As linhas devolvidas.
+        """
+        return pd.read_sql_query(sql, self.conexao, params=parametros)
+
+    def impressao(self):
+        """Impressão digital dos dados limpos de que o banco foi montado."""
+        linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = 'impressao'").fetchone()
+        return linha[0] if linha else None
+
+    def race_id(self, ano, gp):
+        """
+        Identificador da corrida (Ano, GP).
+
+        Returns:
+            int or None: O `race_id`, ou None se a corrida não estiver no banco.
+        """
+        linha = self.conexao.execute('SELECT race_id FROM corridas WHERE Ano = ? AND GP = ?', (int(ano), gp)).fetchone()
+        return linha[0] if linha else None
+
+    def corridas(self, ano=None):
+        """
+        Lista as corridas, em ordem.
+
+        Args:
+            ano (int, optional): Só as corridas desta temporada.
+
+        Returns:
+            pd.DataFrame: Colunas 'race_id', 'Ano' e 'GP'.
+        """
+        if ano is None:
+            return self.consultar('SELECT * FROM corridas ORDER BY race_id')
+        return self.consultar('SELECT * FROM corridas WHERE Ano = ? ORDER BY race_id', (int(ano),))
+
+    def resultados_do_gp(self, ano, gp):
+        """
+        Resultado de uma corrida, em ordem de chegada (não classificados no fim).
+
+        Args:
+            ano (int): Temporada.
+            gp (str): Nome do GP como aparece nos dados.
+
+        Returns:
+            pd.DataFrame: As linhas da tabela de resultados; vazio se a corrida não existir.
+        """
+        return self.consultar('SELECT * FROM resultados WHERE Ano = ? AND GP = ? ORDER BY Pos IS NULL, Pos', (int(ano), gp))
+
+    def classificacao_do_gp(self, ano, gp):
+        """
+        Classificação de uma corrida, em ordem de posição (tempos em segundos).
+
+        Args:
+            ano (int): Temporada.
+            gp (str): Nome do GP como aparece nos dados.
+
+        Returns:
+            pd.DataFrame: As linhas da tabela de classificação; vazio se a corrida não existir.
+        """
+        return self.consultar('SELECT * FROM classificacao WHERE Ano = ? AND GP = ? ORDER BY Pos IS NULL, Pos', (int(ano), gp))
+
+    def historico_do_piloto(self, piloto, antes_de=None, n=None):
+        """
+        Resultados de um piloto em ordem de corrida, com a posição de largada na classificação.
+
+        Só entram as corridas em que o piloto aparece na corrida e na
+        classificação, como no merge de `carregar_e_unir_dados`. Uma corrida
+        `antes_de` que ainda não está no banco (como a próxima do calendário) é
+        posicionada pela sua etapa em `calendario.CALENDARIO`; se a etapa for
+        desconhecida, entra a temporada inteira.
+
+        Args:
+            piloto (str): Nome do piloto.
+            antes_de (tuple[int, str], optional): (Ano, GP); só as corridas anteriores a ela.
+            n (int, optional): Só as `n` corridas mais recentes.
+
+        Returns:
+            pd.DataFrame: Colunas 'race_id', 'Ano', 'GP', 'Piloto', 'Construtor', 'Pos_Corrida',
+                'Pontos_Ganhos' e 'Pos_Quali', da mais antiga para a mais recente.
+        """
+        limite = None
+        if antes_de is not None:
+            ano, gp = antes_de
+            limite = self.race_id(ano, gp)
+            if limite is None:
+                limite = self._limite_da_corrida_nova(int(ano), gp)
+        sql = """
+            SELECT r.race_id, r.Ano, r.GP, r.Piloto, r.Construtor, r.Pos AS Pos_Corrida, r.Pontos AS Pontos_Ganhos, c.Pos AS Pos_Quali
+            FROM resultados r JOIN classificacao c ON c.Piloto = r.Piloto AND c.race_id = r.race_id
+            WHERE r.Piloto = ? AND r.race_id < ?
+            ORDER BY r.race_id DESC
+        """
+        parametros = (piloto, limite if limite is not None else np.iinfo(np.int64).max)
+        if n is not None:
+            sql += ' LIMIT ?'
+            parametros += (int(n),)
+        return self.consultar(sql, parametros).iloc[::-1].reset_index(drop=True)
+
+    def _limite_da_corrida_nova(self, ano, gp):
+        """
+        `race_id` a partir do qual as corridas não são anteriores a (ano, gp), que não está no banco.
+
+        As anteriores são as das temporadas passadas e, na mesma temporada, as
+        de etapa anterior à de `gp` no calendário (todas, se `gp` não estiver nele).
+        """
+        from src.scrapers import calendario
+
+        etapa = calendario.rodada(gp, ano)
+        anteriores = [-1]
+        for race_id, ano_corrida, gp_corrida in self.conexao.execute('SELECT race_id, Ano, GP FROM corridas WHERE Ano <= ?', (ano,)):
+            etapa_corrida = calendario.rodada(gp_corrida, ano_corrida)
+            if ano_corrida < ano or etapa is None or (etapa_corrida is not None and etapa_corrida < etapa):
+                anteriores.append(race_id)
+        return max(anteriores) + 1
+
+    def resultados_do_construtor(self, construtor, ano=None):
+        """
+        Resultados de uma equipe, em ordem de corrida.
+
+        Args:
+            construtor (str): Nome do construtor como aparece nos dados (ex.: 'Red Bull Racing-Honda RBPT').
+            ano (int, optional): Só esta temporada.
+
+        Returns:
+            pd.DataFrame: As linhas da tabela de resultados.
+        """
+        if ano is None:
+            return self.consultar('SELECT * FROM resultados WHERE Construtor = ? ORDER BY race_id, Pos IS NULL, Pos', (construtor,))
+        return self.consultar('SELECT * FROM resultados WHERE Construtor = ? AND Ano = ? ORDER BY race_id, Pos IS NULL, Pos',
+                              (construtor, int(ano)))
+
+
+def abrir_banco(caminho=CAMINHO_BANCO, caminho_quali=None, caminho_corrida=None, reconstruir=False):
+    """
+    Abre o banco de consultas, montando-o antes se ele não existir ou se os dados limpos tiverem mudado.
+
+    Args:
+        caminho (str): Arquivo SQLite.
+        caminho_quali (str, optional): CSV ou pasta Parquet de classificação; por padrão, `caminhos_limpos()`.
+        caminho_corrida (str, optional): CSV ou pasta Parquet de corrida; por padrão, `caminhos_limpos()`.
+        reconstruir (bool): Monta o banco de novo mesmo que ele esteja atualizado.
+
+    Returns:
+        BancoF1 or None: O banco aberto, ou None se os dados limpos não existirem.
+    """
+    from src.modelos.features import caminhos_limpos
+
+    padrao_quali, padrao_corrida = caminhos_limpos()
+    caminho_quali = caminho_quali or padrao_quali
+    caminho_corrida = caminho_corrida or padrao_corrida
+    if not (os.path.exists(caminho_quali) and os.path.exists(caminho_corrida)):
+        print("ERRO: Dados limpos não encontrados; rode a limpeza antes de montar o banco de consultas.")
+        return None
+
+    if not reconstruir and os.path.exists(caminho):
+        banco = BancoF1(caminho)
+        if banco.impressao() == _impressao_do_banco(caminho_quali, caminho_corrida):
+            return banco
+        banco.fechar()
+    construir_banco(caminho_quali, caminho_corrida, caminho)
+    return BancoF1(caminho)
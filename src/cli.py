@@ -0,0 +1,421 @@
+"""
+Linha de comando do pipeline de previsão de F1.
+
+Uso:
+    python -m src <subcomando> [opções]
+
+Subcomandos:
+    scrape     Baixa as páginas dos GPs e grava os CSVs brutos.
+    clean      Gera os CSVs limpos a partir dos brutos.
+    features   Monta (ou reaproveita do cache) a matriz de features e a grava em dados/parquet.
+    tune       Busca os melhores hiperparâmetros do XGBoost e os grava.
+    train      Treina o modelo final e o grava no registro (dados/modelos/registro).
+    update     Incorpora ao modelo do registro as corridas novas, continuando o treino (ou do zero, pela política).
+    predict    Prevê a ordem de chegada das corridas de uma temporada.
+    models     Lista as versões do registro de modelos.
+    serve      Sobe o serviço HTTP de previsão a partir da classificação de um GP.
+    evaluate   Avalia o modelo gravado numa temporada.
+    backtest   Avalia o modelo em walk-forward, temporada a temporada ou corrida a corrida.
+    simulate   Simula (Monte Carlo) um GP ou uma temporada: chances de vitória, pódio, pontos e título.
+    export     Exporta um conjunto do armazenamento colunar (dados/parquet) para CSV.
+    query      Consulta o histórico de corridas no banco local indexado (dados/banco).
+    run        Roda o pipeline inteiro (scrape a evaluate), refazendo só as etapas afetadas por mudanças.
+
+Opções gerais (antes do subcomando):
+    --rastreio ARQUIVO  Mede cada etapa (tempo, CPU, pico de memória, linhas e acertos de cache),
+                        imprime um resumo e grava o trace em ARQUIVO (.jsonl ou, com outra
+                        extensão, o formato do Chrome, para chrome://tracing ou ui.perfetto.dev).
+    --perfil ETAPA      Roda a etapa (download, extracao, colunas, uniao, features, momentum,
+                        busca, treino, previsao, avaliacao...) sob o cProfile.
+
+    python -m src --rastreio trace.json --perfil features features --sem-cache
+
+As bibliotecas pesadas (pandas, scikit-learn, XGBoost, lxml) só são
+importadas dentro de cada subcomando.
+"""
+import argparse
+import json
+import os
+import sys
+
+ANO_TESTE = 2024
+OBJETIVOS = ('reg:squarederror', 'rank:pairwise', 'rank:ndcg')
+CODIFICACOES = ('categorica', 'dummies')
+ETAPAS_PIPELINE = ('scrape', 'limpeza_quali', 'limpeza_corrida', 'features', 'tune', 'train', 'evaluate')
+
+
+def cmd_scrape(args):
+    if args.incremental:
+        from src.scrapers.scraper_incremental import main
+    else:
+        from src.scrapers.scraper_completo import main
+    main()
+
+
+def cmd_clean(args):
+    formatos = ('csv', 'parquet') if args.formato == 'ambos' else (args.formato,)
+    if args.tipo in ('corrida', 'todos'):
+        from src.limpeza.limpeza_corrida import limpar_corrida
+        limpar_corrida(tamanho_bloco=args.blocos, formatos=formatos)
+    if args.tipo in ('classificacao', 'todos'):
+        from src.limpeza.limpeza_quali import limpar_quali
+        limpar_quali(tamanho_bloco=args.blocos, formatos=formatos)
+
+
+def cmd_features(args):
+    from src.modelos.features import colunas_de_features, gerar_matriz_features
+
+    df_processado = gerar_matriz_features(usar_cache=not args.sem_cache)
+    if df_processado is None:
+        return 1
+    print(f"Matriz de features: {len(df_processado)} linhas, {len(colunas_de_features(df_processado))} features.")
+    if not args.sem_parquet:
+        from src.armazenamento import colunar
+        print(f"Armazenamento colunar salvo em: {colunar.gravar(df_processado, 'features')}")
+
+
+def cmd_tune(args):
+    from src.modelos.modelo_momentum import main
+    if main(ano_teste=args.ano_teste, n_iter=args.n_iter, n_jobs=args.n_jobs) is None:
+        return 1
+
+
+def cmd_train(args):
+    from src.modelos.previsao import treinar
+
+    params = json.loads(args.params) if args.params else None
+    if treinar(ano_teste=args.ano_teste, n_iter=args.n_iter, params=params, buscar=args.buscar, objetivo=args.objetivo,
+               codificacao=args.codificacao) is None:
+        return 1
+
+
+def cmd_update(args):
+    from src.modelos.atualizacao import atualizar
+
+    politica = {'arvores_por_corrida': args.arvores, 'max_arvores_incrementais': args.max_arvores,
+                'janela_drift': args.janela, 'limite_drift': args.limite_drift}
+    politica = {chave: valor for chave, valor in politica.items() if valor is not None}
+    if atualizar(args.versao, politica=politica, completo=args.completo) is None:
+        return 1
+
+
+def cmd_predict(args):
+    from src.armazenamento.consultas import abrir_banco
+    from src.modelos.features import caminhos_limpos, gerar_matriz_features, impressao_digital
+    from src.modelos.previsao import carregar_modelo, prever
+
+    modelo, metadados = carregar_modelo(versao=args.versao)
+    if modelo is None:
+        return 1
+    df_processado = gerar_matriz_features()
+    if df_processado is None:
+        return 1
+    if metadados.get('impressao') and metadados['impressao'] != impressao_digital(list(caminhos_limpos())):
+        print(f"AVISO: o modelo {metadados['versao']} foi treinado com outros dados ou outro código de features.")
+
+    df_alvo = df_processado[df_processado['Ano'] == args.ano]
+    if args.gp:
+        df_alvo = df_alvo[df_alvo['GP'] == args.gp]
+    if df_alvo.empty:
+        print(f"Nenhuma corrida encontrada para {args.gp or 'a temporada'} {args.ano}.")
+        return 1
+
+    df_resultados = df_alvo[['GP', 'Piloto']].copy()
+    df_resultados['Posicao_Prevista'] = prever(modelo, df_alvo, metadados['features'], metadados.get('vocabulario_equipes'))
+    banco = abrir_banco()
+    for gp, df_gp in df_resultados.groupby('GP', sort=False):
+        df_gp = df_gp.sort_values('Posicao_Prevista')[['Piloto', 'Posicao_Prevista']].head(args.top)
+        if banco is not None:
+            oficial = banco.resultados_do_gp(args.ano, gp).drop_duplicates('Piloto').set_index('Piloto')['Pos']
+            df_gp['Pos_Real'] = df_gp['Piloto'].map(oficial).astype('Int64')
+        print(f"\n{gp} {args.ano}")
+        print(df_gp.to_string(index=False))
+    if banco is not None:
+        banco.fechar()
+
+
+def cmd_models(args):
+    from src.modelos import registro
+
+    versoes = registro.versoes()
+    if not versoes:
+        print(f"Nenhum modelo em {registro.DIRETORIO_REGISTRO}.")
+        return 1
+    atual = registro.versao_atual()
+    for versao in versoes:
+        with open(os.path.join(registro.DIRETORIO_REGISTRO, versao, registro.ARQUIVO_METADADOS), encoding='utf-8') as f:
+            metadados = json.load(f)
+        marca = '*' if versao == atual else ' '
+        if 'corridas_treino' in metadados:
+            atualizacao = metadados['atualizacao']
+            treino = f"corridas={len(metadados['corridas_treino'])} (+{atualizacao['arvores_incrementais']} árvores incrementais)"
+        else:
+            treino = f"ano_teste={metadados.get('ano_teste')}"
+        print(f"{marca} {versao}  {treino}  {len(metadados['features'])} features  "
+              f"construtores={metadados.get('codificacao', 'dummies')}  params={metadados['params']}")
+
+
+def cmd_serve(args):
+    from src.modelos.servico import ServicoPrevisao, servir
+
+    servico = ServicoPrevisao.carregar(versao=args.versao, max_lote=args.max_lote, espera_max_ms=args.espera_ms)
+    if servico is None:
+        return 1
+    servidor = servir(servico.iniciar(), args.host, args.porta)
+    print(f"Modelo {servico.metadados['versao']} servindo em http://{args.host}:{servidor.server_address[1]} (POST /prever, GET /saude)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servico.parar()
+
+
+def cmd_evaluate(args):
+    from src.modelos.previsao import avaliar
+    if avaliar(ano_teste=args.ano) is None:
+        return 1
+
+
+def cmd_backtest(args):
+    from src.modelos.backtest import resumir_backtest, rodar_backtest
+
+    params = json.loads(args.params) if args.params else None
+    df_dobras = rodar_backtest(inicio=args.inicio, fim=args.fim, por=args.por, params=params, processos=args.processos,
+                               objetivo=args.objetivo, codificacao=args.codificacao)
+    if df_dobras is None:
+        return 1
+    resumo = resumir_backtest(df_dobras)
+    print(f"\nMédia em {len(df_dobras)} dobras: MAE {resumo['mae']:.4f}, R² {resumo['r2']:.4f}, "
+          f"vencedor {resumo['acuracia_vencedor']:.2%}, pódio {resumo['acuracia_podio']:.2%}, top 10 {resumo['acuracia_top10']:.2%}, "
+          f"Spearman {resumo['spearman']:.4f}, Kendall {resumo['kendall']:.4f}, NDCG@10 {resumo['ndcg10']:.4f}")
+    print(f"Tempo somado das dobras: {resumo['tempo_total_s']:.1f}s")
+    if args.saida:
+        df_dobras.to_csv(args.saida, index=False, encoding='utf-8-sig')
+        print(f"Métricas por dobra salvas em: {args.saida}")
+
+
+def cmd_simulate(args):
+    from src.modelos import registro
+    from src.modelos.backtest import rodar_backtest
+    from src.modelos.features import gerar_matriz_features
+    from src.modelos.previsao import carregar_modelo, prever
+    from src.modelos.simulacao import ResiduosBootstrap, pontos_por_posicao, simular_gp, simular_temporada
+
+    modelo, metadados = carregar_modelo(versao=args.versao)
+    if modelo is None:
+        return 1
+    df_processado = gerar_matriz_features()
+    if df_processado is None:
+        return 1
+    df_alvo = df_processado[df_processado['Ano'] == args.ano]
+    if args.gp:
+        df_alvo = df_alvo[df_alvo['GP'] == args.gp]
+    if df_alvo.empty:
+        print(f"Nenhuma corrida encontrada para {args.gp or 'a temporada'} {args.ano}.")
+        return 1
+
+    # Os erros sorteados vêm de previsões fora da amostra das temporadas anteriores, de um
+    # modelo com o mesmo objetivo e a mesma codificação do simulado. Sem `params`, as
+    # temporadas que a busca usou não são avaliadas com os hiperparâmetros escolhidos nelas.
+    resultado = rodar_backtest(inicio=args.ano - args.anos_residuos, fim=args.ano - 1, previsoes=True, verbose=0,
+                               objetivo=registro.objetivo(modelo), codificacao=metadados.get('codificacao', 'dummies'))
+    if resultado is None:
+        return 1
+    residuos = ResiduosBootstrap.do_backtest(resultado[1])
+    pontos = pontos_por_posicao(df_processado)
+    previsto = prever(modelo, df_alvo, metadados['features'], metadados.get('vocabulario_equipes'))
+    df_previsoes = df_alvo[['Ano', 'GP', 'Piloto']].assign(Posicao_Prevista=previsto)
+
+    opcoes = {'float_format': '{:.3f}'.format, 'index': False}
+    if args.gp:
+        df_gp = simular_gp(df_previsoes, residuos, pontos, n_simulacoes=args.n, semente=args.semente)
+        print(f"\n{args.gp} {args.ano} ({args.n} simulações)")
+        print(df_gp.head(args.top).to_string(**opcoes))
+        return
+    _, df_pilotos = simular_temporada(df_previsoes, residuos, pontos, n_simulacoes=args.n, semente=args.semente)
+    print(f"\nTemporada {args.ano}: {df_previsoes['GP'].nunique()} corridas, {args.n} simulações")
+    print(df_pilotos.head(args.top).reset_index().to_string(**opcoes))
+
+
+def cmd_export(args):
+    from src.armazenamento import colunar
+
+    if not colunar.existe(args.dataset):
+        print(f"ERRO: O conjunto '{args.dataset}' não existe em {colunar.DIRETORIO_PARQUET}.")
+        return 1
+    caminho = colunar.exportar_csv(args.dataset, args.arquivo, colunas=args.colunas, anos=args.anos)
+    print(f"CSV salvo em: {caminho}")
+
+
+def cmd_query(args):
+    from src.armazenamento.consultas import abrir_banco
+
+    banco = abrir_banco(reconstruir=args.reconstruir)
+    if banco is None:
+        return 1
+    with banco:
+        if args.piloto:
+            antes_de = (args.ano, args.gp) if args.ano and args.gp else None
+            df = banco.historico_do_piloto(args.piloto, antes_de=antes_de, n=args.n)
+        elif args.construtor:
+            df = banco.resultados_do_construtor(args.construtor, args.ano)
+        elif args.ano and args.gp:
+            df = banco.classificacao_do_gp(args.ano, args.gp) if args.classificacao else banco.resultados_do_gp(args.ano, args.gp)
+        else:
+            df = banco.corridas(args.ano)
+    if df.empty:
+        print("Nenhuma linha encontrada.")
+        return 1
+    print(df.to_string(index=False))
+
+
+def cmd_run(args):
+    from src import orquestrador
+
+    config = {'ano_teste': args.ano_teste, 'n_iter': args.n_iter, 'objetivo': args.objetivo, 'codificacao': args.codificacao}
+    if args.plano:
+        for nome, situacao in orquestrador.planejar(config, ate=args.ate, forcar=args.forcar, pular=args.pular):
+            print(f"  {nome:<16}{situacao}")
+        return
+    situacao = orquestrador.executar(config, ate=args.ate, forcar=args.forcar, pular=args.pular, processos=args.processos)
+    if any(s in ('falhou', 'cancelada') for s in situacao.values()):
+        return 1
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='python -m src', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rastreio', metavar='ARQUIVO', help='Mede as etapas e grava o trace (.jsonl ou formato do Chrome)')
+    parser.add_argument('--perfil', metavar='ETAPA', help='Roda essa etapa sob o cProfile')
+    subparsers = parser.add_subparsers(dest='comando', metavar='subcomando', required=True)
+
+    p = subparsers.add_parser('scrape', help='Baixa as páginas e grava os CSVs brutos')
+    p.add_argument('--incremental', action='store_true', help='Baixa apenas corridas novas ou alteradas')
+    p.set_defaults(funcao=cmd_scrape)
+
+    p = subparsers.add_parser('clean', help='Gera os CSVs limpos')
+    p.add_argument('--tipo', choices=['corrida', 'classificacao', 'todos'], default='todos')
+    p.add_argument('--blocos', type=int, metavar='LINHAS', help='Lê os CSVs brutos em blocos desse tamanho, com memória limitada')
+    p.add_argument('--formato', choices=['csv', 'parquet', 'ambos'], default='ambos', help='Saídas a gravar (padrão: ambos)')
+    p.set_defaults(funcao=cmd_clean)
+
+    p = subparsers.add_parser('features', help='Monta a matriz de features')
+    p.add_argument('--sem-cache', action='store_true', help='Recalcula tudo, sem ler nem gravar o cache')
+    p.add_argument('--sem-parquet', action='store_true', help='Não grava a matriz em dados/parquet/features')
+    p.set_defaults(funcao=cmd_features)
+
+    p = subparsers.add_parser('tune', help='Busca os melhores hiperparâmetros')
+    p.add_argument('--ano-teste', type=int, default=ANO_TESTE, help='Primeira temporada fora da busca')
+    p.add_argument('--n-iter', type=int, default=50, help='Combinações sorteadas na primeira etapa')
+    p.add_argument('--n-jobs', type=int, help='Núcleos usados pela busca (padrão: todos)')
+    p.set_defaults(funcao=cmd_tune)
+
+    p = subparsers.add_parser('train', help='Treina e grava o modelo final')
+    p.add_argument('--ano-teste', type=int, default=ANO_TESTE, help='Primeira temporada fora do treino')
+    p.add_argument('--n-iter', type=int, default=50, help='Combinações avaliadas na busca de hiperparâmetros')
+    p.add_argument('--params', help='Hiperparâmetros em JSON; dispensam a busca')
+    p.add_argument('--buscar', action='store_true', help='Refaz a busca mesmo havendo hiperparâmetros gravados')
+    p.add_argument('--objetivo', choices=OBJETIVOS, default=OBJETIVOS[0],
+                   help='Regressão da posição (padrão) ou ranking dos pilotos dentro de cada corrida')
+    p.add_argument('--codificacao', choices=CODIFICACOES, default=CODIFICACOES[0],
+                   help="Construtores como uma coluna categórica de equipes (padrão) ou um dummy por nome de construtor")
+    p.set_defaults(funcao=cmd_train)
+
+    p = subparsers.add_parser('update', help='Incorpora as corridas novas ao modelo gravado')
+    p.add_argument('--versao', help='Versão de partida (padrão: a atual)')
+    p.add_argument('--arvores', type=int, help='Árvores acrescentadas por corrida (padrão: 5)')
+    p.add_argument('--max-arvores', type=int, help='Árvores incrementais acima das quais o modelo é retreinado do zero (padrão: 100)')
+    p.add_argument('--janela', type=int, help='Corridas na média de erro comparada para detectar drift (padrão: 4)')
+    p.add_argument('--limite-drift', type=float, help='Razão de erro, contra a do último treino do zero, que dispara outro (padrão: 1.3)')
+    p.add_argument('--completo', action='store_true', help='Retreina do zero com todas as corridas, sem continuar o modelo')
+    p.set_defaults(funcao=cmd_update)
+
+    p = subparsers.add_parser('predict', help='Prevê a ordem de chegada com o modelo gravado')
+    p.add_argument('--ano', type=int, default=ANO_TESTE)
+    p.add_argument('--gp', help='Nome do GP como aparece nos dados (ex.: Grande_Prêmio_do_Barém)')
+    p.add_argument('--top', type=int, default=10, help='Quantos pilotos mostrar por corrida')
+    p.add_argument('--versao', help='Versão do registro de modelos (padrão: a atual)')
+    p.set_defaults(funcao=cmd_predict)
+
+    p = subparsers.add_parser('models', help='Lista as versões do registro de modelos')
+    p.set_defaults(funcao=cmd_models)
+
+    p = subparsers.add_parser('serve', help='Sobe o serviço HTTP de previsão')
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--porta', type=int, default=8765)
+    p.add_argument('--versao', help='Versão do registro de modelos (padrão: a atual)')
+    p.add_argument('--max-lote', type=int, default=64, help='Maior número de pedidos previstos de uma vez')
+    p.add_argument('--espera-ms', type=float, default=0.0, help='Quanto um pedido espera por outros para formar um lote (padrão: 0, junta só os já na fila)')
+    p.set_defaults(funcao=cmd_serve)
+
+    p = subparsers.add_parser('evaluate', help='Avalia o modelo gravado numa temporada')
+    p.add_argument('--ano', type=int, default=ANO_TESTE)
+    p.set_defaults(funcao=cmd_evaluate)
+
+    p = subparsers.add_parser('backtest', help='Avalia o modelo em walk-forward com janela de treino crescente')
+    p.add_argument('--inicio', type=int, default=2015, help='Primeira temporada testada')
+    p.add_argument('--fim', type=int, default=ANO_TESTE, help='Última temporada testada')
+    p.add_argument('--por', choices=['temporada', 'corrida'], default='temporada', help='Tamanho de cada passo (padrão: temporada)')
+    p.add_argument('--processos', type=int, help='Dobras simultâneas (padrão: uma por núcleo)')
+    p.add_argument('--params', help='Hiperparâmetros em JSON para todas as dobras (padrão: os da última busca a partir de ANO_TESTE, fixos antes)')
+    p.add_argument('--saida', help='CSV onde gravar as métricas de cada dobra')
+    p.add_argument('--objetivo', choices=OBJETIVOS, default=OBJETIVOS[0], help='Objetivo do XGBoost (ver train)')
+    p.add_argument('--codificacao', choices=CODIFICACOES, default=CODIFICACOES[0], help='Codificação dos construtores (ver train)')
+    p.set_defaults(funcao=cmd_backtest)
+
+    p = subparsers.add_parser('simulate', help='Simula um GP ou uma temporada com Monte Carlo')
+    p.add_argument('--ano', type=int, default=ANO_TESTE)
+    p.add_argument('--gp', help='Simula só este GP (padrão: a temporada inteira)')
+    p.add_argument('--n', type=int, default=100_000, help='Número de simulações')
+    p.add_argument('--anos-residuos', type=int, default=3, help='Temporadas anteriores usadas no backtest que fornece os erros')
+    p.add_argument('--semente', type=int, help='Semente do sorteio')
+    p.add_argument('--top', type=int, default=20, help='Quantos pilotos mostrar')
+    p.add_argument('--versao', help='Versão do registro de modelos (padrão: a atual)')
+    p.set_defaults(funcao=cmd_simulate)
+
+    p = subparsers.add_parser('export', help='Exporta um conjunto de dados/parquet para CSV')
+    p.add_argument('dataset', help='corrida, classificacao, corrida_bruto, classificacao_bruto ou features')
+    p.add_argument('arquivo', help='CSV de destino')
+    p.add_argument('--colunas', nargs='+', help='Exporta só estas colunas')
+    p.add_argument('--anos', type=int, nargs='+', help='Exporta só estas temporadas')
+    p.set_defaults(funcao=cmd_export)
+
+    p = subparsers.add_parser('query', help='Consulta o histórico no banco local (dados/banco/f1.sqlite)')
+    p.add_argument('--piloto', help='Histórico do piloto, em ordem de corrida (com --ano e --gp, só antes dessa corrida)')
+    p.add_argument('--construtor', help='Resultados da equipe (com --ano, só nessa temporada)')
+    p.add_argument('--ano', type=int, help='Temporada; sozinho, lista as corridas dela')
+    p.add_argument('--gp', help='Com --ano, mostra o resultado desse GP')
+    p.add_argument('--classificacao', action='store_true', help='Com --ano e --gp, mostra a classificação em vez da corrida')
+    p.add_argument('--n', type=int, help='Com --piloto, só as N corridas mais recentes')
+    p.add_argument('--reconstruir', action='store_true', help='Monta o banco de novo a partir dos dados limpos')
+    p.set_defaults(funcao=cmd_query)
+
+    p = subparsers.add_parser('run', help='Roda o pipeline inteiro, refazendo só o que mudou')
+    p.add_argument('--ate', choices=ETAPAS_PIPELINE, help='Para nesta etapa (roda só ela e as anteriores)')
+    p.add_argument('--forcar', nargs='+', choices=ETAPAS_PIPELINE, default=[], metavar='ETAPA', help='Refaz estas etapas mesmo em dia')
+    p.add_argument('--pular', nargs='+', choices=ETAPAS_PIPELINE, default=[], metavar='ETAPA',
+                   help='Não roda estas etapas (por exemplo scrape, sem rede); usa as saídas que estiverem em disco')
+    p.add_argument('--plano', action='store_true', help='Só mostra o que rodaria')
+    p.add_argument('--processos', type=int, help='Etapas simultâneas (padrão: uma por núcleo)')
+    p.add_argument('--ano-teste', type=int, default=ANO_TESTE)
+    p.add_argument('--n-iter', type=int, default=50, help='Combinações sorteadas na busca de hiperparâmetros')
+    p.add_argument('--objetivo', choices=OBJETIVOS, default=OBJETIVOS[0], help='Objetivo do modelo treinado (ver train)')
+    p.add_argument('--codificacao', choices=CODIFICACOES, default=CODIFICACOES[0], help='Codificação dos construtores (ver train)')
+    p.set_defaults(funcao=cmd_run)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if not (args.rastreio or args.perfil):
+        return args.funcao(args) or 0
+
+    from src.instrumentacao import etapa, rastrear
+    with rastrear(args.rastreio, perfil=args.perfil), etapa(f'comando {args.comando}'):
+        return args.funcao(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
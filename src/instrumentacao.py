@@ -0,0 +1,378 @@
+"""
+Medição das etapas do pipeline: tempo, CPU, pico de memória, linhas e acertos de cache.
+
+Cada etapa é marcada com `etapa`, como gerenciador de contexto ou decorador:
+
+    with etapa('uniao') as e:
+        ...
+        e.linhas(entrada=len(df_quali) + len(df_corrida), saida=len(df))
+
+    @etapa('treino')
+    def treinar_modelo(...):
+        linhas(entrada=len(X))
+        ...
+
+Fora de `rastrear` as marcações não medem nada (só empilham e desempilham
+um objeto). Dentro dele, cada etapa concluída vira um evento com o tempo de
+relógio, o tempo de CPU do processo (todas as threads, inclusive as do
+XGBoost), o pico de memória residente durante a etapa, as linhas de entrada
+e saída e os contadores (por exemplo, 'cache_acertos'). Ao fim, os eventos
+são gravados em JSONL (um por linha) ou no formato de trace do Chrome
+(chrome://tracing ou https://ui.perfetto.dev), e um resumo por etapa é
+impresso. Com `perfil`, uma etapa escolhida roda sob o cProfile.
+
+As etapas podem ser aninhadas. Só as da thread que ativou o rastreio são
+medidas; threads auxiliares (como os downloads do `Coletor`) usam `contar`,
+que vai para a etapa em andamento nessa thread. Processos filhos (busca de
+hiperparâmetros, backtest) não são rastreados: aparecem como a etapa do
+processo pai que os espera.
+"""
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+_rastreador = None
+
+
+def memoria_mb(campo):
+    """'VmRSS' (atual) ou 'VmHWM' (pico) do processo em MB, lidos de /proc; None fora do Linux."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for linha in f:
+                if linha.startswith(campo + ':'):
+                    return int(linha.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def zerar_pico():
+    """
+    Zera o pico de memória do processo (VmHWM), para medir só o que vem depois.
+
+    O `ru_maxrss` não serve para isso: não pode ser zerado e, num processo
+    novo, começa no tamanho do processo pai.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def memoria_pico_mb():
+    """
+    Pico de memória residente do processo, em MB.
+
+    No Linux é o VmHWM, que `zerar_pico` zera; nos demais sistemas, o
+    `ru_maxrss` do processo inteiro (None onde `resource` não existe, como no Windows).
+    """
+    pico = memoria_mb('VmHWM')
+    if pico is not None:
+        return pico
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # O Linux informa em KB; o macOS, em bytes.
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 2**10
+
+
+class Etapa(contextlib.ContextDecorator):
+    """
+    Uma etapa medida. Criada por `etapa`; ver o docstring do módulo.
+
+    Args:
+        nome (str): Nome da etapa no trace e no resumo.
+        **atributos: Informações extras gravadas no evento (ano, tipo de tabela...).
+    """
+
+    def __init__(self, nome, **atributos):
+        self.nome = nome
+        self.atributos = atributos
+        self.linhas_entrada = None
+        self.linhas_saida = None
+        self.contadores = {}
+        self._rastreador = None
+        self._pico = 0.0
+
+    def _recreate_cm(self):
+        # Como decorador, cada chamada da função é uma etapa nova.
+        return Etapa(self.nome, **self.atributos)
+
+    def linhas(self, entrada=None, saida=None):
+        """Registra as linhas de entrada e/ou de saída da etapa."""
+        if entrada is not None:
+            self.linhas_entrada = int(entrada)
+        if saida is not None:
+            self.linhas_saida = int(saida)
+        return self
+
+    def contar(self, contador, n=1):
+        """Soma `n` ao contador `contador` da etapa."""
+        self.contadores[contador] = self.contadores.get(contador, 0) + n
+        return self
+
+    def __enter__(self):
+        pilha = _pilha()
+        pilha.append(self)
+        # Só as etapas da thread que ativou o rastreio são medidas.
+        self._rastreador = _rastreador if _rastreador is not None and pilha is _rastreador._principal else None
+        if self._rastreador is not None:
+            self._rastreador._iniciar(self)
+        return self
+
+    def __exit__(self, *exc):
+        pilha = _pilha()
+        if pilha and pilha[-1] is self:
+            pilha.pop()
+        if self._rastreador is not None:
+            self._rastreador._concluir(self, erro=exc[0] is not None)
+        return False
+
+
+def etapa(nome, **atributos):
+    """
+    Marca uma etapa do pipeline, como gerenciador de contexto (`with etapa('x') as e`) ou decorador (`@etapa('x')`).
+
+    Args:
+        nome (str): Nome da etapa.
+        **atributos: Informações extras gravadas no evento.
+
+    Returns:
+        Etapa: A etapa, que também aceita `linhas` e `contar`.
+    """
+    return Etapa(nome, **atributos)
+
+
+_local = threading.local()
+
+
+def _pilha():
+    if not hasattr(_local, 'pilha'):
+        _local.pilha = []
+    return _local.pilha
+
+
+def _atual():
+    """Etapa mais interna da thread atual ou, numa thread auxiliar, a mais interna da thread principal."""
+    pilha = _pilha()
+    if pilha:
+        return pilha[-1]
+    return _rastreador._principal[-1] if _rastreador is not None and _rastreador._principal else None
+
+
+def linhas(entrada=None, saida=None):
+    """Registra as linhas de entrada e/ou de saída da etapa em andamento (sem etapa, não faz nada)."""
+    atual = _atual()
+    if atual is not None:
+        atual.linhas(entrada, saida)
+
+
+def contar(contador, n=1):
+    """
+    Soma `n` a um contador da etapa em andamento, como 'cache_acertos' e 'cache_falhas'.
+
+    Pode ser chamada de threads auxiliares: sem etapa na própria thread, o
+    contador vai para a etapa em andamento na thread que ativou o rastreio.
+    """
+    atual = _atual()
+    if atual is None:
+        return
+    if _rastreador is None:
+        atual.contar(contador, n)
+        return
+    with _rastreador._trava:
+        atual.contar(contador, n)
+
+
+class Rastreador:
+    """
+    Coleta os eventos das etapas enquanto ativo. Criado e ativado por `rastrear`.
+
+    Args:
+        perfil (str, optional): Nome da etapa a rodar sob o cProfile.
+    """
+
+    def __init__(self, perfil=None):
+        self.perfil = perfil
+        self.eventos = []
+        self.perfilador = cProfile.Profile() if perfil else None
+        self._perfilando = 0
+        self._inicio = time.perf_counter()
+        self._principal = _pilha()
+        self._trava = threading.Lock()
+
+    def _iniciar(self, e):
+        # O pico das etapas abertas é guardado antes de zerar o VmHWM para a nova.
+        pico = memoria_pico_mb() or 0.0
+        for aberta in self._principal[:-1]:
+            aberta._pico = max(aberta._pico, pico)
+        zerar_pico()
+        e._inicio = time.perf_counter()
+        e._inicio_cpu = time.process_time()
+        if e.nome == self.perfil:
+            if self._perfilando == 0:
+                self.perfilador.enable()
+            self._perfilando += 1
+
+    def _concluir(self, e, erro=False):
+        fim, fim_cpu = time.perf_counter(), time.process_time()
+        if e.nome == self.perfil:
+            self._perfilando -= 1
+            if self._perfilando == 0:
+                self.perfilador.disable()
+        # Sem /proc não há como zerar o pico, que fica sendo o do processo até aqui.
+        pico = max(e._pico, memoria_pico_mb() or 0.0) or None
+        for aberta in self._principal:
+            aberta._pico = max(aberta._pico, pico or 0.0)
+        evento = {
+            'etapa': e.nome,
+            'pai': self._principal[-1].nome if self._principal else None,
+            'inicio_s': e._inicio - self._inicio,
+            'tempo_s': fim - e._inicio,
+            'cpu_s': fim_cpu - e._inicio_cpu,
+            'memoria_pico_mb': pico,
+            'memoria_mb': memoria_mb('VmRSS'),
+            'linhas_entrada': e.linhas_entrada,
+            'linhas_saida': e.linhas_saida,
+            'contadores': dict(e.contadores),
+            'erro': erro,
+            'pid': os.getpid(),
+            'thread': threading.get_ident(),
+            **({'atributos': e.atributos} if e.atributos else {}),
+        }
+        with self._trava:
+            self.eventos.append(evento)
+
+    def salvar(self, caminho):
+        """
+        Grava os eventos em `caminho`: JSONL se a extensão for .jsonl, senão no formato de trace do Chrome.
+
+        Args:
+            caminho (str): Arquivo de destino.
+
+        Returns:
+            str: O próprio `caminho`.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            if caminho.endswith('.jsonl'):
+                for evento in self.eventos:
+                    f.write(json.dumps(evento, ensure_ascii=False) + '\n')
+            else:
+                json.dump({'traceEvents': [_evento_chrome(e) for e in self.eventos], 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return caminho
+
+    def resumo(self):
+        """
+        Agrega os eventos por etapa, na ordem em que cada uma apareceu pela primeira vez.
+
+        Returns:
+            list[dict]: Uma linha por etapa com 'etapa', 'chamadas', 'tempo_s', 'cpu_s',
+                'memoria_pico_mb', 'linhas_entrada', 'linhas_saida' e 'contadores' (somas; o pico é o maior).
+        """
+        por_etapa = {}
+        for evento in sorted(self.eventos, key=lambda e: e['inicio_s']):
+            linha = por_etapa.setdefault(evento['etapa'], {
+                'etapa': evento['etapa'], 'chamadas': 0, 'tempo_s': 0.0, 'cpu_s': 0.0, 'memoria_pico_mb': None,
+                'linhas_entrada': None, 'linhas_saida': None, 'contadores': {}})
+            linha['chamadas'] += 1
+            linha['tempo_s'] += evento['tempo_s']
+            linha['cpu_s'] += evento['cpu_s']
+            if evento['memoria_pico_mb'] is not None:
+                linha['memoria_pico_mb'] = max(linha['memoria_pico_mb'] or 0.0, evento['memoria_pico_mb'])
+            for campo in ('linhas_entrada', 'linhas_saida'):
+                if evento[campo] is not None:
+                    linha[campo] = (linha[campo] or 0) + evento[campo]
+            for contador, n in evento['contadores'].items():
+                linha['contadores'][contador] = linha['contadores'].get(contador, 0) + n
+        return list(por_etapa.values())
+
+    def imprimir_resumo(self, arquivo=None):
+        """Imprime `resumo` como tabela (tempos somados entre as chamadas; etapas aninhadas contam também na de fora)."""
+        arquivo = arquivo or sys.stdout
+        print(f"\n{'etapa':<18}{'chamadas':>9}{'tempo (s)':>11}{'CPU (s)':>9}{'pico (MB)':>11}{'entrada':>10}{'saída':>10}  contadores",
+              file=arquivo)
+        for linha in self.resumo():
+            pico = f"{linha['memoria_pico_mb']:.0f}" if linha['memoria_pico_mb'] is not None else '-'
+            entrada = linha['linhas_entrada'] if linha['linhas_entrada'] is not None else '-'
+            saida = linha['linhas_saida'] if linha['linhas_saida'] is not None else '-'
+            contadores = ', '.join(f'{c}={n}' for c, n in linha['contadores'].items())
+            print(f"{linha['etapa']:<18}{linha['chamadas']:>9}{linha['tempo_s']:>11.3f}{linha['cpu_s']:>9.3f}{pico:>11}"
+                  f"{entrada:>10}{saida:>10}  {contadores}", file=arquivo)
+
+    def salvar_perfil(self, caminho=None, n=25):
+        """
+        Grava o perfil da etapa `perfil` (formato do pstats, para snakeviz e afins) e imprime as funções mais caras.
+
+        Args:
+            caminho (str, optional): Arquivo .prof; sem ele, só imprime.
+            n (int): Quantas funções imprimir, pelo tempo acumulado.
+
+        Returns:
+            str or None: O caminho gravado.
+        """
+        if self.perfilador is None:
+            return None
+        saida = io.StringIO()
+        try:
+            estatisticas = pstats.Stats(self.perfilador, stream=saida)
+        except TypeError:
+            print(f"\nA etapa '{self.perfil}' não rodou; nenhum perfil gravado.")
+            return None
+        estatisticas.sort_stats('cumulative').print_stats(n)
+        print(f"\nPerfil da etapa '{self.perfil}':")
+        print(saida.getvalue())
+        if caminho:
+            estatisticas.dump_stats(caminho)
+        return caminho
+
+
+def _evento_chrome(evento):
+    """Evento completo ('X') do formato de trace do Chrome, com tempos em microssegundos."""
+    argumentos = {c: evento[c] for c in ('cpu_s', 'memoria_pico_mb', 'memoria_mb', 'linhas_entrada', 'linhas_saida')
+                  if evento[c] is not None}
+    argumentos.update(evento['contadores'])
+    argumentos.update(evento.get('atributos', {}))
+    return {'name': evento['etapa'], 'ph': 'X', 'ts': evento['inicio_s'] * 1e6, 'dur': evento['tempo_s'] * 1e6,
+            'pid': evento['pid'], 'tid': evento['thread'], 'args': argumentos}
+
+
+@contextlib.contextmanager
+def rastrear(caminho=None, perfil=None, resumo=True):
+    """
+    Ativa a medição das etapas no bloco; ao sair, grava o trace, o perfil e imprime o resumo.
+
+    Args:
+        caminho (str, optional): Arquivo do trace (.jsonl ou, com outra extensão, trace do Chrome).
+        perfil (str, optional): Etapa a rodar sob o cProfile; o perfil vai para `<caminho sem extensão>.<etapa>.prof`.
+        resumo (bool): Imprime a tabela de `Rastreador.imprimir_resumo`.
+
+    Yields:
+        Rastreador: O rastreador ativo.
+    """
+    global _rastreador
+    if _rastreador is not None:
+        raise RuntimeError("Já existe um rastreio ativo neste processo.")
+    rastreador = _rastreador = Rastreador(perfil)
+    try:
+        yield rastreador
+    finally:
+        _rastreador = None
+        if resumo:
+            rastreador.imprimir_resumo()
+        if caminho:
+            print(f"Trace salvo em: {rastreador.salvar(caminho)}")
+        if perfil:
+            arquivo_perfil = f'{os.path.splitext(caminho)[0]}.{perfil}.prof' if caminho else None
+            if rastreador.salvar_perfil(arquivo_perfil):
+                print(f"Perfil salvo em: {arquivo_perfil}")
@@ -0,0 +1,107 @@
+import ast
+
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+
+# Registro único de sinônimos dos cabeçalhos das tabelas da Wikipédia:
+# nome canônico -> variantes encontradas nos CSVs brutos (traduções
+# automáticas, versões em inglês e erros de digitação das páginas).
+SINONIMOS = {
+    'Pos': ['Pos.'],
+    'No': ['Nu.', 'No.', 'Nº', 'N.º', 'N°', 'Num.', 'Não.'],
+    'Piloto': ['Pilotos', 'Driver', 'Motorista'],
+    'Construtor': ['Construtora', 'Equipe', 'Constructor'],
+    'Voltas': ['Voltas\'', 'Laps'],
+    'Tempo/Retirado': ['Tempo/retirada', 'Tempo/Retirada', 'Tempo/Aposentado', 'Tempo/Abandono',
+                       'Tempo/Diferença', 'Time/Retired', 'Tempo'],
+    'Pontos': ['Points', 'Pts.'],
+    'Grid': ['Grade', 'Grid final', 'Final grid', 'Grid 1', 'Grid 2'],
+}
+
+def get_clean_column_name(col):
+    """
+    Limpa nomes de colunas que estão formatados como tuplas em formato string.
+
+    Esta função tenta interpretar a string `col` como uma tupla. Se a conversão for bem-sucedida
+    e o resultado for uma tupla com mais de um elemento, retorna o segundo elemento da tupla
+    (caso ele exista); caso contrário, retorna o primeiro. Se a conversão falhar ou o valor
+    não for uma tupla válida, retorna o valor original.
+
+    Parâmetros:
+    col (str): Nome da coluna, possivelmente representado como string de uma tupla.
+
+    Retorna:
+    str: Nome da coluna limpo (segundo elemento da tupla, se aplicável), ou o valor original.
+    """
+    try:
+        col_tuple = ast.literal_eval(str(col))
+        if isinstance(col_tuple, tuple) and len(col_tuple) > 1:
+            return col_tuple[1] if col_tuple[1] else col_tuple[0]
+    except (ValueError, SyntaxError):
+        return col
+    return col
+
+def mapa_de_renomeacao(sinonimos=SINONIMOS):
+    """
+    Inverte o registro de sinônimos num dicionário variante -> nome canônico.
+
+    Parâmetros:
+    sinonimos (dict): Nome canônico -> lista de variantes.
+
+    Retorna:
+    dict: Variante -> nome canônico, no formato aceito por `DataFrame.rename`.
+    """
+    return {variante: canonico for canonico, variantes in sinonimos.items() for variante in variantes}
+
+def resolver_colunas(colunas, sinonimos=SINONIMOS):
+    """
+    Agrupa as posições das colunas brutas pelo nome canônico a que cada uma corresponde.
+
+    Parâmetros:
+    colunas (Iterable): Cabeçalhos do CSV bruto, possivelmente tuplas em formato string.
+    sinonimos (dict): Nome canônico -> lista de variantes.
+
+    Retorna:
+    dict: Nome canônico -> posições das colunas de origem, na ordem do arquivo.
+    """
+    renomear = mapa_de_renomeacao(sinonimos)
+    posicoes = {}
+    for i, coluna in enumerate(colunas):
+        nome = get_clean_column_name(coluna)
+        posicoes.setdefault(renomear.get(nome, nome), []).append(i)
+    return posicoes
+
+@instrumentacao.etapa('colunas')
+def unificar_colunas(df, colunas_desejadas, sinonimos=SINONIMOS):
+    """
+    Funde as colunas sinônimas do CSV bruto nas colunas canônicas pedidas.
+
+    Cada coluna canônica recebe, linha a linha, o primeiro valor não nulo entre
+    as suas variantes, na ordem em que aparecem no arquivo. Colunas sem nenhuma
+    variante no arquivo saem inteiramente nulas. Os valores ausentes das demais
+    ficam como None, como no antigo `df.T.groupby(level=0).first().T`.
+
+    Parâmetros:
+    df (pd.DataFrame): Dados brutos, lidos com `dtype=str`.
+    colunas_desejadas (list[str]): Nomes canônicos, na ordem de saída.
+    sinonimos (dict): Nome canônico -> lista de variantes.
+
+    Retorna:
+    pd.DataFrame: Apenas as colunas desejadas, com o mesmo índice de `df`.
+    """
+    posicoes = resolver_colunas(df.columns, sinonimos)
+    unificadas = {}
+    for coluna in colunas_desejadas:
+        origem = posicoes.get(coluna)
+        if not origem:
+            unificadas[coluna] = np.nan
+            continue
+        valores = df.iloc[:, origem].to_numpy(dtype=object)
+        preenchidos = pd.notna(valores)
+        primeiro = valores[np.arange(len(valores)), preenchidos.argmax(axis=1)]
+        primeiro[~preenchidos.any(axis=1)] = None
+        unificadas[coluna] = primeiro
+    instrumentacao.linhas(entrada=len(df), saida=len(df))
+    return pd.DataFrame(unificadas, index=df.index)
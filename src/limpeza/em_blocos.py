@@ -0,0 +1,170 @@
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.armazenamento import colunar
+from src.limpeza.colunas import unificar_colunas
+
+TAMANHO_BLOCO = 50_000
+COLUNAS_PREENCHIDAS = ['No', 'Construtor']
+
+# Os CSVs brutos são gravados GP a GP, com todas as temporadas de cada GP em
+# sequência, então uma temporada nunca termina antes do fim do arquivo. Por isso
+# o modo em blocos não guarda temporadas inteiras: ele lê o arquivo duas vezes e
+# mantém só o estado por (Ano, Piloto) que o ffill().bfill() por grupo precisa.
+# A primeira leitura guarda o primeiro valor não nulo de cada grupo (o que o
+# bfill propaga para as linhas iniciais) e a segunda guarda o último valor já
+# visto (o que o ffill propaga).
+
+def _ler_blocos(arquivo_bruto, colunas_desejadas, tamanho_bloco, ao_ler=None):
+    """
+    Lê o CSV bruto em blocos, já reduzidos às colunas canônicas e sem as linhas descartadas pela limpeza.
+
+    Parâmetros:
+    arquivo_bruto (str): Caminho do CSV bruto.
+    colunas_desejadas (list[str]): Colunas canônicas de saída.
+    tamanho_bloco (int): Linhas do CSV bruto lidas por vez.
+    ao_ler (callable, optional): Chamada com cada bloco bruto, antes da redução.
+
+    Retorna:
+    Iterator[pd.DataFrame]: Os blocos filtrados, com o índice da linha no arquivo.
+    """
+    for bloco in pd.read_csv(arquivo_bruto, header=0, dtype=str, chunksize=tamanho_bloco):
+        if ao_ler is not None:
+            ao_ler(bloco)
+        df = unificar_colunas(bloco, colunas_desejadas)
+        df = df.dropna(subset=['Piloto', 'Pos'], how='all')
+        yield df[~df['Piloto'].str.contains('Piloto|Driver', na=False)]
+
+def _chave(df, colunas):
+    """Une as colunas de agrupamento numa chave única por linha; nula se alguma delas for nula."""
+    chave = df[colunas[0]].astype(object)
+    for coluna in colunas[1:]:
+        chave = chave + '\x1f' + df[coluna]
+    return chave
+
+def _atualizar_primeiros(primeiros, df, chave):
+    """Registra o primeiro valor não nulo de cada grupo ainda sem valor conhecido."""
+    for coluna in COLUNAS_PREENCHIDAS:
+        for grupo, valor in df[coluna].groupby(chave).first().items():
+            if pd.notna(valor):
+                primeiros[coluna].setdefault(grupo, valor)
+
+def _preencher(df, chave, primeiros, ultimos):
+    """
+    Aplica ao bloco o ffill().bfill() por (Ano, Piloto), continuando o estado dos blocos anteriores.
+
+    Parâmetros:
+    df (pd.DataFrame): Bloco filtrado.
+    chave (pd.Series): Chave (Ano, Piloto) de cada linha.
+    primeiros (dict): Coluna -> {grupo: primeiro valor não nulo no arquivo}.
+    ultimos (dict): Coluna -> {grupo: último valor não nulo já emitido}; é atualizado.
+
+    Retorna:
+    pd.DataFrame: O bloco com as colunas preenchidas.
+    """
+    df = df.copy()
+    sem_grupo = chave.isna()
+    for coluna in COLUNAS_PREENCHIDAS:
+        valores = df[coluna].groupby(chave).ffill()
+        faltando = valores.isna() & ~sem_grupo
+        if faltando.any():
+            anteriores = chave[faltando].map(ultimos[coluna])
+            anteriores = anteriores.fillna(chave[faltando].map(primeiros[coluna]))
+            valores[faltando] = anteriores
+        valores[sem_grupo] = np.nan
+        ultimos[coluna].update(df[coluna].groupby(chave).last().dropna().to_dict())
+        df[coluna] = valores
+    return df
+
+def _numerar_posicoes(df, contagem):
+    """Preenche 'Pos' com a ordem da linha dentro do GP, continuando a contagem dos blocos anteriores."""
+    chave = _chave(df, ['Ano', 'GP'])
+    deslocamento = chave.map(contagem).fillna(0)
+    ordem = df.groupby(chave).cumcount() + 1 + deslocamento
+    ordem[chave.isna()] = np.nan
+    contagem.update((grupo, contagem.get(grupo, 0) + n) for grupo, n in chave.value_counts().items())
+    df['Pos'] = df['Pos'].fillna(ordem.astype('Int64').astype(object).where(ordem.notna(), np.nan))
+    return df
+
+def limpar_em_blocos(arquivo_bruto, arquivo_limpo, colunas_desejadas, numerar_posicoes=False, tamanho_bloco=TAMANHO_BLOCO,
+                     dataset=None, dataset_bruto=None, diretorio_parquet=colunar.DIRETORIO_PARQUET):
+    """
+    Limpa um CSV bruto em blocos de `tamanho_bloco` linhas, com memória limitada.
+
+    Produz o mesmo arquivo que a limpeza em memória: as colunas sinônimas são
+    unificadas, 'No' e 'Construtor' são preenchidos por (Ano, Piloto) e, se
+    `numerar_posicoes`, a 'Pos' ausente recebe a ordem da linha no GP. As saídas
+    são escritas bloco a bloco e só substituem as anteriores ao final.
+
+    Parâmetros:
+    arquivo_bruto (str): Caminho do CSV bruto gerado pelos scrapers.
+    arquivo_limpo (str or None): Caminho onde o CSV limpo será gravado; None para não gravar CSV.
+    colunas_desejadas (list[str]): Colunas canônicas de saída, na ordem.
+    numerar_posicoes (bool): Preenche 'Pos' ausente com a ordem no GP (usado na classificação).
+    tamanho_bloco (int): Linhas do CSV bruto lidas por vez.
+    dataset (str, optional): Conjunto de dados do armazenamento colunar a gravar também.
+    dataset_bruto (str, optional): Conjunto onde gravar também as linhas brutas, como texto.
+    diretorio_parquet (str): Raiz do armazenamento colunar.
+
+    Retorna:
+    int: Número de linhas gravadas.
+    """
+    ao_ler = None
+    if dataset_bruto:
+        bruto_temporario = f'{dataset_bruto}.{uuid.uuid4().hex}.tmp'
+
+        def ao_ler(bloco):
+            colunar.gravar(bloco, bruto_temporario, esquema=colunar.esquema_bruto(bloco.columns), diretorio=diretorio_parquet, acrescentar=True)
+
+    primeiros = {coluna: {} for coluna in COLUNAS_PREENCHIDAS}
+    try:
+        for df in _ler_blocos(arquivo_bruto, colunas_desejadas, tamanho_bloco, ao_ler):
+            _atualizar_primeiros(primeiros, df, _chave(df, ['Ano', 'Piloto']))
+        if dataset_bruto:
+            colunar.publicar(colunar.caminho_dataset(bruto_temporario, diretorio_parquet), dataset_bruto, diretorio_parquet)
+    finally:
+        if dataset_bruto:
+            shutil.rmtree(colunar.caminho_dataset(bruto_temporario, diretorio_parquet), ignore_errors=True)
+
+    if arquivo_limpo:
+        os.makedirs(os.path.dirname(arquivo_limpo), exist_ok=True)
+        temporario = arquivo_limpo + '.tmp'
+    if dataset:
+        dataset_temporario = f'{dataset}.{uuid.uuid4().hex}.tmp'
+    ultimos = {coluna: {} for coluna in COLUNAS_PREENCHIDAS}
+    contagem = {}
+    linhas = 0
+    try:
+        for df in _ler_blocos(arquivo_bruto, colunas_desejadas, tamanho_bloco):
+            df = _preencher(df, _chave(df, ['Ano', 'Piloto']), primeiros, ultimos)
+            if numerar_posicoes:
+                df = _numerar_posicoes(df, contagem)
+
+            df['Ano'] = pd.to_numeric(df['Ano'], errors='coerce').astype('Int64').astype(str)
+            df['Ano'] = df['Ano'].replace('<NA>', np.nan)
+
+            if arquivo_limpo and linhas == 0:
+                df.to_csv(temporario, index=False, encoding='utf-8-sig')
+            elif arquivo_limpo:
+                df.to_csv(temporario, mode='a', header=False, index=False, encoding='utf-8')
+            if dataset:
+                colunar.gravar(df, dataset_temporario, esquema=colunar.ESQUEMAS[dataset], diretorio=diretorio_parquet, acrescentar=True)
+            linhas += len(df)
+        if arquivo_limpo:
+            if linhas == 0:
+                pd.DataFrame(columns=colunas_desejadas).to_csv(temporario, index=False, encoding='utf-8-sig')
+            os.replace(temporario, arquivo_limpo)
+        if dataset:
+            if linhas == 0:
+                colunar.gravar(pd.DataFrame(columns=colunas_desejadas), dataset_temporario, esquema=colunar.ESQUEMAS[dataset], diretorio=diretorio_parquet)
+            colunar.publicar(colunar.caminho_dataset(dataset_temporario, diretorio_parquet), dataset, diretorio_parquet)
+    finally:
+        if arquivo_limpo and os.path.exists(temporario):
+            os.remove(temporario)
+        if dataset:
+            shutil.rmtree(colunar.caminho_dataset(dataset_temporario, diretorio_parquet), ignore_errors=True)
+    return linhas
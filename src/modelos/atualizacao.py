@@ -0,0 +1,290 @@
+"""
+Atualização incremental do modelo a cada corrida nova.
+
+Em vez de treinar tudo de novo a cada GP, o `Atualizador` continua o booster
+gravado (`xgb.train(..., xgb_model=...)`) só com as linhas da corrida nova,
+acrescentando um número limitado de árvores. Uma corrida tem só uns vinte
+pilotos, e árvores com a taxa de aprendizado e as folhas do treino completo
+decoram essas linhas; por isso as acrescentadas usam uma fração da taxa e um
+peso mínimo por folha maior.
+
+Antes de incorporar uma corrida, o `Atualizador` mede o erro do modelo nela,
+que ainda é fora da amostra. Uma política decide quando o incremental deixa de
+valer e o modelo é retreinado do zero em todas as corridas vistas:
+
+    arvores_por_corrida       Árvores acrescentadas por corrida incorporada.
+    fator_taxa                Fator aplicado ao learning_rate do modelo nas árvores acrescentadas.
+    peso_minimo_folha         min_child_weight das árvores acrescentadas.
+    max_arvores_incrementais  Teto de árvores acrescentadas desde o último treino completo;
+                              a corrida que passaria dele dispara o treino completo.
+    janela_drift              O MAE médio das primeiras `janela_drift` corridas depois de um
+                              treino completo vira a referência; depois disso, a média das
+                              últimas `janela_drift` corridas é comparada com ela.
+    limite_drift              Razão (média recente / referência) acima da qual há drift e o
+                              modelo é retreinado.
+
+As corridas novas são incorporadas em ordem cronológica, a de 'race_id'
+(a etapa do calendário dentro da temporada, ver `ordem_das_corridas`). A versão
+gravada no registro guarda as corridas já vistas ('corridas_treino') e o
+estado da política ('atualizacao'), de modo que a próxima atualização continua
+de onde esta parou.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.modelos import construtores, registro
+from src.modelos.features import caminhos_limpos, colunas_de_features, gerar_matriz_features, impressao_digital, montar_x
+from src.modelos.previsao import relevancia, treinar_modelo
+
+POLITICA_PADRAO = {
+    'arvores_por_corrida': 5,
+    'fator_taxa': 0.3,
+    'peso_minimo_folha': 5,
+    'max_arvores_incrementais': 100,
+    'janela_drift': 4,
+    'limite_drift': 1.3,
+}
+
+
+def motivo_para_retreinar(estado, politica):
+    """
+    Aplica a política ao estado de uma atualização.
+
+    Args:
+        estado (dict): 'arvores_incrementais', 'erros' (MAE de cada corrida incorporada desde
+            o último treino completo, antes de incorporá-la) e 'mae_referencia'.
+        politica (dict): Ver POLITICA_PADRAO.
+
+    Returns:
+        str or None: Por que retreinar do zero, ou None se a atualização incremental basta.
+    """
+    if estado['arvores_incrementais'] + politica['arvores_por_corrida'] > politica['max_arvores_incrementais']:
+        return f"teto de {politica['max_arvores_incrementais']} árvores incrementais"
+    janela, erros, referencia = politica['janela_drift'], estado['erros'], estado['mae_referencia']
+    if referencia is not None and len(erros) > janela:
+        recente = float(np.mean(erros[-janela:]))
+        if recente > politica['limite_drift'] * referencia:
+            return f"drift: MAE {recente:.2f} nas últimas {janela} corridas contra {referencia:.2f}"
+    return None
+
+
+class Atualizador:
+    """
+    Mantém um modelo em dia com as corridas novas da matriz de features.
+
+    Args:
+        booster (xgb.Booster): Modelo atual.
+        features (list[str]): Colunas do modelo, na ordem.
+        params (dict): Hiperparâmetros do modelo (os do treino completo, com `n_estimators`).
+        df (pd.DataFrame): Matriz de features inteira.
+        corridas (list[tuple[int, str]]): (Ano, GP) das corridas já vistas pelo modelo.
+        vocabulario_equipes (list[str], optional): Vocabulário de equipes do modelo.
+        politica (dict, optional): Ver POLITICA_PADRAO; ausentes usam o padrão.
+        estado (dict, optional): Estado gravado pela atualização anterior (`metadados['atualizacao']`).
+        n_jobs (int): Threads do XGBoost; -1 usa todos os núcleos.
+    """
+
+    def __init__(self, booster, features, params, df, corridas, vocabulario_equipes=None, politica=None, estado=None,
+                 n_jobs=-1):
+        self.booster = booster
+        self.features = list(features)
+        self.params = params
+        self.df = df
+        self.corridas = [(int(ano), gp) for ano, gp in corridas]
+        self.vocabulario_equipes = vocabulario_equipes
+        self.politica = {**POLITICA_PADRAO, **(politica or {})}
+        self.n_jobs = n_jobs
+        self.objetivo = registro.objetivo(booster)
+        self.codificacao = construtores.codificacao(self.features)
+        self.estado = estado or self._estado_inicial()
+        self._linhas = df.groupby(['Ano', 'GP'], sort=False).indices
+
+    @classmethod
+    def do_registro(cls, booster, metadados, df, politica=None, **kwargs):
+        """
+        Cria o atualizador a partir de uma versão do registro.
+
+        Versões gravadas pelo `train` não têm 'corridas_treino': as corridas vistas
+        são as das temporadas anteriores ao seu 'ano_teste'.
+
+        Args:
+            booster (xgb.Booster): Modelo aberto com `registro.carregar`.
+            metadados (dict): Metadados da versão.
+            df (pd.DataFrame): Matriz de features inteira.
+            politica (dict, optional): Ver POLITICA_PADRAO.
+            **kwargs: Repassados ao construtor (`n_jobs`).
+
+        Returns:
+            Atualizador: O atualizador.
+        """
+        if 'corridas_treino' in metadados:
+            corridas = metadados['corridas_treino']
+        else:
+            anteriores = df.loc[df['Ano'] < metadados['ano_teste'], ['race_id', 'Ano', 'GP']]
+            corridas = anteriores.drop_duplicates('race_id').sort_values('race_id')[['Ano', 'GP']].itertuples(index=False)
+        estado = metadados.get('atualizacao')
+        return cls(booster, metadados['features'], metadados['params'], df, corridas, metadados.get('vocabulario_equipes'),
+                   politica, estado, **kwargs)
+
+    def _estado_inicial(self):
+        return {'arvores_base': self.booster.num_boosted_rounds(), 'arvores_incrementais': 0,
+                'corridas_incrementais': 0, 'treinos_completos': 0, 'erros': [], 'mae_referencia': None}
+
+    def corridas_novas(self):
+        """(Ano, GP) das corridas da matriz que o modelo ainda não viu, em ordem cronológica ('race_id')."""
+        vistas = set(self.corridas)
+        corridas = self.df[['race_id', 'Ano', 'GP']].drop_duplicates('race_id').sort_values('race_id')
+        return [(int(ano), gp) for _, ano, gp in corridas.itertuples(index=False) if (int(ano), gp) not in vistas]
+
+    def linhas(self, corrida):
+        """Linhas de uma corrida (Ano, GP) na matriz."""
+        return self.df.iloc[self._linhas[corrida]]
+
+    def prever(self, df):
+        """Posição prevista de cada linha de `df` pelo modelo atual."""
+        return registro.prever(self.booster, df, self.features, vocabulario_equipes=self.vocabulario_equipes)
+
+    def _params_nativos(self):
+        params = {chave: valor for chave, valor in self.params.items() if chave != 'n_estimators'}
+        params.update(objective=self.objetivo, seed=42, nthread=self.n_jobs,
+                      max_cat_to_onehot=construtores.MAX_CATEGORIAS_ONEHOT,
+                      learning_rate=params.get('learning_rate', 0.3) * self.politica['fator_taxa'],
+                      min_child_weight=self.politica['peso_minimo_folha'])
+        if self.objetivo == 'rank:ndcg':
+            params['ndcg_exp_gain'] = False
+        return params
+
+    def _entrada(self, df):
+        """
+        Entrada de treino de `df` para continuar o booster.
+
+        O XGBoost guarda no modelo as categorias de 'Equipe' vistas no treino e
+        só continua o treino com uma entrada que traga as mesmas, então a coluna
+        volta a ser categórica, com o vocabulário do modelo.
+        """
+        X = pd.DataFrame(registro.matriz_de_entrada(df, self.features, self.vocabulario_equipes),
+                         columns=self.booster.feature_names, index=df.index)
+        if construtores.COLUNA_EQUIPE in self.features:
+            vocabulario = self.vocabulario_equipes
+            if vocabulario is None:
+                vocabulario = construtores.vocabulario(self.df, self.features)
+            codigos = X[construtores.COLUNA_EQUIPE].fillna(-1).to_numpy(dtype=int)
+            X[construtores.COLUNA_EQUIPE] = pd.Categorical.from_codes(codigos, categories=vocabulario)
+        return X
+
+    def _continuar(self, df):
+        import xgboost as xgb
+
+        y = df['Pos_Corrida'].to_numpy(dtype=float)
+        extras = {}
+        if registro.e_ranking(self.objetivo):
+            grupos = df['race_id'].to_numpy()
+            y, extras['qid'] = relevancia(y, grupos), grupos
+        dtreino = xgb.DMatrix(self._entrada(df), label=y, enable_categorical=True, **extras)
+        arvores = self.politica['arvores_por_corrida']
+        self.booster = xgb.train(self._params_nativos(), dtreino, num_boost_round=arvores, xgb_model=self.booster)
+        self.estado['arvores_incrementais'] += arvores
+        self.estado['corridas_incrementais'] += 1
+
+    def retreinar(self):
+        """Treina do zero em todas as corridas vistas, com os hiperparâmetros do modelo, e zera o estado da política."""
+        indices = np.concatenate([self._linhas[corrida] for corrida in self.corridas])
+        df_treino = self.df.iloc[np.sort(indices)]
+        self.features = colunas_de_features(self.df, self.codificacao)
+        modelo = treinar_modelo(montar_x(df_treino, self.features), df_treino['Pos_Corrida'], self.params,
+                                n_jobs=self.n_jobs, objetivo=self.objetivo, grupos=df_treino['race_id'])
+        self.booster = modelo.get_booster()
+        self.vocabulario_equipes = construtores.vocabulario(self.df, self.features)
+        treinos = self.estado['treinos_completos'] + 1
+        self.estado = {**self._estado_inicial(), 'treinos_completos': treinos}
+
+    def incorporar(self, corrida, completo=False):
+        """
+        Incorpora uma corrida nova: mede o erro do modelo nela e continua o treino ou retreina do zero.
+
+        Args:
+            corrida (tuple[int, str]): (Ano, GP) da corrida.
+            completo (bool): Retreina do zero mesmo que a política não peça.
+
+        Returns:
+            dict: 'corrida', 'mae' (do modelo antes de incorporá-la), 'acao' ('incremental' ou
+                'completo'), 'motivo', 'tempo_s' (da atualização) e 'arvores' (do modelo depois dela).
+        """
+        df = self.linhas(corrida)
+        mae = float(np.abs(self.prever(df) - df['Pos_Corrida'].to_numpy(dtype=float)).mean())
+        self.estado['erros'].append(mae)
+        if self.estado['mae_referencia'] is None and len(self.estado['erros']) == self.politica['janela_drift']:
+            self.estado['mae_referencia'] = float(np.mean(self.estado['erros']))
+        motivo = 'pedido' if completo else motivo_para_retreinar(self.estado, self.politica)
+
+        self.corridas.append(corrida)
+        inicio = time.perf_counter()
+        if motivo:
+            self.retreinar()
+        else:
+            self._continuar(df)
+        return {'corrida': corrida, 'mae': mae, 'acao': 'completo' if motivo else 'incremental', 'motivo': motivo,
+                'tempo_s': time.perf_counter() - inicio, 'arvores': self.booster.num_boosted_rounds()}
+
+    def registrar(self, diretorio=registro.DIRETORIO_REGISTRO):
+        """
+        Grava o modelo atual como uma versão nova do registro, com as corridas vistas e o estado da política.
+
+        Args:
+            diretorio (str): Raiz do registro.
+
+        Returns:
+            str: Pasta da versão gravada.
+        """
+        return registro.registrar(self.booster, self.features, self.params, impressao_digital(list(caminhos_limpos())),
+                                  diretorio, vocabulario_equipes=self.vocabulario_equipes,
+                                  corridas_treino=[[ano, gp] for ano, gp in self.corridas], atualizacao=self.estado)
+
+
+def atualizar(versao=None, diretorio=registro.DIRETORIO_REGISTRO, politica=None, completo=False, verbose=1):
+    """
+    Incorpora ao modelo do registro todas as corridas novas da matriz de features e grava o resultado como versão nova.
+
+    Args:
+        versao (str, optional): Versão de partida; por padrão, a atual.
+        diretorio (str): Raiz do registro.
+        politica (dict, optional): Ver POLITICA_PADRAO.
+        completo (bool): Retreina do zero com todas as corridas, em vez de continuar o modelo.
+        verbose (int): 0 para silencioso; 1 mostra cada corrida incorporada.
+
+    Returns:
+        list[dict] or None: O resultado de `Atualizador.incorporar` para cada corrida nova (vazia se o
+            modelo já estava em dia), ou None se faltar modelo ou dados.
+    """
+    booster, metadados = registro.carregar(versao, diretorio)
+    if booster is None:
+        print(f"ERRO: Nenhum modelo em '{diretorio}'. Rode o treino primeiro.")
+        return None
+    df = gerar_matriz_features()
+    if df is None:
+        return None
+
+    atualizador = Atualizador.do_registro(booster, metadados, df, politica)
+    novas = atualizador.corridas_novas()
+    if not novas:
+        if verbose:
+            print(f"O modelo {metadados['versao']} já viu todas as {len(atualizador.corridas)} corridas da matriz.")
+        return []
+
+    if verbose:
+        print(f"Atualizando {metadados['versao']} com {len(novas)} corrida(s) nova(s)...")
+    resultados = []
+    for i, corrida in enumerate(novas):
+        # Com `completo`, o treino do zero acontece uma vez, na última corrida.
+        resultado = atualizador.incorporar(corrida, completo=completo and i == len(novas) - 1)
+        resultados.append(resultado)
+        if verbose:
+            detalhe = f"completo ({resultado['motivo']})" if resultado['acao'] == 'completo' else 'incremental'
+            print(f"  {corrida[0]} {corrida[1]}: MAE antes {resultado['mae']:.2f}, {detalhe}, "
+                  f"{resultado['arvores']} árvores ({resultado['tempo_s'] * 1000:.0f} ms)")
+    pasta = atualizador.registrar(diretorio)
+    if verbose:
+        print(f"Modelo atualizado salvo em: {pasta}")
+    return resultados
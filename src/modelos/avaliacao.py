@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+
+CHAVES_CORRIDA = ['Ano', 'GP']
+K_NDCG = 10
+
+# Maior bloco de corridas comparadas par a par de uma vez no Kendall (corridas x pilotos x pilotos).
+_CORRIDAS_POR_BLOCO = 4096
+
+
+def _ordem_na_corrida(corrida, valores, inicio):
+    """Posição (0, 1, ...) de cada linha dentro da sua corrida ao ordenar por `valores`; empates ficam na ordem das linhas."""
+    ordem = np.lexsort((valores, corrida))
+    posicao = np.empty(len(ordem), dtype=np.int64)
+    posicao[ordem] = np.arange(len(ordem)) - inicio[corrida[ordem]]
+    return posicao
+
+
+def _spearman(corrida, rank_real, rank_previsto, n_corridas):
+    """Correlação de Pearson entre os ranks médios de cada corrida, com somas por corrida via bincount."""
+    n = np.bincount(corrida, minlength=n_corridas).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_real = np.bincount(corrida, rank_real, n_corridas) / n
+        media_prevista = np.bincount(corrida, rank_previsto, n_corridas) / n
+        desvio_real = rank_real - media_real[corrida]
+        desvio_previsto = rank_previsto - media_prevista[corrida]
+        cov = np.bincount(corrida, desvio_real * desvio_previsto, n_corridas)
+        var_real = np.bincount(corrida, desvio_real ** 2, n_corridas)
+        var_prevista = np.bincount(corrida, desvio_previsto ** 2, n_corridas)
+        return cov / np.sqrt(var_real * var_prevista)
+
+
+def _kendall(corrida, posicao, real, previsto, n_corridas):
+    """
+    Tau-b de Kendall de cada corrida.
+
+    As corridas viram uma matriz (corrida, piloto), preenchida com NaN onde a
+    corrida tem menos pilotos, e todos os pares são comparados de uma vez por
+    bloco de corridas. Pares com empate em um dos lados entram só no
+    denominador do lado sem empate, como em `scipy.stats.kendalltau`.
+    """
+    largura = posicao.max(initial=-1) + 1
+    matriz_real = np.full((n_corridas, largura), np.nan)
+    matriz_prevista = np.full((n_corridas, largura), np.nan)
+    matriz_real[corrida, posicao] = real
+    matriz_prevista[corrida, posicao] = previsto
+
+    acima = np.triu(np.ones((largura, largura), dtype=bool), k=1)
+    tau = np.empty(n_corridas)
+    for inicio in range(0, n_corridas, _CORRIDAS_POR_BLOCO):
+        r = matriz_real[inicio:inicio + _CORRIDAS_POR_BLOCO]
+        p = matriz_prevista[inicio:inicio + _CORRIDAS_POR_BLOCO]
+        # NaN - x dá NaN e np.sign(NaN) é NaN; nan_to_num zera os pares com pilotos inexistentes.
+        sinal_real = np.nan_to_num(np.sign(r[:, :, None] - r[:, None, :])) * acima
+        sinal_previsto = np.nan_to_num(np.sign(p[:, :, None] - p[:, None, :])) * acima
+        concordancia = (sinal_real * sinal_previsto).sum(axis=(1, 2))
+        pares_real = np.abs(sinal_real).sum(axis=(1, 2))
+        pares_previstos = np.abs(sinal_previsto).sum(axis=(1, 2))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tau[inicio:inicio + _CORRIDAS_POR_BLOCO] = concordancia / np.sqrt(pares_real * pares_previstos)
+    return tau
+
+
+def _ndcg(corrida, posicao_real, posicao_prevista, n_corridas, k=K_NDCG):
+    """
+    NDCG@k com relevância linear: o vencedor real vale k, o segundo k - 1, ..., e do (k + 1)-ésimo em diante 0.
+
+    O DCG soma a relevância de cada piloto descontada pela posição prevista;
+    o ideal é o mesmo cálculo com a ordem real.
+    """
+    relevancia = np.maximum(k - posicao_real, 0).astype(float)
+    desconto = 1 / np.log2(np.arange(k) + 2)
+    dentro = posicao_prevista < k
+    dcg = np.bincount(corrida[dentro], relevancia[dentro] * desconto[posicao_prevista[dentro]], n_corridas)
+    ideal_dentro = posicao_real < k
+    ideal = np.bincount(corrida[ideal_dentro], relevancia[ideal_dentro] * desconto[posicao_real[ideal_dentro]], n_corridas)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return dcg / ideal
+
+
+@instrumentacao.etapa('avaliacao')
+def metricas_por_corrida(df, coluna_real='Pos_Corrida', coluna_prevista='Posicao_Prevista', chaves=CHAVES_CORRIDA, k_ndcg=K_NDCG):
+    """
+    Calcula as métricas de ordenação de todas as corridas numa única passada vetorizada.
+
+    Cada corrida é identificada por `chaves` (por padrão, Ano e GP, para que o
+    mesmo GP em temporadas diferentes não se misture). Dentro da corrida, os
+    pilotos são ordenados pela posição real e pela prevista (empates ficam na
+    ordem das linhas); daí saem o acerto do vencedor e os acertos de pódio e
+    top 10. O Spearman usa ranks médios (empates dividem o rank), o Kendall é
+    o tau-b e o NDCG@k dá ao vencedor real relevância k, ao segundo k - 1 e
+    assim por diante.
+
+    Args:
+        df (pd.DataFrame): Uma linha por piloto e corrida, sem valores ausentes nas colunas de posição.
+        coluna_real (str): Posição de chegada real.
+        coluna_prevista (str): Posição prevista (contínua ou inteira; menor é melhor).
+        chaves (list[str]): Colunas que identificam a corrida.
+        k_ndcg (int): Corte do NDCG.
+
+    Returns:
+        pd.DataFrame: Uma linha por corrida (índice `chaves`), com 'pilotos', 'acerto_vencedor',
+            'acertos_podio', 'acertos_top10', 'spearman', 'kendall' e f'ndcg{k_ndcg}'.
+    """
+    chaves = list(chaves)
+    codigos, corridas = pd.MultiIndex.from_frame(df[chaves]).factorize()
+    n_corridas = len(corridas)
+    instrumentacao.linhas(entrada=len(df), saida=n_corridas)
+    real = df[coluna_real].to_numpy(dtype=float)
+    previsto = df[coluna_prevista].to_numpy(dtype=float)
+
+    n = np.bincount(codigos, minlength=n_corridas)
+    inicio = np.concatenate(([0], np.cumsum(n)[:-1]))
+    posicao_real = _ordem_na_corrida(codigos, real, inicio)
+    posicao_prevista = _ordem_na_corrida(codigos, previsto, inicio)
+
+    vencedor = (posicao_real == 0) & (posicao_prevista == 0)
+    podio = (posicao_real < 3) & (posicao_prevista < 3)
+    top10 = (posicao_real < 10) & (posicao_prevista < 10)
+
+    ranks = pd.DataFrame({'corrida': codigos, 'real': real, 'previsto': previsto}).groupby('corrida')[['real', 'previsto']].rank()
+
+    metricas = pd.DataFrame({
+        'pilotos': n,
+        'acerto_vencedor': np.bincount(codigos, vencedor, n_corridas).astype(bool),
+        'acertos_podio': np.bincount(codigos, podio, n_corridas).astype(int),
+        'acertos_top10': np.bincount(codigos, top10, n_corridas).astype(int),
+        'spearman': _spearman(codigos, ranks['real'].to_numpy(), ranks['previsto'].to_numpy(), n_corridas),
+        'kendall': _kendall(codigos, posicao_real, real, previsto, n_corridas),
+        f'ndcg{k_ndcg}': _ndcg(codigos, posicao_real, posicao_prevista, n_corridas, k_ndcg),
+    }, index=pd.MultiIndex.from_tuples(list(corridas), names=chaves) if len(chaves) > 1 else pd.Index(corridas, name=chaves[0]))
+    return metricas
+
+
+def resumir(metricas):
+    """
+    Agrega as métricas por corrida numa temporada (ou em qualquer conjunto de corridas).
+
+    As acurácias de pódio e top 10 contam membros corretos sobre 3 e 10 vagas
+    por corrida; as correlações e o NDCG são médias simples entre as corridas.
+
+    Args:
+        metricas (pd.DataFrame): Saída de `metricas_por_corrida`.
+
+    Returns:
+        dict: 'corridas', 'acertos_vencedor', 'acertos_podio', 'acertos_top10', as acurácias
+            correspondentes e as médias de 'spearman', 'kendall' e do NDCG.
+    """
+    corridas = len(metricas)
+    coluna_ndcg = next(c for c in metricas.columns if c.startswith('ndcg'))
+    return {
+        'corridas': corridas,
+        'acertos_vencedor': int(metricas['acerto_vencedor'].sum()),
+        'acertos_podio': int(metricas['acertos_podio'].sum()),
+        'acertos_top10': int(metricas['acertos_top10'].sum()),
+        'acuracia_vencedor': metricas['acerto_vencedor'].mean(),
+        'acuracia_podio': metricas['acertos_podio'].sum() / (3 * corridas),
+        'acuracia_top10': metricas['acertos_top10'].sum() / (10 * corridas),
+        'spearman': metricas['spearman'].mean(),
+        'kendall': metricas['kendall'].mean(),
+        coluna_ndcg: metricas[coluna_ndcg].mean(),
+    }
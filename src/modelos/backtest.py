@@ -0,0 +1,200 @@
+"""
+Backtest walk-forward: o modelo é treinado e avaliado de novo em cada temporada
+(ou em cada corrida) de um intervalo, sempre só com o que veio antes.
+
+As dobras rodam num pool de processos. Cada processo abre a matriz de
+features pelo cache em disco (memory mapping, sem recalcular nem receber a
+matriz por pickle) e atende uma única dobra, de modo que o pico de memória
+medido é o da dobra.
+"""
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+from src.modelos.avaliacao import metricas_por_corrida, resumir
+from src.modelos.features import colunas_de_features, gerar_matriz_features, montar_x
+
+INICIO_PADRAO = 2015
+FIM_PADRAO = 2024
+
+# Hiperparâmetros fixos das dobras que a busca gravada não pode avaliar: as
+# temporadas anteriores ao seu `ano_teste` foram treino ou validação da busca.
+PARAMS_SEM_BUSCA = {'n_estimators': 100, 'max_depth': 3, 'learning_rate': 0.1}
+
+_matriz = None
+
+
+def dobras_walk_forward(df, inicio=INICIO_PADRAO, fim=FIM_PADRAO, por='temporada'):
+    """
+    Lista as dobras walk-forward com janela de treino crescente.
+
+    Com `por='temporada'`, cada temporada de `inicio` a `fim` é testada com um
+    modelo treinado em todas as anteriores. Com `por='corrida'`, cada corrida
+    dessas temporadas é testada com um modelo treinado em todas as corridas
+    anteriores a ela, na ordem cronológica de 'race_id' (a etapa do
+    calendário dentro da temporada, ver `ordem_das_corridas`).
+
+    Args:
+        df (pd.DataFrame): Matriz de features, com 'Ano', 'GP' e 'race_id'.
+        inicio (int): Primeira temporada testada.
+        fim (int): Última temporada testada.
+        por (str): 'temporada' ou 'corrida'.
+
+    Returns:
+        list[dict]: Uma dobra por item, com 'dobra' (rótulo), 'ano' e, no modo por corrida, 'race_id'.
+    """
+    anos = sorted(int(a) for a in df['Ano'].unique() if inicio <= a <= fim)
+    if por == 'temporada':
+        return [{'dobra': str(ano), 'ano': ano} for ano in anos if (df['Ano'] < ano).any()]
+    if por == 'corrida':
+        corridas = df.loc[df['Ano'].isin(anos), ['race_id', 'Ano', 'GP']].drop_duplicates('race_id').sort_values('race_id')
+        return [{'dobra': f'{ano} {gp}', 'ano': int(ano), 'race_id': int(race_id)}
+                for race_id, ano, gp in corridas.itertuples(index=False) if (df['race_id'] < race_id).any()]
+    raise ValueError(f"por deve ser 'temporada' ou 'corrida', não {por!r}.")
+
+
+def _mascaras(df, dobra):
+    if 'race_id' in dobra:
+        ordem = df['race_id'].to_numpy()
+        return ordem < dobra['race_id'], ordem == dobra['race_id']
+    anos = df['Ano'].to_numpy()
+    return anos < dobra['ano'], anos == dobra['ano']
+
+
+def _iniciar_processo(config):
+    global _matriz
+    _matriz = gerar_matriz_features(config)
+
+
+def _rodar_dobra(dobra, params, n_threads, guardar_previsoes=False, objetivo='reg:squarederror', codificacao='categorica'):
+    """Treina e avalia uma dobra no processo atual, sobre a matriz aberta por `_iniciar_processo`."""
+    from src.modelos.previsao import prever, treinar_modelo
+
+    inicio = time.perf_counter()
+    treino, teste = _mascaras(_matriz, dobra)
+    df_treino, df_teste = _matriz[treino], _matriz[teste]
+    features = colunas_de_features(_matriz, codificacao)
+
+    modelo = treinar_modelo(montar_x(df_treino, features), df_treino['Pos_Corrida'], params, n_jobs=n_threads,
+                            objetivo=objetivo, grupos=df_treino['race_id'])
+    previsto = prever(modelo, df_teste, features)
+
+    real = df_teste['Pos_Corrida'].to_numpy(dtype=float)
+    erro = previsto - real
+    df_resultados = df_teste[['Ano', 'GP', 'Pos_Corrida']].assign(Posicao_Prevista=previsto)
+    resumo = resumir(metricas_por_corrida(df_resultados))
+    return {
+        'dobra': dobra['dobra'],
+        'linhas_treino': int(treino.sum()),
+        'linhas_teste': int(teste.sum()),
+        'mae': float(np.abs(erro).mean()),
+        'rmse': float(np.sqrt((erro ** 2).mean())),
+        'r2': float(1 - (erro ** 2).sum() / ((real - real.mean()) ** 2).sum()),
+        'corridas': resumo['corridas'],
+        'acuracia_vencedor': resumo['acuracia_vencedor'],
+        'acuracia_podio': resumo['acuracia_podio'],
+        'acuracia_top10': resumo['acuracia_top10'],
+        'spearman': resumo['spearman'],
+        'kendall': resumo['kendall'],
+        'ndcg10': resumo['ndcg10'],
+        'tempo_s': time.perf_counter() - inicio,
+        'memoria_pico_mb': instrumentacao.memoria_pico_mb(),
+        'previsoes': df_teste[['Ano', 'GP', 'Piloto', 'Pos_Corrida']].assign(Posicao_Prevista=previsto) if guardar_previsoes else None,
+    }
+
+
+@instrumentacao.etapa('backtest')
+def rodar_backtest(inicio=INICIO_PADRAO, fim=FIM_PADRAO, por='temporada', params=None, processos=None, config=None, verbose=1,
+                   previsoes=False, objetivo='reg:squarederror', codificacao='categorica'):
+    """
+    Roda o backtest walk-forward em paralelo e devolve as métricas de cada dobra.
+
+    Os núcleos são divididos como na busca de hiperparâmetros: com n núcleos
+    e k processos, cada XGBoost usa n // k threads. Cada processo atende uma
+    única dobra e é substituído em seguida, então 'memoria_pico_mb' é o pico
+    da própria dobra (leitura da matriz, treino e previsão). O tempo de cada
+    dobra não inclui a partida do processo nem a abertura da matriz.
+
+    Args:
+        inicio (int): Primeira temporada testada.
+        fim (int): Última temporada testada.
+        por (str): 'temporada' ou 'corrida' (ver `dobras_walk_forward`).
+        params (dict, optional): Hiperparâmetros do XGBoost para todas as dobras. Por padrão, as
+            temporadas a partir de ANO_TESTE usam os da última busca para ANO_TESTE e as
+            anteriores, que a busca usou para treinar e validar, usam PARAMS_SEM_BUSCA.
+        processos (int, optional): Processos simultâneos; por padrão, um por núcleo (limitado ao número de dobras).
+        config (dict, optional): Parâmetros das features; ausentes usam CONFIG_PADRAO.
+        verbose (int): 0 para silencioso; 1 mostra cada dobra ao terminar.
+        previsoes (bool): Devolve também as previsões fora da amostra de todas as dobras.
+        objetivo (str): Objetivo do XGBoost ('reg:squarederror', 'rank:pairwise' ou 'rank:ndcg').
+        codificacao (str): Codificação dos construtores ('categorica' ou 'dummies', ver `construtores`).
+
+    Returns:
+        pd.DataFrame or None: Uma linha por dobra, ou None se os dados não existirem. Com
+            `previsoes`, uma tupla (dobras, previsões), as previsões com 'Ano', 'GP', 'Piloto',
+            'Pos_Corrida' e 'Posicao_Prevista'.
+    """
+    from src.modelos.modelo_momentum import carregar_melhores_parametros
+    from src.modelos.previsao import ANO_TESTE
+
+    # Garante a matriz no cache antes de abrir os processos, que só a leem de lá.
+    df = gerar_matriz_features(config)
+    if df is None:
+        return None
+    dobras = dobras_walk_forward(df, inicio, fim, por)
+    if not dobras:
+        print(f"Nenhuma dobra entre {inicio} e {fim}: é preciso ao menos uma temporada anterior para treinar.")
+        return None
+    if params is None:
+        buscados = carregar_melhores_parametros(ANO_TESTE)
+        params_das_dobras = [buscados if buscados and dobra['ano'] >= ANO_TESTE else PARAMS_SEM_BUSCA for dobra in dobras]
+        if verbose and buscados and any(dobra['ano'] < ANO_TESTE for dobra in dobras):
+            print(f"Dobras antes de {ANO_TESTE} usam {PARAMS_SEM_BUSCA}: a busca gravada treinou e validou nessas temporadas.")
+    else:
+        params_das_dobras = [params] * len(dobras)
+    del df
+
+    n_nucleos = os.cpu_count() or 1
+    n_processos = min(processos or n_nucleos, len(dobras))
+    n_threads = max(1, n_nucleos // n_processos)
+    if verbose:
+        print(f"Backtest por {por} ({objetivo}, construtores: {codificacao}): {len(dobras)} dobras, {n_processos} processos com {n_threads} thread(s) cada.")
+
+    contexto = multiprocessing.get_context('spawn')
+    linhas = []
+    with contexto.Pool(n_processos, initializer=_iniciar_processo, initargs=(config,), maxtasksperchild=1) as pool:
+        tarefas = [pool.apply_async(_rodar_dobra, (dobra, params_dobra, n_threads, previsoes, objetivo, codificacao))
+                   for dobra, params_dobra in zip(dobras, params_das_dobras)]
+        for tarefa in tarefas:
+            linha = tarefa.get()
+            linhas.append(linha)
+            if verbose:
+                memoria = f"{linha['memoria_pico_mb']:.0f} MB" if linha['memoria_pico_mb'] is not None else '-'
+                print(f"  {linha['dobra']}: MAE {linha['mae']:.3f}, vencedor {linha['acuracia_vencedor']:.0%}, "
+                      f"Spearman {linha['spearman']:.3f} ({linha['tempo_s']:.1f}s, {memoria})")
+    previsoes_das_dobras = [linha.pop('previsoes') for linha in linhas]
+    df_dobras = pd.DataFrame(linhas)
+    return (df_dobras, pd.concat(previsoes_das_dobras, ignore_index=True)) if previsoes else df_dobras
+
+
+def resumir_backtest(df_dobras):
+    """
+    Média das métricas das dobras, ponderada pelo número de corridas (ou de linhas, nas de regressão).
+
+    Args:
+        df_dobras (pd.DataFrame): Saída de `rodar_backtest`.
+
+    Returns:
+        dict: Médias das métricas, tempo total e maior pico de memória.
+    """
+    por_linha = ['mae', 'rmse', 'r2']
+    por_corrida = ['acuracia_vencedor', 'acuracia_podio', 'acuracia_top10', 'spearman', 'kendall', 'ndcg10']
+    resumo = {c: float(np.average(df_dobras[c], weights=df_dobras['linhas_teste'])) for c in por_linha}
+    resumo.update({c: float(np.average(df_dobras[c], weights=df_dobras['corridas'])) for c in por_corrida})
+    resumo['tempo_total_s'] = float(df_dobras['tempo_s'].sum())
+    resumo['memoria_pico_mb'] = float(df_dobras['memoria_pico_mb'].max()) if df_dobras['memoria_pico_mb'].notna().any() else None
+    return resumo
@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_CACHE_FEATURES = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'cache', 'features'))
+
+
+class CacheFeatures:
+    """
+    Cache em disco da matriz de features, em formato colunar binário.
+
+    Cada matriz ocupa uma pasta `<chave>/` com um arquivo `.npy` por coluna e
+    um `meta.json` com os nomes, os tipos e a ordem das colunas. Colunas
+    numéricas e booleanas são abertas com memory mapping (somente leitura),
+    sem copiar nem converter os dados; colunas de texto são gravadas como
+    texto de largura fixa, com uma máscara para os valores ausentes, e voltam
+    a ser `object` na leitura. Colunas categóricas guardam só os códigos, com
+    as categorias no `meta.json`, e voltam categóricas.
+
+    Args:
+        diretorio (str): Pasta onde as matrizes são gravadas.
+        manter (int): Quantas matrizes manter; as usadas há mais tempo são removidas.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE_FEATURES, manter=8):
+        self.diretorio = diretorio
+        self.manter = manter
+
+    def _pasta(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def ler(self, chave):
+        """
+        Abre a matriz gravada sob `chave`.
+
+        Args:
+            chave (str): Impressão digital dos dados e da configuração.
+
+        Returns:
+            pd.DataFrame or None: A matriz, ou None se a chave não estiver em cache.
+        """
+        pasta = self._pasta(chave)
+        try:
+            with open(os.path.join(pasta, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        colunas = {}
+        for i, coluna in enumerate(meta['colunas']):
+            valores = np.load(os.path.join(pasta, f'{i}.npy'), mmap_mode='r').view(np.ndarray)
+            if coluna['tipo'] == 'texto':
+                ausentes = np.load(os.path.join(pasta, f'{i}.ausentes.npy'))
+                valores = valores.astype(object)
+                valores[ausentes] = np.nan
+            elif coluna['tipo'] == 'categoria':
+                valores = pd.Categorical.from_codes(valores, categories=coluna['categorias'])
+            colunas[coluna['nome']] = valores
+        indice = pd.Index(np.load(os.path.join(pasta, 'indice.npy')))
+        os.utime(pasta)
+        return pd.DataFrame(colunas, index=indice, copy=False)
+
+    def salvar(self, chave, df):
+        """
+        Grava a matriz sob `chave`, de forma atômica.
+
+        Args:
+            chave (str): Impressão digital dos dados e da configuração.
+            df (pd.DataFrame): Matriz de features com colunas numéricas, booleanas, categóricas ou de texto.
+        """
+        pasta = self._pasta(chave)
+        temporaria = f'{pasta}.{threading.get_ident()}.tmp'
+        shutil.rmtree(temporaria, ignore_errors=True)
+        os.makedirs(temporaria)
+
+        meta = {'colunas': []}
+        for i, (nome, serie) in enumerate(df.items()):
+            extras = {}
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                valores = serie.cat.codes.to_numpy()
+                tipo = 'categoria'
+                extras['categorias'] = [str(c) for c in serie.cat.categories]
+            elif serie.dtype == object:
+                ausentes = serie.isna().to_numpy()
+                valores = serie.where(~ausentes, '').astype(str).to_numpy(dtype=str)
+                np.save(os.path.join(temporaria, f'{i}.ausentes.npy'), ausentes)
+                tipo = 'texto'
+            else:
+                valores = serie.to_numpy()
+                tipo = str(valores.dtype)
+            np.save(os.path.join(temporaria, f'{i}.npy'), valores)
+            meta['colunas'].append({'nome': nome, 'tipo': tipo, **extras})
+        np.save(os.path.join(temporaria, 'indice.npy'), df.index.to_numpy())
+        with open(os.path.join(temporaria, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        shutil.rmtree(pasta, ignore_errors=True)
+        os.replace(temporaria, pasta)
+        self.despejar()
+
+    def despejar(self):
+        """
+        Remove as matrizes menos usadas recentemente, mantendo no máximo `manter`.
+
+        Returns:
+            int: Número de matrizes removidas.
+        """
+        pastas = [os.path.join(self.diretorio, nome) for nome in os.listdir(self.diretorio) if not nome.endswith('.tmp')]
+        antigas = sorted(pastas, key=os.path.getmtime)[:max(len(pastas) - self.manter, 0)]
+        for pasta in antigas:
+            shutil.rmtree(pasta, ignore_errors=True)
+        return len(antigas)
@@ -0,0 +1,213 @@
+"""
+Codificação dos construtores na entrada do modelo.
+
+A mesma equipe muda de nome a cada troca de patrocinador ou de motor
+('Toro Rosso-Renault', 'AlphaTauri-Honda', 'RB-Honda RBPT'), e um one-hot
+dos nomes como vieram espalha cada equipe por várias colunas quase sempre
+zeradas. A matriz de features guarda os construtores em duas colunas
+categóricas: 'Construtor', o nome original, e 'Equipe', a linhagem (`linhagem`).
+A codificação que vai para o modelo é escolhida no treino:
+
+    categorica  Uma só coluna 'Equipe', com os códigos das categorias, tratada
+                como categórica nativa pelo XGBoost. É o padrão.
+    dummies     Uma coluna 0/1 por nome original de construtor ('Construtor_<nome>'),
+                o formato dos modelos gravados antes desta codificação.
+
+O vocabulário (as categorias de 'Equipe' ou os nomes dos dummies) é o do
+treino e fica nos metadados do registro; a previsão codifica as linhas novas
+com ele, de modo que a entrada não depende de quais linhas estão sendo
+previstas. Um construtor fora do vocabulário vira ausente na codificação
+categórica e zeros nos dummies.
+"""
+import numpy as np
+import pandas as pd
+
+COLUNA_CONSTRUTOR = 'Construtor'
+COLUNA_EQUIPE = 'Equipe'
+PREFIXO_CONSTRUTOR = 'Construtor_'
+CODIFICACOES = ('categorica', 'dummies')
+CODIFICACAO_PADRAO = CODIFICACOES[0]
+
+# Com até este número de equipes, cada divisão da árvore separa uma equipe das
+# demais, como faria um dummy; acima dele o XGBoost particiona as categorias,
+# que é o que escala para dezenas de milhares de equipes mas sobreajusta com poucas.
+MAX_CATEGORIAS_ONEHOT = 32
+
+# Chassi (o nome sem o motor) -> equipe atual da mesma linhagem.
+LINHAGENS = {
+    'Red Bull Racing': 'Red Bull',
+    'Toro Rosso': 'Racing Bulls',
+    'Scuderia Toro Rosso': 'Racing Bulls',
+    'STR': 'Racing Bulls',
+    'AlphaTauri': 'Racing Bulls',
+    'Alpha Tauri': 'Racing Bulls',
+    'RB': 'Racing Bulls',
+    'Force India': 'Aston Martin',
+    'Racing Point': 'Aston Martin',
+    'Lotus': 'Alpine',
+    'Renault': 'Alpine',
+    'Sauber': 'Sauber',
+    'Alfa Romeo': 'Sauber',
+    'Alfa Romeo Racing': 'Sauber',
+    'Kick Sauber': 'Sauber',
+    'Marussia': 'Manor',
+    'Manor Marussia': 'Manor',
+    'MRT': 'Manor',
+    'Scuderia Ferrari': 'Ferrari',
+}
+
+
+def linhagem(nome):
+    """
+    Equipe atual da linhagem de um construtor.
+
+    O motor (o que vem depois do '-') é descartado e o chassi é trocado pelo
+    nome atual da equipe segundo LINHAGENS; chassis fora dela ficam como estão.
+
+    Args:
+        nome (str): Nome do construtor como veio das páginas, por exemplo 'AlphaTauri-Honda RBPT'.
+
+    Returns:
+        str: A equipe, por exemplo 'Racing Bulls'.
+    """
+    chassi = str(nome).replace('\ufeff', '').strip(' ]').split('-')[0].strip()
+    return LINHAGENS.get(chassi, chassi)
+
+
+def equipes(construtores):
+    """
+    Linhagem de cada construtor, como categoria com as equipes em ordem alfabética.
+
+    `linhagem` roda uma vez por nome distinto, não por linha.
+
+    Args:
+        construtores (pd.Series): Nomes originais dos construtores.
+
+    Returns:
+        pd.Series: Série categórica com o mesmo índice.
+    """
+    construtores = construtores.astype('category')
+    nomes = [linhagem(nome) for nome in construtores.cat.categories]
+    # O código -1 (construtor ausente) pega o None do fim.
+    valores = np.array(nomes + [None], dtype=object)[construtores.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical(valores, categories=sorted(set(nomes))), index=construtores.index)
+
+
+def colunas(df, codificacao=CODIFICACAO_PADRAO):
+    """
+    Colunas de construtor que entram no modelo.
+
+    Args:
+        df (pd.DataFrame): Matriz de features, com 'Construtor' e 'Equipe'.
+        codificacao (str): Uma de CODIFICACOES.
+
+    Returns:
+        list[str]: ['Equipe'] na codificação categórica; 'Construtor_<nome>' para cada
+            construtor de `df`, em ordem alfabética, nos dummies.
+    """
+    if codificacao not in CODIFICACOES:
+        raise ValueError(f"codificacao deve ser uma de {CODIFICACOES}, não {codificacao!r}.")
+    if codificacao == 'categorica':
+        return [COLUNA_EQUIPE]
+    return [PREFIXO_CONSTRUTOR + nome for nome in sorted(df[COLUNA_CONSTRUTOR].dropna().unique())]
+
+
+def e_coluna_de_construtor(nome):
+    """Indica se a feature `nome` é uma das colunas de construtor ('Equipe' ou um dummy)."""
+    return nome == COLUNA_EQUIPE or nome.startswith(PREFIXO_CONSTRUTOR)
+
+
+def codificacao(features):
+    """Codificação de uma lista de features: 'categorica' se ela tem 'Equipe', senão 'dummies'."""
+    return 'categorica' if COLUNA_EQUIPE in features else 'dummies'
+
+
+def vocabulario(df, features):
+    """
+    Vocabulário de equipes a gravar com o modelo.
+
+    Args:
+        df (pd.DataFrame): Matriz de features usada no treino.
+        features (list[str]): Colunas do modelo.
+
+    Returns:
+        list[str] or None: As categorias de 'Equipe', na ordem dos códigos, ou None nos dummies.
+    """
+    if COLUNA_EQUIPE not in features:
+        return None
+    return [str(nome) for nome in df[COLUNA_EQUIPE].cat.categories]
+
+
+def _indices(vocabulario, valores):
+    """Posição de cada valor em `vocabulario` (-1 se estiver fora), resolvida por categoria quando a série é categórica."""
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        por_categoria = np.append(vocabulario.get_indexer(valores.cat.categories), -1)
+        return por_categoria[valores.cat.codes.to_numpy()]
+    return vocabulario.get_indexer(valores)
+
+
+def dummies(construtores, nomes):
+    """
+    One-hot dos construtores sobre um vocabulário fixo.
+
+    Args:
+        construtores (pd.Series): Nomes originais dos construtores.
+        nomes (list[str]): Vocabulário, na ordem das colunas.
+
+    Returns:
+        pd.DataFrame: Uma coluna booleana 'Construtor_<nome>' por nome, com o índice de `construtores`.
+    """
+    indices = _indices(pd.Index(nomes), construtores)
+    valores = np.zeros((len(construtores), len(nomes)), dtype=bool)
+    conhecidos = indices >= 0
+    valores[np.flatnonzero(conhecidos), indices[conhecidos]] = True
+    return pd.DataFrame(valores, index=construtores.index, columns=[PREFIXO_CONSTRUTOR + nome for nome in nomes])
+
+
+class Codificador:
+    """
+    Escreve a codificação dos construtores numa matriz de entrada já alocada.
+
+    As posições das colunas são resolvidas na criação, de modo que o serviço
+    de previsão reaproveita o mesmo codificador em todos os lotes.
+
+    Args:
+        features (list[str]): Colunas do modelo, na ordem.
+        vocabulario_equipes (list[str], optional): Categorias de 'Equipe' no treino, na ordem
+            dos códigos (`metadados['vocabulario_equipes']`); sem ele, valem as da própria coluna.
+    """
+
+    def __init__(self, features, vocabulario_equipes=None):
+        posicao = {nome: j for j, nome in enumerate(features)}
+        self.posicao_equipe = posicao.get(COLUNA_EQUIPE)
+        self.equipes = None if vocabulario_equipes is None else pd.Index(vocabulario_equipes)
+        nomes = [nome[len(PREFIXO_CONSTRUTOR):] for nome in features if nome.startswith(PREFIXO_CONSTRUTOR)]
+        self.construtores = pd.Index(nomes)
+        self.posicoes_construtor = np.array([posicao[PREFIXO_CONSTRUTOR + nome] for nome in nomes], dtype=np.intp)
+
+    def codigos_equipe(self, df):
+        """Código de 'Equipe' de cada linha (NaN fora do vocabulário); sem a coluna, ela é derivada de 'Construtor'."""
+        if COLUNA_EQUIPE in df:
+            serie = df[COLUNA_EQUIPE]
+        elif COLUNA_CONSTRUTOR in df:
+            serie = equipes(df[COLUNA_CONSTRUTOR])
+        else:
+            return np.full(len(df), np.nan)
+        codigos = serie.cat.codes.to_numpy() if self.equipes is None else _indices(self.equipes, serie)
+        return np.where(codigos >= 0, codigos, np.nan)
+
+    def preencher(self, X, df):
+        """
+        Preenche as colunas de construtor de `X`, que deve chegar com zeros nelas.
+
+        Args:
+            X (np.ndarray): Matriz (linhas de `df` x features).
+            df (pd.DataFrame): Linhas com 'Construtor' (e, se já calculada, 'Equipe'); sem nenhuma
+                das duas, a equipe fica ausente e os dummies em 0.
+        """
+        if self.posicao_equipe is not None:
+            X[:, self.posicao_equipe] = self.codigos_equipe(df)
+        if len(self.construtores) and COLUNA_CONSTRUTOR in df:
+            indices = _indices(self.construtores, df[COLUNA_CONSTRUTOR])
+            conhecidos = indices >= 0
+            X[np.flatnonzero(conhecidos), self.posicoes_construtor[indices[conhecidos]]] = 1
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+from src.armazenamento import colunar
+from src.modelos import construtores
+from src.modelos.cache_features import CacheFeatures
+from src.modelos.momentum import JANELAS_PADRAO, SPAN_EWM_PADRAO, calcular_momentum
+from src.modelos.tempos import tempos_para_segundos
+from src.scrapers import calendario
+
+DIRETORIO_LIMPOS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'limpos'))
+CAMINHO_QUALI = os.path.join(DIRETORIO_LIMPOS, 'f1_classificacao_limpo.csv')
+CAMINHO_CORRIDA = os.path.join(DIRETORIO_LIMPOS, 'f1_corrida_limpo.csv')
+DATASET_QUALI = 'classificacao'
+DATASET_CORRIDA = 'corrida'
+
+CONFIG_PADRAO = {
+    'colunas_tempo': ['Q1', 'Q2', 'Q3'],
+    'tempo_ausente': 999,
+    'janelas_momentum': JANELAS_PADRAO,
+    'span_ewm': SPAN_EWM_PADRAO,
+}
+
+FEATURES_BASE = [
+    'Pos_Quali', 'Grid_Final', 'Q1_s', 'Q2_s', 'Q3_s',
+    'Punicao_Grid', 'Gap_Q1_Q2', 'Gap_Q2_Q3'
+]
+
+# Arquivos cujo código define a matriz: qualquer alteração neles invalida o cache.
+_ARQUIVOS_CODIGO = [__file__] + [os.path.join(os.path.dirname(__file__), nome) for nome in ('tempos.py', 'momentum.py', 'construtores.py')]
+_ARQUIVOS_CODIGO.append(calendario.__file__)
+
+
+def caminhos_limpos(diretorio_parquet=colunar.DIRETORIO_PARQUET):
+    """
+    Escolhe de onde ler os dados limpos: do armazenamento colunar, se ele for
+    mais recente que os CSVs, ou dos CSVs de dados/limpos.
+
+    Args:
+        diretorio_parquet (str): Raiz do armazenamento colunar.
+
+    Returns:
+        tuple[str, str]: (classificação, corrida), cada um um CSV ou uma pasta Parquet.
+    """
+    caminhos = []
+    for nome, csv in ((DATASET_QUALI, CAMINHO_QUALI), (DATASET_CORRIDA, CAMINHO_CORRIDA)):
+        pasta = colunar.caminho_dataset(nome, diretorio_parquet)
+        usar_parquet = os.path.isdir(pasta) and (not os.path.exists(csv) or os.path.getmtime(pasta) >= os.path.getmtime(csv))
+        caminhos.append(pasta if usar_parquet else csv)
+    return tuple(caminhos)
+
+
+def ler_limpo(caminho):
+    """
+    Lê um conjunto limpo, seja um CSV ou uma pasta do armazenamento colunar.
+
+    Args:
+        caminho (str): CSV ou pasta Parquet.
+
+    Returns:
+        pd.DataFrame: Os dados, com os tipos que `pd.read_csv` produziria.
+    """
+    if os.path.isdir(caminho):
+        return colunar.para_tipos_numpy(colunar.ler(os.path.basename(caminho), diretorio=os.path.dirname(caminho)))
+    return pd.read_csv(caminho)
+
+
+@instrumentacao.etapa('uniao')
+def carregar_e_unir_dados(caminho_quali=None, caminho_corrida=None):
+    """
+    Carrega os dados de classificação e corrida de F1 (CSVs ou armazenamento
+    colunar), os une e os prepara para o processamento.
+
+    A função lida com possíveis erros de arquivo não encontrado e realiza um
+    merge dos dois DataFrames com base nas colunas 'Ano', 'GP' e 'Piloto'.
+    As colunas de posição e pontos são renomeadas para evitar conflitos.
+
+    Args:
+        caminho_quali (str, optional): CSV ou pasta Parquet de classificação; por padrão, `caminhos_limpos()`.
+        caminho_corrida (str, optional): CSV ou pasta Parquet de corrida; por padrão, `caminhos_limpos()`.
+
+    Returns:
+        pd.DataFrame or None: Um DataFrame do Pandas contendo os dados unidos
+                              se os arquivos forem carregados com sucesso,
+                              caso contrário, retorna None.
+    """
+    padrao_quali, padrao_corrida = caminhos_limpos()
+    caminho_quali = caminho_quali or padrao_quali
+    caminho_corrida = caminho_corrida or padrao_corrida
+    try:
+        df_quali = ler_limpo(caminho_quali)
+        df_corrida = ler_limpo(caminho_corrida)
+    except FileNotFoundError:
+        print("ERRO: Arquivos de dados limpos não encontrados!")
+        print(f"Verifique se '{os.path.basename(caminho_quali)}' e '{os.path.basename(caminho_corrida)}' existem na pasta 'dados/limpos'.")
+        return None
+
+    df_quali = df_quali.rename(columns={'Pos': 'Pos_Quali', 'Grid': 'Grid_Final'})
+    df_corrida = df_corrida.rename(columns={'Pos': 'Pos_Corrida', 'Pontos': 'Pontos_Ganhos'})
+
+    df_completo = pd.merge(df_quali, df_corrida, on=['Ano', 'GP', 'Piloto'], suffixes=('_quali', '_corrida'))
+    instrumentacao.linhas(entrada=len(df_quali) + len(df_corrida), saida=len(df_completo))
+
+    return df_completo
+
+
+def calcular_features_base(df_proc, config=None):
+    """
+    Acrescenta as features que dependem só da própria classificação (FEATURES_BASE).
+
+    Converte Q1/Q2/Q3 para segundos, calcula a punição de grid e os gaps entre
+    as sessões e preenche os tempos ausentes. Usada tanto na matriz de treino
+    quanto na previsão de uma classificação recém-terminada.
+
+    Args:
+        df_proc (pd.DataFrame): Linhas com 'Pos_Quali', 'Grid_Final' e as colunas de tempo; é alterado.
+        config (dict, optional): Parâmetros das features; ausentes usam CONFIG_PADRAO.
+
+    Returns:
+        pd.DataFrame: O próprio `df_proc`.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    # As contas são feitas em arrays NumPy e cada coluna é atribuída uma única
+    # vez: o serviço de previsão chama esta função a cada pedido, com ~20 linhas.
+    segundos = {}
+    for col_tempo in config['colunas_tempo']:
+        if pd.api.types.is_numeric_dtype(df_proc[col_tempo]):
+            # O armazenamento colunar já guarda os tempos em segundos.
+            segundos[col_tempo] = df_proc[col_tempo].to_numpy(dtype=float)
+        else:
+            segundos[col_tempo] = tempos_para_segundos(df_proc[col_tempo]).to_numpy(dtype=float)
+
+    tempo_ausente = config['tempo_ausente']
+    for col_tempo, valores in segundos.items():
+        df_proc[f'{col_tempo}_s'] = np.where(np.isnan(valores), tempo_ausente, valores) if col_tempo in ('Q1', 'Q2', 'Q3') else valores
+    df_proc['Punicao_Grid'] = df_proc['Grid_Final'].to_numpy(dtype=float) - df_proc['Pos_Quali'].to_numpy(dtype=float)
+    for gap, (antes, depois) in {'Gap_Q1_Q2': ('Q1', 'Q2'), 'Gap_Q2_Q3': ('Q2', 'Q3')}.items():
+        diferenca = segundos[antes] - segundos[depois]
+        df_proc[gap] = np.where(np.isnan(diferenca), 0, diferenca)
+    return df_proc
+
+
+def ordem_das_corridas(df):
+    """
+    Numera as corridas em ordem cronológica: por temporada e, dentro dela, pela etapa do calendário.
+
+    Uma temporada com alguma corrida fora de `calendario.CALENDARIO` (como as
+    dos dados sintéticos) segue a ordem em que as corridas aparecem em `df`.
+
+    Args:
+        df (pd.DataFrame): Linhas com 'Ano' e 'GP'.
+
+    Returns:
+        np.ndarray: O 'race_id' de cada linha: 0 para a primeira corrida, 1 para a seguinte e assim por diante.
+    """
+    chaves = pd.MultiIndex.from_arrays([pd.to_numeric(df['Ano']).to_numpy(), df['GP'].to_numpy()])
+    corridas = chaves.unique().to_frame(index=False, name=['Ano', 'GP'])
+    corridas['rodada'] = [calendario.rodada(gp, ano) for ano, gp in corridas[['Ano', 'GP']].itertuples(index=False)]
+    no_calendario = corridas['rodada'].notna().groupby(corridas['Ano']).transform('all')
+    corridas['ordem'] = np.where(no_calendario, corridas['rodada'], np.arange(len(corridas)))
+    corridas = corridas.sort_values(['Ano', 'ordem'], kind='stable')
+    race_id = pd.Series(np.arange(len(corridas)), index=pd.MultiIndex.from_frame(corridas[['Ano', 'GP']]))
+    return race_id.reindex(chaves).to_numpy()
+
+
+@instrumentacao.etapa('features')
+def preparar_dados_final(df, config=None):
+    """
+    Executa a engenharia de features e o pré-processamento final no DataFrame.
+
+    As etapas incluem:
+    1.  Conversão de colunas numéricas.
+    2.  Conversão de tempos de qualificação para segundos.
+    3.  Criação de features como 'Punicao_Grid' e gaps de tempo.
+    4.  Criação de features de momentum (médias móveis e exponencial dos resultados anteriores de cada piloto).
+    5.  Construtores em duas colunas categóricas: 'Construtor' (o nome original) e
+        'Equipe' (a linhagem); a codificação para o modelo fica para `montar_x`.
+    6.  Tratamento de valores ausentes.
+
+    Args:
+        df (pd.DataFrame): O DataFrame com os dados brutos unidos.
+        config (dict, optional): Parâmetros das features; ausentes usam CONFIG_PADRAO.
+
+    Returns:
+        pd.DataFrame: O DataFrame processado e pronto para o treinamento do modelo.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    df_proc = df.copy()
+    if 'Construtor_corrida' in df_proc.columns:
+        df_proc.drop(columns=['Construtor_corrida'], inplace=True)
+
+    for col_num in ['Pos_Quali', 'Grid_Final', 'Pos_Corrida', 'Pontos_Ganhos']:
+        if col_num in df_proc.columns:
+            df_proc[col_num] = pd.to_numeric(df_proc[col_num], errors='coerce')
+
+    calcular_features_base(df_proc, config)
+
+    df_proc['race_id'] = ordem_das_corridas(df_proc)
+
+    momentum = calcular_momentum(df_proc, janelas=config['janelas_momentum'], span_ewm=config['span_ewm'])
+    df_proc[momentum.columns] = momentum.fillna(momentum.median())
+
+    df_proc.sort_values('race_id', inplace=True)
+    df_proc.reset_index(drop=True, inplace=True)
+
+    df_proc.dropna(subset=['Pos_Corrida', 'Grid_Final'], inplace=True)
+    df_proc[construtores.COLUNA_CONSTRUTOR] = df_proc.pop('Construtor_quali').astype('category')
+    df_proc[construtores.COLUNA_EQUIPE] = construtores.equipes(df_proc[construtores.COLUNA_CONSTRUTOR])
+    instrumentacao.linhas(entrada=len(df), saida=len(df_proc))
+    return df_proc
+
+
+def colunas_de_features(df_processado, codificacao=construtores.CODIFICACAO_PADRAO):
+    """
+    Lista as colunas usadas como entrada do modelo: as features base, as de momentum e as de construtor.
+
+    Args:
+        df_processado (pd.DataFrame): Saída de `preparar_dados_final`.
+        codificacao (str): Codificação dos construtores, uma de `construtores.CODIFICACOES`:
+            'categorica' acrescenta só 'Equipe'; 'dummies', um 'Construtor_<nome>' por construtor.
+
+    Returns:
+        list[str]: Nomes das colunas de features.
+    """
+    features_momentum = [col for col in df_processado.columns if col.startswith('momentum_')]
+    return FEATURES_BASE + features_momentum + construtores.colunas(df_processado, codificacao)
+
+
+def montar_x(df_processado, features):
+    """
+    Seleciona as colunas de features com nomes aceitos pelo XGBoost ('[', ']' e '<' viram '_').
+
+    'Equipe' segue categórica; os dummies de construtor ('Construtor_<nome>')
+    são montados aqui, a partir da coluna 'Construtor'.
+
+    Args:
+        df_processado (pd.DataFrame): Saída de `preparar_dados_final`.
+        features (list[str]): Colunas a usar, normalmente as de `colunas_de_features`.
+
+    Returns:
+        pd.DataFrame: Matriz de entrada do modelo.
+    """
+    nomes = [nome[len(construtores.PREFIXO_CONSTRUTOR):] for nome in features if nome.startswith(construtores.PREFIXO_CONSTRUTOR)]
+    X = df_processado[[nome for nome in features if not nome.startswith(construtores.PREFIXO_CONSTRUTOR)]]
+    if nomes:
+        X = pd.concat([X, construtores.dummies(df_processado[construtores.COLUNA_CONSTRUTOR], nomes)], axis=1)[features]
+    X.columns = X.columns.str.replace(r"\[|\]|<", "_", regex=True)
+    return X
+
+
+def impressao_digital(caminhos, config=None):
+    """
+    Calcula a chave do cache da matriz de features.
+
+    A chave combina o conteúdo dos CSVs de entrada, a configuração das features
+    e o código deste módulo, de modo que qualquer mudança em um deles gere uma
+    matriz nova.
+
+    Args:
+        caminhos (list[str]): CSVs ou pastas Parquet de entrada.
+        config (dict, optional): Parâmetros das features.
+
+    Returns:
+        str: SHA-256 hexadecimal.
+    """
+    h = hashlib.sha256()
+    arquivos = []
+    for caminho in caminhos:
+        arquivos.extend(colunar.arquivos_do_dataset(os.path.basename(caminho), os.path.dirname(caminho)) if os.path.isdir(caminho) else [caminho])
+    for caminho in arquivos + _ARQUIVOS_CODIGO:
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+    h.update(json.dumps({**CONFIG_PADRAO, **(config or {})}, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+
+@instrumentacao.etapa('matriz')
+def gerar_matriz_features(config=None, caminho_quali=None, caminho_corrida=None, cache=None, usar_cache=True):
+    """
+    Devolve a matriz de features, reaproveitando a versão em cache quando a chave coincide.
+
+    Na primeira execução o merge, a conversão de tempos, o momentum e as
+    linhagens dos construtores são calculados e o resultado é gravado no cache; nas
+    seguintes, com os mesmos CSVs e a mesma configuração, a matriz é apenas
+    mapeada do disco.
+
+    Args:
+        config (dict, optional): Parâmetros das features; ausentes usam CONFIG_PADRAO.
+        caminho_quali (str, optional): CSV ou pasta Parquet de classificação; por padrão, `caminhos_limpos()`.
+        caminho_corrida (str, optional): CSV ou pasta Parquet de corrida; por padrão, `caminhos_limpos()`.
+        cache (CacheFeatures, optional): Cache a usar; por padrão o de dados/cache/features.
+        usar_cache (bool): Se False, sempre recalcula e não grava nada.
+
+    Returns:
+        pd.DataFrame or None: A matriz processada, ou None se os CSVs não existirem.
+    """
+    padrao_quali, padrao_corrida = caminhos_limpos()
+    caminho_quali = caminho_quali or padrao_quali
+    caminho_corrida = caminho_corrida or padrao_corrida
+    if not (os.path.exists(caminho_quali) and os.path.exists(caminho_corrida)):
+        # carregar_e_unir_dados avisa quais arquivos faltam e devolve None.
+        return carregar_e_unir_dados(caminho_quali, caminho_corrida)
+
+    if usar_cache:
+        cache = cache or CacheFeatures()
+        chave = impressao_digital([caminho_quali, caminho_corrida], config)
+        df_processado = cache.ler(chave)
+        if df_processado is not None:
+            instrumentacao.contar('cache_acertos')
+            instrumentacao.linhas(saida=len(df_processado))
+            return df_processado
+        instrumentacao.contar('cache_falhas')
+
+    df_completo = carregar_e_unir_dados(caminho_quali, caminho_corrida)
+    if df_completo is None:
+        return None
+    df_processado = preparar_dados_final(df_completo, config)
+    if usar_cache:
+        cache.salvar(chave, df_processado)
+    instrumentacao.linhas(saida=len(df_processado))
+    return df_processado
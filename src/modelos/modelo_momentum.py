@@ -1,176 +1,222 @@
-import pandas as pd
-from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
-import numpy as np
-import xgboost as xgb
+import json
+import math
 import os
 
-def carregar_e_unir_dados():
+import numpy as np
+
+from src import instrumentacao
+from src.modelos import construtores
+from src.modelos.features import colunas_de_features, gerar_matriz_features, montar_x
+
+ANO_TESTE = 2024
+CAMINHO_MELHORES_PARAMETROS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'modelos', 'melhores_parametros.json'))
+
+# O número de árvores não é sorteado: cada candidato recebe um orçamento de
+# rodadas e a parada antecipada decide onde parar.
+PARAM_DIST = {
+    'learning_rate': [0.01, 0.05, 0.1, 0.2],
+    'max_depth': [3, 5, 7, 9],
+    'subsample': [0.7, 0.8, 0.9, 1.0],
+    'colsample_bytree': [0.7, 0.8, 0.9, 1.0],
+    'gamma': [0, 0.1, 0.2]
+}
+
+def orcamentos_de_rodadas(min_rodadas=100, max_rodadas=1000, fator=3):
     """
-    Carrega os dados de classificação e corrida de F1 de arquivos CSV,
-    os une e os prepara para o processamento.
+    Calcula os orçamentos de rodadas de boosting de cada etapa do successive halving.
+
+    Cada etapa multiplica o orçamento por `fator`; a última sempre usa `max_rodadas`.
 
-    A função localiza os arquivos 'f1_classificacao_limpo.csv' e
-    'f1_corrida_limpo.csv' em um diretório de dados estruturado,
-    lida com possíveis erros de arquivo não encontrado e realiza um merge
-    dos dois DataFrames com base nas colunas 'Ano', 'GP' e 'Piloto'.
-    As colunas de posição e pontos são renomeadas para evitar conflitos.
+    Args:
+        min_rodadas (int): Orçamento da primeira etapa.
+        max_rodadas (int): Orçamento da última etapa.
+        fator (int): Razão entre etapas (e entre candidatos que entram e que seguem).
 
     Returns:
-        pd.DataFrame or None: Um DataFrame do Pandas contendo os dados unidos
-                              se os arquivos forem carregados com sucesso,
-                              caso contrário, retorna None.
+        list[int]: Orçamentos em ordem crescente.
     """
-    diretorio_script = os.path.dirname(__file__)
-    caminho_quali = os.path.normpath(os.path.join(diretorio_script, '..', '..', 'dados', 'limpos', 'f1_classificacao_limpo.csv'))
-    caminho_corrida = os.path.normpath(os.path.join(diretorio_script, '..', '..', 'dados', 'limpos', 'f1_corrida_limpo.csv'))
-
-    try:
-        df_quali = pd.read_csv(caminho_quali)
-        df_corrida = pd.read_csv(caminho_corrida)
-    except FileNotFoundError:
-        print("ERRO: Arquivos de dados limpos não encontrados!")
-        print(f"Verifique se '{os.path.basename(caminho_quali)}' e '{os.path.basename(caminho_corrida)}' existem na pasta 'dados/limpos'.")
-        return None
+    n_etapas = int(math.floor(math.log(max_rodadas / min_rodadas, fator) + 1e-9)) + 1
+    orcamentos = [min_rodadas * fator ** i for i in range(n_etapas)]
+    orcamentos[-1] = max_rodadas
+    return orcamentos
 
-    df_quali = df_quali.rename(columns={'Pos': 'Pos_Quali', 'Grid': 'Grid_Final'})
-    df_corrida = df_corrida.rename(columns={'Pos': 'Pos_Corrida', 'Pontos': 'Pontos_Ganhos'})
-    
-    df_completo = pd.merge(df_quali, df_corrida, on=['Ano', 'GP', 'Piloto'], suffixes=('_quali', '_corrida'))
-    
-    return df_completo
+def dobras_por_temporada(df, n_temporadas=3):
+    """
+    Monta as dobras de validação walk-forward: cada uma das últimas `n_temporadas`
+    temporadas é validada com um modelo treinado só nas anteriores.
 
-def tempo_para_segundos(tempo_str):
+    Args:
+        df (pd.DataFrame): Matriz de features com a coluna 'Ano'.
+        n_temporadas (int): Quantas temporadas finais viram dobras de validação.
+
+    Returns:
+        list[tuple[int, np.ndarray, np.ndarray]]: (temporada, máscara de treino, máscara de validação).
+    """
+    anos = df['Ano'].to_numpy()
+    temporadas = np.unique(anos)[1:][-n_temporadas:]
+    return [(int(ano), anos < ano, anos == ano) for ano in temporadas]
+
+def _sortear_candidatos(n_candidatos, semente):
+    from sklearn.model_selection import ParameterSampler
+
+    return [{k: (v.item() if isinstance(v, np.generic) else v) for k, v in c.items()}
+            for c in ParameterSampler(PARAM_DIST, n_iter=n_candidatos, random_state=semente)]
+
+def _avaliar_na_dobra(params, dtreino, dvalidacao, rodadas, rodadas_paciencia, n_threads, semente):
+    import xgboost as xgb
+
+    params_nativos = {'objective': 'reg:squarederror', 'nthread': n_threads, 'seed': semente,
+                      'max_cat_to_onehot': construtores.MAX_CATEGORIAS_ONEHOT, **params}
+    booster = xgb.train(params_nativos, dtreino, num_boost_round=rodadas, evals=[(dvalidacao, 'validacao')],
+                        early_stopping_rounds=rodadas_paciencia, verbose_eval=False)
+    melhor_rodada = booster.best_iteration + 1
+    y = dvalidacao.get_label()
+    previsto = booster.predict(dvalidacao, iteration_range=(0, melhor_rodada))
+    r2 = 1.0 - np.sum((y - previsto) ** 2) / np.sum((y - y.mean()) ** 2)
+    return r2, melhor_rodada
+
+@instrumentacao.etapa('busca')
+def buscar_hiperparametros(df, features, n_candidatos=50, n_temporadas_validacao=3, min_rodadas=100,
+                           max_rodadas=1000, fator=3, rodadas_paciencia=50, n_jobs=None, semente=42, verbose=1):
     """
-    Converte uma string de tempo no formato 'M:S.ms' ou 'S.ms' para segundos.
+    Busca os hiperparâmetros do XGBoost por successive halving sobre o número de rodadas de boosting.
+
+    Todos os candidatos começam com `min_rodadas`; a cada etapa só o melhor
+    1/`fator` segue, com orçamento `fator` vezes maior. Em cada dobra o treino
+    para cedo quando o erro na temporada de validação deixa de cair por
+    `rodadas_paciencia` rodadas. Os ajustes (candidato x dobra) de uma etapa
+    rodam em paralelo, em threads, e os núcleos são divididos entre eles: com
+    `n_jobs` núcleos e k ajustes simultâneos, cada XGBoost usa n_jobs // k threads.
 
     Args:
-        tempo_str (str): A string de tempo a ser convertida. Pode conter
-                         minutos, segundos e milissegundos.
+        df (pd.DataFrame): Matriz de features de treino, com 'Ano' e 'Pos_Corrida'.
+        features (list[str]): Colunas usadas pelo modelo.
+        n_candidatos (int): Combinações sorteadas de PARAM_DIST.
+        n_temporadas_validacao (int): Temporadas finais usadas como dobras.
+        min_rodadas (int): Orçamento de rodadas da primeira etapa.
+        max_rodadas (int): Orçamento de rodadas da última etapa.
+        fator (int): Fator de redução de candidatos e de aumento do orçamento.
+        rodadas_paciencia (int): Rodadas sem melhora antes da parada antecipada.
+        n_jobs (int, optional): Núcleos disponíveis. Por padrão, todos.
+        semente (int): Semente do sorteio e do XGBoost.
+        verbose (int): 0 para silencioso; 1 mostra o resumo de cada etapa.
 
     Returns:
-        float or np.nan: O tempo total em segundos como um número de ponto
-                         flutuante. Retorna np.nan se a entrada for inválida,
-                         nula ou não for uma string.
+        dict: 'params' (prontos para o XGBRegressor, com `n_estimators`),
+        'r2' (média nas dobras) e 'etapas' (histórico de cada etapa).
     """
-    if pd.isna(tempo_str) or not isinstance(tempo_str, str):
-        return np.nan
-    partes = tempo_str.replace(':', '.').split('.')
-    try:
-        if len(partes) == 3:
-            return (int(partes[0]) * 60) + int(partes[1]) + (int(partes[2]) / 1000)
-        elif len(partes) == 2:
-            return int(partes[0]) + (int(partes[1]) / 1000)
-    except (ValueError, IndexError):
-        return np.nan
-    return np.nan
-
-def preparar_dados_final(df):
+    from joblib import Parallel, delayed
+    import xgboost as xgb
+
+    n_nucleos = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    X = montar_x(df, features)
+    y = df['Pos_Corrida'].to_numpy(dtype=float)
+    dobras = [(ano, xgb.DMatrix(X[treino], label=y[treino], enable_categorical=True),
+               xgb.DMatrix(X[validacao], label=y[validacao], enable_categorical=True))
+              for ano, treino, validacao in dobras_por_temporada(df, n_temporadas_validacao)]
+    if not dobras:
+        raise ValueError("São necessárias ao menos duas temporadas para validar a busca.")
+
+    candidatos = _sortear_candidatos(n_candidatos, semente)
+    vivos = list(range(len(candidatos)))
+    etapas = []
+
+    for rodadas in orcamentos_de_rodadas(min_rodadas, max_rodadas, fator):
+        tarefas = [(i, dtreino, dvalidacao) for i in vivos for _, dtreino, dvalidacao in dobras]
+        n_paralelo = min(n_nucleos, len(tarefas))
+        n_threads = max(1, n_nucleos // n_paralelo)
+        resultados = Parallel(n_jobs=n_paralelo, prefer='threads')(
+            delayed(_avaliar_na_dobra)(candidatos[i], dtreino, dvalidacao, rodadas, rodadas_paciencia, n_threads, semente)
+            for i, dtreino, dvalidacao in tarefas
+        )
+
+        r2 = np.array([r for r, _ in resultados]).reshape(len(vivos), len(dobras)).mean(axis=1)
+        melhores_rodadas = np.array([m for _, m in resultados]).reshape(len(vivos), len(dobras)).mean(axis=1)
+        ordem = np.argsort(-r2, kind='stable')
+        etapas.append({
+            'rodadas': rodadas,
+            'candidatos': len(vivos),
+            'melhor_r2': float(r2[ordem[0]]),
+        })
+        if verbose:
+            print(f"  Etapa com {rodadas} rodadas: {len(vivos)} candidatos, melhor R² {r2[ordem[0]]:.4f}")
+
+        melhor = vivos[ordem[0]]
+        melhor_r2 = float(r2[ordem[0]])
+        melhor_n_estimators = int(round(melhores_rodadas[ordem[0]]))
+        vivos = [vivos[j] for j in ordem[:max(1, len(vivos) // fator)]]
+
+    params = dict(candidatos[melhor], n_estimators=melhor_n_estimators)
+    return {'params': params, 'r2': melhor_r2, 'etapas': etapas}
+
+def salvar_melhores_parametros(resultado, ano_teste, caminho=CAMINHO_MELHORES_PARAMETROS):
     """
-    Executa a engenharia de features e o pré-processamento final no DataFrame.
+    Grava o resultado de `buscar_hiperparametros` para que o treino o reaproveite.
 
-    As etapas incluem:
-    1.  Conversão de colunas numéricas.
-    2.  Conversão de tempos de qualificação para segundos.
-    3.  Criação de features como 'Punicao_Grid' e gaps de tempo.
-    4.  Criação de features de momentum (média móvel de resultados anteriores).
-    5.  Aplicação de one-hot encoding para construtores.
-    6.  Tratamento de valores ausentes.
+    Args:
+        resultado (dict): Saída de `buscar_hiperparametros`.
+        ano_teste (int): Primeira temporada que ficou fora da busca.
+        caminho (str): Arquivo JSON de destino.
+
+    Returns:
+        str: O caminho gravado.
+    """
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dict(resultado, ano_teste=ano_teste), f, ensure_ascii=False, indent=1)
+    return caminho
+
+def carregar_melhores_parametros(ano_teste, caminho=CAMINHO_MELHORES_PARAMETROS):
+    """
+    Lê os hiperparâmetros gravados por `salvar_melhores_parametros`.
 
     Args:
-        df (pd.DataFrame): O DataFrame com os dados brutos unidos.
+        ano_teste (int): Só vale uma busca feita com as mesmas temporadas fora do treino.
+        caminho (str): Arquivo JSON.
 
     Returns:
-        pd.DataFrame: O DataFrame processado e pronto para o treinamento do modelo.
+        dict or None: Os hiperparâmetros, ou None se não houver busca gravada para `ano_teste`.
     """
-    df_proc = df.copy()
-    if 'Construtor_corrida' in df_proc.columns:
-        df_proc.drop(columns=['Construtor_corrida'], inplace=True)
-    
-    for col_num in ['Pos_Quali', 'Grid_Final', 'Pos_Corrida', 'Pontos_Ganhos']:
-        if col_num in df_proc.columns:
-            df_proc[col_num] = pd.to_numeric(df_proc[col_num], errors='coerce')
-            
-    for col_tempo in ['Q1', 'Q2', 'Q3']:
-        df_proc[f'{col_tempo}_s'] = df_proc[col_tempo].apply(tempo_para_segundos)
-        
-    df_proc['Punicao_Grid'] = df_proc['Grid_Final'] - df_proc['Pos_Quali']
-    df_proc['Gap_Q1_Q2'] = df_proc['Q1_s'] - df_proc['Q2_s']
-    df_proc['Gap_Q2_Q3'] = df_proc['Q2_s'] - df_proc['Q3_s']
-    
-    df_proc.fillna({'Q1_s': 999, 'Q2_s': 999, 'Q3_s': 999, 'Gap_Q1_Q2': 0, 'Gap_Q2_Q3': 0}, inplace=True)
-    
-    df_proc['race_id'] = df_proc.groupby(['Ano', 'GP']).ngroup()
-    df_proc.sort_values(['Piloto', 'race_id'], inplace=True)
-
-    print("Criando features de momentum...")
-    window_size = 3
-    df_proc['momentum_pos_3r'] = df_proc.groupby('Piloto')['Pos_Corrida'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    df_proc['momentum_pts_3r'] = df_proc.groupby('Piloto')['Pontos_Ganhos'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    df_proc['momentum_quali_3r'] = df_proc.groupby('Piloto')['Pos_Quali'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    
-    df_proc.fillna({
-        'momentum_pos_3r': df_proc['momentum_pos_3r'].median(),
-        'momentum_pts_3r': df_proc['momentum_pts_3r'].median(),
-        'momentum_quali_3r': df_proc['momentum_quali_3r'].median()
-    }, inplace=True)
-    
-    df_proc.sort_values('race_id', inplace=True)
-    df_proc.reset_index(drop=True, inplace=True)
-    
-    df_proc = pd.get_dummies(df_proc, columns=['Construtor_quali'], prefix='Construtor')
-    df_proc.dropna(subset=['Pos_Corrida', 'Grid_Final'], inplace=True)
-    return df_proc
-
-
-print("Iniciando a OTIMIZAÇÃO DE HIPERPARÂMETROS")
-
-df_completo = carregar_e_unir_dados()
-if df_completo is None:
-    exit()
-df_processado = preparar_dados_final(df_completo)
-print("Dados carregados e todas as features criadas.")
-
-features_base = [
-    'Pos_Quali', 'Grid_Final', 'Q1_s', 'Q2_s', 'Q3_s', 
-    'Punicao_Grid', 'Gap_Q1_Q2', 'Gap_Q2_Q3',
-    'momentum_pos_3r', 'momentum_pts_3r', 'momentum_quali_3r'
-]
-features_construtores = [col for col in df_processado.columns if col.startswith('Construtor_')]
-features_finais = features_base + features_construtores
-
-X = df_processado[features_finais]
-y = df_processado['Pos_Corrida']
-X.columns = X.columns.str.replace(r"\[|\]|<", "_", regex=True)
-
-param_dist = {
-    'n_estimators': [100, 300, 500, 1000],
-    'learning_rate': [0.01, 0.05, 0.1, 0.2],
-    'max_depth': [3, 5, 7, 9],
-    'subsample': [0.7, 0.8, 0.9, 1.0],
-    'colsample_bytree': [0.7, 0.8, 0.9, 1.0],
-    'gamma': [0, 0.1, 0.2]
-}
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as f:
+        resultado = json.load(f)
+    if resultado.get('ano_teste') != ano_teste:
+        return None
+    return resultado['params']
+
+def main(ano_teste=ANO_TESTE, n_iter=50, n_jobs=None):
+    """
+    Otimiza os hiperparâmetros nas temporadas anteriores a `ano_teste` e grava o melhor resultado.
+
+    Args:
+        ano_teste (int): Primeira temporada fora da busca.
+        n_iter (int): Número de combinações sorteadas.
+        n_jobs (int, optional): Núcleos disponíveis para a busca.
 
-tss = TimeSeriesSplit(n_splits=5)
-modelo_base = xgb.XGBRegressor(objective='reg:squarederror', random_state=42, n_jobs=-1)
-
-random_search = RandomizedSearchCV(
-    estimator=modelo_base,
-    param_distributions=param_dist,
-    n_iter=50,
-    scoring='r2',
-    cv=tss,
-    verbose=2,
-    random_state=42,
-    n_jobs=-1
-)
-
-print("\nIniciando a busca pelos melhores hiperparâmetros com o dataset final")
-random_search.fit(X, y)
-
-print("\n--- RESULTADOS DA OTIMIZAÇÃO FINAL ---")
-print("Busca concluída!")
-print(f"\nO melhor R² médio encontrado foi: {random_search.best_score_:.4f} ({random_search.best_score_:.2%})")
-print("\nA melhor combinação de hiperparâmetros encontrada foi:")
-print(random_search.best_params_)
-print("---------------------------------------")
\ No newline at end of file
+    Returns:
+        dict or None: Os melhores hiperparâmetros, ou None se os dados não existirem.
+    """
+    print("Iniciando a OTIMIZAÇÃO DE HIPERPARÂMETROS")
+
+    df_processado = gerar_matriz_features()
+    if df_processado is None:
+        return None
+    print("Dados carregados e todas as features criadas.")
+
+    df_treino = df_processado[df_processado['Ano'] < ano_teste]
+    print(f"\nIniciando a busca pelos melhores hiperparâmetros (temporadas até {ano_teste - 1})")
+    resultado = buscar_hiperparametros(df_treino, colunas_de_features(df_processado), n_candidatos=n_iter, n_jobs=n_jobs)
+    caminho = salvar_melhores_parametros(resultado, ano_teste)
+
+    print("\n--- RESULTADOS DA OTIMIZAÇÃO FINAL ---")
+    print("Busca concluída!")
+    print(f"\nO melhor R² médio encontrado foi: {resultado['r2']:.4f} ({resultado['r2']:.2%})")
+    print("\nA melhor combinação de hiperparâmetros encontrada foi:")
+    print(resultado['params'])
+    print(f"\nGravada em: {caminho}")
+    print("---------------------------------------")
+    return resultado['params']
+
+if __name__ == '__main__':
+    main()
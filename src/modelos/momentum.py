@@ -0,0 +1,274 @@
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+
+ALVOS_MOMENTUM = {
+    'pos': 'Pos_Corrida',
+    'pts': 'Pontos_Ganhos',
+    'quali': 'Pos_Quali',
+}
+
+JANELAS_PADRAO = [3, 5, 10]
+SPAN_EWM_PADRAO = 5
+
+
+def nomes_momentum(janelas=JANELAS_PADRAO, span_ewm=SPAN_EWM_PADRAO):
+    """
+    Lista os nomes das colunas de momentum, no formato 'momentum_<alvo>_<janela>r' e 'momentum_<alvo>_ewm<span>'.
+
+    Args:
+        janelas (list[int]): Tamanhos das janelas móveis, em corridas.
+        span_ewm (int or None): Span da média exponencial; None desliga a média exponencial.
+
+    Returns:
+        list[str]: Nomes das colunas, agrupados por janela.
+    """
+    nomes = [f'momentum_{alvo}_{janela}r' for janela in janelas for alvo in ALVOS_MOMENTUM]
+    if span_ewm:
+        nomes += [f'momentum_{alvo}_ewm{span_ewm}' for alvo in ALVOS_MOMENTUM]
+    return nomes
+
+
+def _inicio_dos_grupos(grupos_ordenados):
+    """Para cada linha (já ordenada por grupo), o índice da primeira linha do seu grupo."""
+    novo = np.ones(len(grupos_ordenados), dtype=bool)
+    novo[1:] = grupos_ordenados[1:] != grupos_ordenados[:-1]
+    return np.maximum.accumulate(np.where(novo, np.arange(len(novo)), 0))
+
+
+@instrumentacao.etapa('momentum')
+def calcular_momentum(df, janelas=JANELAS_PADRAO, span_ewm=SPAN_EWM_PADRAO, coluna_piloto='Piloto', coluna_ordem='race_id'):
+    """
+    Calcula todas as features de momentum numa única passada ordenada por piloto.
+
+    Para cada piloto, o valor de uma corrida usa apenas as corridas anteriores
+    dele (equivale a `groupby(piloto).shift(1)` seguido de uma janela móvel
+    também agrupada, com `min_periods=1`). As médias móveis saem de somas
+    acumuladas de valores e de contagens, com o início de cada janela limitado
+    à primeira corrida do piloto; a média exponencial usa a forma fechada da
+    `ewm(span=..., adjust=True)` do pandas, com pesos relativos ao início do
+    grupo. Valores ausentes são ignorados, como no pandas.
+
+    Args:
+        df (pd.DataFrame): Uma linha por piloto e corrida, com as colunas de ALVOS_MOMENTUM.
+        janelas (list[int]): Tamanhos das janelas móveis, em corridas.
+        span_ewm (int or None): Span da média exponencial; None desliga a média exponencial.
+        coluna_piloto (str): Coluna que identifica o piloto.
+        coluna_ordem (str): Coluna com a ordem cronológica das corridas (o 'race_id' de `features.ordem_das_corridas`).
+
+    Returns:
+        pd.DataFrame: Colunas de `nomes_momentum`, alinhadas ao índice de `df`.
+    """
+    n = len(df)
+    codigos_piloto = pd.factorize(df[coluna_piloto])[0]
+    ordem = np.lexsort((df[coluna_ordem].to_numpy(), codigos_piloto))
+    grupos = codigos_piloto[ordem]
+    inicio = _inicio_dos_grupos(grupos)
+    posicao_no_grupo = np.arange(n) - inicio
+
+    valores = df[list(ALVOS_MOMENTUM.values())].to_numpy(dtype=float)[ordem]
+    presentes = ~np.isnan(valores)
+    # Somas acumuladas com um zero à frente: soma(a..b) = acumulada[b + 1] - acumulada[a].
+    soma = np.zeros((n + 1, valores.shape[1]))
+    np.cumsum(np.where(presentes, valores, 0.0), axis=0, out=soma[1:])
+    contagem = np.zeros((n + 1, valores.shape[1]))
+    np.cumsum(presentes, axis=0, out=contagem[1:])
+
+    # A corrida i usa as corridas [i - janela, i - 1] do mesmo piloto.
+    fim = np.arange(n)
+    resultados = {}
+    for janela in janelas:
+        comeco = np.maximum(fim - janela, inicio)
+        total = soma[fim] - soma[comeco]
+        quantidade = contagem[fim] - contagem[comeco]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = np.where(quantidade > 0, total / quantidade, np.nan)
+        for k, alvo in enumerate(ALVOS_MOMENTUM):
+            resultados[f'momentum_{alvo}_{janela}r'] = media[:, k]
+
+    if span_ewm:
+        resultados.update(_ewm_agrupada(valores, presentes, inicio, posicao_no_grupo, span_ewm))
+
+    saida = np.empty((n, len(resultados)))
+    saida[ordem] = np.column_stack(list(resultados.values()))
+    return pd.DataFrame(saida, index=df.index, columns=list(resultados.keys()))
+
+
+def _ewm_agrupada(valores, presentes, inicio, posicao_no_grupo, span_ewm):
+    """
+    Média exponencial (adjust=True) das corridas anteriores de cada piloto.
+
+    Com r = 1 - alfa, a média após a corrida j é sum(r^(j-i) x_i) / sum(r^(j-i)).
+    Multiplicando por r^-j, numerador e denominador viram somas acumuladas de
+    x_i r^-i. As somas são feitas numa matriz (piloto, corrida do piloto), com
+    i contado a partir da primeira corrida de cada piloto: assim os expoentes
+    ficam pequenos e a soma de um piloto não se mistura com a dos outros.
+    """
+    r = 1 - 2 / (span_ewm + 1)
+    # r^-j em log: o float do Python levanta OverflowError em vez de devolver inf, e as
+    # somas acumuladas ainda multiplicam r^-j, então a margem fica bem abaixo do máximo.
+    if r <= 0 or -np.log(r) * posicao_no_grupo.max(initial=0) > np.log(1e250):
+        return _ewm_agrupada_pandas(valores, inicio, span_ewm)
+
+    grupo = np.cumsum(posicao_no_grupo == 0) - 1
+    n_grupos = grupo[-1] + 1 if len(grupo) else 0
+    escala = (r ** -posicao_no_grupo.astype(float))[:, None]
+
+    # Coluna p + 1 recebe a corrida p; a soma acumulada até a coluna p cobre só as corridas anteriores.
+    forma = (n_grupos, posicao_no_grupo.max(initial=0) + 2, valores.shape[1])
+    numerador = np.zeros(forma)
+    denominador = np.zeros(forma)
+    numerador[grupo, posicao_no_grupo + 1] = np.where(presentes, valores, 0.0) * escala
+    denominador[grupo, posicao_no_grupo + 1] = presentes * escala
+    num = np.cumsum(numerador, axis=1)[grupo, posicao_no_grupo]
+    den = np.cumsum(denominador, axis=1)[grupo, posicao_no_grupo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(den > 0, num / den, np.nan)
+    return {f'momentum_{alvo}_ewm{span_ewm}': media[:, k] for k, alvo in enumerate(ALVOS_MOMENTUM)}
+
+
+def _ewm_agrupada_pandas(valores, inicio, span_ewm):
+    # Caminho para históricos longos demais para a forma fechada (r^-j estouraria).
+    anteriores = pd.DataFrame(valores).groupby(inicio).shift(1)
+    media = anteriores.groupby(inicio).ewm(span=span_ewm).mean().reset_index(level=0, drop=True).sort_index().to_numpy()
+    return {f'momentum_{alvo}_ewm{span_ewm}': media[:, k] for k, alvo in enumerate(ALVOS_MOMENTUM)}
+
+
+class EstadoMomentum:
+    """
+    Estado mínimo por piloto para calcular o momentum de corridas novas sem refazer o histórico.
+
+    Para cada piloto guarda os últimos `max(janelas)` resultados de cada alvo e
+    o numerador e o denominador da média exponencial. `atualizar` devolve as
+    features de uma corrida recém-adicionada (usando só o passado) e em seguida
+    incorpora os resultados dela ao estado. Aplicado corrida a corrida, produz
+    os mesmos valores que `calcular_momentum` sobre o histórico completo.
+
+    Args:
+        janelas (list[int]): Tamanhos das janelas móveis, em corridas.
+        span_ewm (int or None): Span da média exponencial; None desliga a média exponencial.
+    """
+
+    def __init__(self, janelas=JANELAS_PADRAO, span_ewm=SPAN_EWM_PADRAO):
+        self.janelas = list(janelas)
+        self.span_ewm = span_ewm
+        self._decaimento = 1 - 2 / (span_ewm + 1) if span_ewm else None
+        self._historico = {}
+        self._ewm = {}
+
+    @classmethod
+    def do_historico(cls, df, janelas=JANELAS_PADRAO, span_ewm=SPAN_EWM_PADRAO, coluna_piloto='Piloto', coluna_ordem='race_id'):
+        """
+        Cria o estado a partir de um histórico já existente.
+
+        Args:
+            df (pd.DataFrame): Uma linha por piloto e corrida, com as colunas de ALVOS_MOMENTUM.
+            janelas (list[int]): Tamanhos das janelas móveis.
+            span_ewm (int or None): Span da média exponencial.
+            coluna_piloto (str): Coluna que identifica o piloto.
+            coluna_ordem (str): Coluna com a ordem cronológica das corridas (o 'race_id' de `features.ordem_das_corridas`).
+
+        Returns:
+            EstadoMomentum: Estado pronto para receber a próxima corrida.
+        """
+        estado = cls(janelas, span_ewm)
+        for _, df_corrida in df.sort_values(coluna_ordem, kind='stable').groupby(coluna_ordem, sort=False):
+            estado.incorporar(df_corrida, coluna_piloto)
+        return estado
+
+    @classmethod
+    def do_banco(cls, banco, pilotos, antes_de=None, janelas=JANELAS_PADRAO, span_ewm=SPAN_EWM_PADRAO):
+        """
+        Cria o estado só dos pilotos informados, lendo o histórico de cada um no banco de consultas.
+
+        Cada histórico é uma consulta por intervalo no índice (Piloto, corrida),
+        sem carregar as demais linhas; serve para calcular o momentum de uma
+        única corrida, como a próxima do calendário.
+
+        Args:
+            banco (BancoF1): Banco aberto com `abrir_banco`.
+            pilotos (Iterable[str]): Pilotos cujo estado será montado.
+            antes_de (tuple[int, str], optional): (Ano, GP); só as corridas anteriores a ela entram no estado.
+            janelas (list[int]): Tamanhos das janelas móveis.
+            span_ewm (int or None): Span da média exponencial.
+
+        Returns:
+            EstadoMomentum: Estado pronto para `features` da corrida `antes_de`.
+        """
+        estado = cls(janelas, span_ewm)
+        for piloto in dict.fromkeys(pilotos):
+            historico = banco.historico_do_piloto(piloto, antes_de, n=None if span_ewm else max(janelas, default=0))
+            # As linhas são todas do mesmo piloto, então são incorporadas uma a uma, em ordem.
+            estado.incorporar(historico)
+        return estado
+
+    def features(self, df_corrida, coluna_piloto='Piloto'):
+        """
+        Calcula o momentum dos pilotos de uma corrida a partir do estado atual, sem alterá-lo.
+
+        Args:
+            df_corrida (pd.DataFrame): Linhas de uma única corrida.
+            coluna_piloto (str): Coluna que identifica o piloto.
+
+        Returns:
+            pd.DataFrame: Colunas de `nomes_momentum`, alinhadas ao índice de `df_corrida`.
+        """
+        nomes = nomes_momentum(self.janelas, self.span_ewm)
+        linhas = []
+        for piloto in df_corrida[coluna_piloto]:
+            historico = self._historico.get(piloto)
+            linha = {}
+            for janela in self.janelas:
+                recentes = historico[-janela:] if historico is not None else np.empty((0, len(ALVOS_MOMENTUM)))
+                presentes = ~np.isnan(recentes)
+                quantidade = presentes.sum(axis=0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    media = np.where(quantidade > 0, np.where(presentes, recentes, 0.0).sum(axis=0) / quantidade, np.nan)
+                for k, alvo in enumerate(ALVOS_MOMENTUM):
+                    linha[f'momentum_{alvo}_{janela}r'] = media[k]
+            if self.span_ewm:
+                numerador, denominador = self._ewm.get(piloto, (np.zeros(len(ALVOS_MOMENTUM)), np.zeros(len(ALVOS_MOMENTUM))))
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    media = np.where(denominador > 0, numerador / denominador, np.nan)
+                for k, alvo in enumerate(ALVOS_MOMENTUM):
+                    linha[f'momentum_{alvo}_ewm{self.span_ewm}'] = media[k]
+            linhas.append(linha)
+        return pd.DataFrame(linhas, index=df_corrida.index, columns=nomes, dtype=float)
+
+    def incorporar(self, df_corrida, coluna_piloto='Piloto'):
+        """
+        Acrescenta os resultados de uma corrida ao estado.
+
+        Args:
+            df_corrida (pd.DataFrame): Linhas de uma única corrida, com as colunas de ALVOS_MOMENTUM.
+            coluna_piloto (str): Coluna que identifica o piloto.
+        """
+        maior_janela = max(self.janelas, default=0)
+        resultados = df_corrida[list(ALVOS_MOMENTUM.values())].to_numpy(dtype=float)
+        for piloto, valores in zip(df_corrida[coluna_piloto], resultados):
+            historico = self._historico.get(piloto)
+            historico = valores[None, :] if historico is None else np.vstack([historico, valores])
+            self._historico[piloto] = historico[-maior_janela:] if maior_janela else historico[:0]
+            if self.span_ewm:
+                numerador, denominador = self._ewm.get(piloto, (np.zeros(len(valores)), np.zeros(len(valores))))
+                presentes = ~np.isnan(valores)
+                self._ewm[piloto] = (
+                    self._decaimento * numerador + np.where(presentes, valores, 0.0),
+                    self._decaimento * denominador + presentes,
+                )
+
+    def atualizar(self, df_corrida, coluna_piloto='Piloto'):
+        """
+        Calcula o momentum de uma corrida nova e depois incorpora os resultados dela ao estado.
+
+        Args:
+            df_corrida (pd.DataFrame): Linhas de uma única corrida.
+            coluna_piloto (str): Coluna que identifica o piloto.
+
+        Returns:
+            pd.DataFrame: Features de momentum da corrida.
+        """
+        momentum = self.features(df_corrida, coluna_piloto)
+        self.incorporar(df_corrida, coluna_piloto)
+        return momentum
@@ -1,238 +1,316 @@
-import pandas as pd
-from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import numpy as np
-import xgboost as xgb
-import os
+import pandas as pd
+
+from src import instrumentacao
+from src.modelos import construtores, registro
+from src.modelos.avaliacao import metricas_por_corrida, resumir
+from src.modelos.features import caminhos_limpos, colunas_de_features, gerar_matriz_features, impressao_digital, montar_x
+from src.modelos.registro import DIRETORIO_REGISTRO
+
+ANO_TESTE = 2024
+OBJETIVO_PADRAO = 'reg:squarederror'
+OBJETIVOS = (OBJETIVO_PADRAO, 'rank:pairwise', 'rank:ndcg')
 
-def carregar_e_unir_dados():
+def separar_treino_teste(df_processado, ano_teste=ANO_TESTE):
     """
-    Carrega os dados de classificação e corrida de F1 de arquivos CSV,
-    os une e os prepara para o processamento.
+    Divide a matriz de features em treino (anos anteriores) e teste (a temporada `ano_teste`).
 
-    A função localiza os arquivos 'f1_classificacao_limpo.csv' e
-    'f1_corrida_limpo.csv' em um diretório de dados estruturado,
-    lida com possíveis erros de arquivo não encontrado e realiza um merge
-    dos dois DataFrames com base nas colunas 'Ano', 'GP' e 'Piloto'.
-    As colunas de posição e pontos são renomeadas para evitar conflitos.
+    Args:
+        df_processado (pd.DataFrame): Saída de `gerar_matriz_features`.
+        ano_teste (int): Temporada usada como teste.
 
     Returns:
-        pd.DataFrame or None: Um DataFrame do Pandas contendo os dados unidos
-                              se os arquivos forem carregados com sucesso,
-                              caso contrário, retorna None.
+        tuple[pd.DataFrame, pd.DataFrame]: (df_treino, df_teste).
     """
-    diretorio_script = os.path.dirname(__file__)
-    caminho_quali = os.path.normpath(os.path.join(diretorio_script, '..', '..', 'dados', 'limpos', 'f1_classificacao_limpo.csv'))
-    caminho_corrida = os.path.normpath(os.path.join(diretorio_script, '..', '..', 'dados', 'limpos', 'f1_corrida_limpo.csv'))
+    df_treino = df_processado[df_processado['Ano'] < ano_teste].copy()
+    df_teste = df_processado[df_processado['Ano'] == ano_teste].copy()
+    return df_treino, df_teste
 
-    try:
-        df_quali = pd.read_csv(caminho_quali)
-        df_corrida = pd.read_csv(caminho_corrida)
-    except FileNotFoundError:
-        print("ERRO: Arquivos de dados limpos não encontrados!")
-        print(f"Verifique se '{os.path.basename(caminho_quali)}' e '{os.path.basename(caminho_corrida)}' existem na pasta 'dados/limpos'.")
-        return None
+def relevancia(y, grupos):
+    """
+    Rótulos de relevância para os objetivos de ranking: em cada corrida, o
+    último colocado vale 0 e cada posição acima vale 1 a mais.
 
-    df_quali = df_quali.rename(columns={'Pos': 'Pos_Quali', 'Grid': 'Grid_Final'})
-    df_corrida = df_corrida.rename(columns={'Pos': 'Pos_Corrida', 'Pontos': 'Pontos_Ganhos'})
-    
-    df_completo = pd.merge(df_quali, df_corrida, on=['Ano', 'GP', 'Piloto'], suffixes=('_quali', '_corrida'))
-    
-    return df_completo
+    Args:
+        y (array-like): Posição final na corrida.
+        grupos (array-like): Código da corrida de cada linha.
+
+    Returns:
+        np.ndarray: Relevância inteira de cada linha.
+    """
+    y = pd.Series(np.asarray(y))
+    por_corrida = y.groupby(np.asarray(grupos))
+    return (por_corrida.transform('size') - por_corrida.rank(method='first')).to_numpy(dtype=int)
 
-def tempo_para_segundos(tempo_str):
+@instrumentacao.etapa('treino')
+def treinar_modelo(X_treino, y_treino, params, n_jobs=-1, objetivo=OBJETIVO_PADRAO, grupos=None):
     """
-    Converte um tempo em string no formato 'M:S.ms' ou 'S.ms' para um valor numérico em segundos.
+    Treina o modelo final com os hiperparâmetros informados.
+
+    Com um objetivo de ranking ('rank:pairwise' ou 'rank:ndcg'), o modelo
+    aprende a ordem dos pilotos dentro de cada corrida (`grupos`) em vez da
+    posição de cada linha isolada. O XGBoost exige as linhas de uma mesma
+    corrida em um bloco contíguo, então elas são reordenadas por `grupos`
+    antes do treino; o NDCG usa ganho linear, como em `metricas_por_corrida`.
+    Uma coluna categórica ('Equipe') é tratada como categórica nativa do XGBoost.
 
     Args:
-        tempo_str (str): Tempo representado como string.
+        X_treino (pd.DataFrame): Features de treino.
+        y_treino (pd.Series): Posição final na corrida.
+        params (dict): Hiperparâmetros do XGBoost.
+        n_jobs (int): Threads do XGBoost; -1 usa todos os núcleos.
+        objetivo (str): Um de OBJETIVOS.
+        grupos (array-like, optional): Código da corrida de cada linha (por exemplo 'race_id');
+            obrigatório nos objetivos de ranking.
 
     Returns:
-        float: Tempo convertido para segundos, ou NaN se inválido.
+        xgb.XGBRegressor or xgb.XGBRanker: O modelo treinado.
     """
-    if pd.isna(tempo_str) or not isinstance(tempo_str, str):
-        return np.nan
-    partes = tempo_str.replace(':', '.').split('.')
-    try:
-        if len(partes) == 3:
-            return (int(partes[0]) * 60) + int(partes[1]) + (int(partes[2]) / 1000)
-        elif len(partes) == 2:
-            return int(partes[0]) + (int(partes[1]) / 1000)
-    except (ValueError, IndexError):
-        return np.nan
-    return np.nan
+    import xgboost as xgb
+
+    instrumentacao.linhas(entrada=X_treino.shape[0])
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"objetivo deve ser um de {OBJETIVOS}, não {objetivo!r}.")
+    if not registro.e_ranking(objetivo):
+        modelo_final = xgb.XGBRegressor(objective=objetivo, random_state=42, n_jobs=n_jobs, enable_categorical=True,
+                                        max_cat_to_onehot=construtores.MAX_CATEGORIAS_ONEHOT, **params)
+        modelo_final.fit(X_treino, y_treino)
+        return modelo_final
+
+    if grupos is None:
+        raise ValueError(f"O objetivo {objetivo} precisa dos grupos (a corrida de cada linha).")
+    grupos = np.asarray(grupos)
+    ordem = np.argsort(grupos, kind='stable')
+    extras = {'ndcg_exp_gain': False} if objetivo == 'rank:ndcg' else {}
+    modelo_final = xgb.XGBRanker(objective=objetivo, random_state=42, n_jobs=n_jobs, enable_categorical=True,
+                                 max_cat_to_onehot=construtores.MAX_CATEGORIAS_ONEHOT, **extras, **params)
+    modelo_final.fit(X_treino.iloc[ordem], relevancia(y_treino, grupos)[ordem], qid=grupos[ordem])
+    return modelo_final
+
+def salvar_modelo(modelo, features, params, diretorio=DIRETORIO_REGISTRO, impressao=None, **extras):
+    """
+    Grava o modelo como uma versão nova do registro (booster binário nativo e metadados).
 
-def preparar_dados_final(df):
+    Args:
+        modelo (xgb.XGBRegressor or xgb.XGBRanker): Modelo treinado.
+        features (list[str]): Colunas de features, na ordem usada no treino.
+        params (dict): Hiperparâmetros do modelo.
+        diretorio (str): Raiz do registro.
+        impressao (str, optional): Impressão digital dos dados e do código de features.
+        **extras: Outros campos dos metadados (por exemplo `ano_teste`).
+
+    Returns:
+        str: Pasta da versão gravada.
     """
-    Realiza o pré-processamento e a engenharia de atributos no DataFrame de corridas da F1.
+    return registro.registrar(modelo.get_booster(), features, params, impressao, diretorio, **extras)
 
-    Isso inclui limpeza de colunas, conversões numéricas, cálculo de gaps e momentum, 
-    normalização de dados e codificação de variáveis categóricas.
+def carregar_modelo(diretorio=DIRETORIO_REGISTRO, versao=None):
+    """
+    Abre um modelo do registro.
 
     Args:
-        df (pd.DataFrame): DataFrame original contendo os dados brutos combinados.
+        diretorio (str): Raiz do registro.
+        versao (str, optional): Versão a abrir; por padrão, a atual.
 
     Returns:
-        pd.DataFrame: DataFrame preparado com atributos tratados e novas features.
-    """
-    df_proc = df.copy()
-    if 'Construtor_corrida' in df_proc.columns:
-        df_proc.drop(columns=['Construtor_corrida'], inplace=True)
-    
-    for col_num in ['Pos_Quali', 'Grid_Final', 'Pos_Corrida', 'Pontos_Ganhos']:
-        if col_num in df_proc.columns:
-            df_proc[col_num] = pd.to_numeric(df_proc[col_num], errors='coerce')
-            
-    for col_tempo in ['Q1', 'Q2', 'Q3']:
-        df_proc[f'{col_tempo}_s'] = df_proc[col_tempo].apply(tempo_para_segundos)
-        
-    df_proc['Punicao_Grid'] = df_proc['Grid_Final'] - df_proc['Pos_Quali']
-    df_proc['Gap_Q1_Q2'] = df_proc['Q1_s'] - df_proc['Q2_s']
-    df_proc['Gap_Q2_Q3'] = df_proc['Q2_s'] - df_proc['Q3_s']
-    df_proc.fillna({'Q1_s': 999, 'Q2_s': 999, 'Q3_s': 999, 'Gap_Q1_Q2': 0, 'Gap_Q2_Q3': 0}, inplace=True)
-    
-    df_proc['race_id'] = df_proc.groupby(['Ano', 'GP']).ngroup()
-    df_proc.sort_values(['Piloto', 'race_id'], inplace=True)
-
-    window_size = 3
-    df_proc['momentum_pos_3r'] = df_proc.groupby('Piloto')['Pos_Corrida'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    df_proc['momentum_pts_3r'] = df_proc.groupby('Piloto')['Pontos_Ganhos'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    df_proc['momentum_quali_3r'] = df_proc.groupby('Piloto')['Pos_Quali'].shift(1).rolling(window=window_size, min_periods=1).mean()
-    
-    median_pos = df_proc['momentum_pos_3r'].median()
-    median_pts = df_proc['momentum_pts_3r'].median()
-    median_quali = df_proc['momentum_quali_3r'].median()
-    df_proc.fillna({
-        'momentum_pos_3r': median_pos,
-        'momentum_pts_3r': median_pts,
-        'momentum_quali_3r': median_quali
-    }, inplace=True)
-    
-    df_proc.sort_values('race_id', inplace=True)
-    df_proc.reset_index(drop=True, inplace=True)
-    
-    df_proc = pd.get_dummies(df_proc, columns=['Construtor_quali'], prefix='Construtor')
-    df_proc.dropna(subset=['Pos_Corrida', 'Grid_Final'], inplace=True)
-    return df_proc
-
-print("1. Carregando e processando todos os dados (2014-2024)...")
-df_completo = carregar_e_unir_dados()
-if df_completo is None:
-    exit()
-df_processado = preparar_dados_final(df_completo)
-print("Dados carregados e processados.")
-
-df_treino = df_processado[df_processado['Ano'] < 2024].copy()
-df_teste = df_processado[df_processado['Ano'] == 2024].copy()
-
-print(f"\nTamanho do conjunto de treino: {len(df_treino)} registros")
-print(f"Tamanho do conjunto de teste: {len(df_teste)} registros")
-
-features_base = [
-    'Pos_Quali', 'Grid_Final', 'Q1_s', 'Q2_s', 'Q3_s', 
-    'Punicao_Grid', 'Gap_Q1_Q2', 'Gap_Q2_Q3',
-    'momentum_pos_3r', 'momentum_pts_3r', 'momentum_quali_3r'
-]
-features_construtores = [col for col in df_processado.columns if col.startswith('Construtor_')]
-features_finais = features_base + features_construtores
-
-X_treino = df_treino[features_finais]
-y_treino = df_treino['Pos_Corrida']
-
-X_teste = df_teste[features_finais]
-y_teste = df_teste['Pos_Corrida']
-
-X_treino.columns = X_treino.columns.str.replace(r"\[|\]|<", "_", regex=True)
-X_teste.columns = X_teste.columns.str.replace(r"\[|\]|<", "_", regex=True)
-
-print("\n4. Iniciando a busca de hiperparâmetros no conjunto de treino (2014-2023)...")
-param_dist = {
-    'n_estimators': [100, 300, 500, 1000],
-    'learning_rate': [0.01, 0.05, 0.1, 0.2],
-    'max_depth': [3, 5, 7, 9],
-    'subsample': [0.7, 0.8, 0.9, 1.0],
-    'colsample_bytree': [0.7, 0.8, 0.9, 1.0],
-    'gamma': [0, 0.1, 0.2]
-}
-tss = TimeSeriesSplit(n_splits=5)
-modelo_base = xgb.XGBRegressor(objective='reg:squarederror', random_state=42, n_jobs=-1)
-
-random_search = RandomizedSearchCV(
-    estimator=modelo_base,
-    param_distributions=param_dist,
-    n_iter=50,
-    scoring='r2',
-    cv=tss,
-    verbose=1,
-    random_state=42,
-    n_jobs=-1
-)
-random_search.fit(X_treino, y_treino)
-best_params = random_search.best_params_
-print("\nMelhores hiperparâmetros encontrados:", best_params)
-
-print("\n5. Treinando modelo final com os melhores parâmetros no conjunto de treino...")
-modelo_final = xgb.XGBRegressor(objective='reg:squarederror', random_state=42, n_jobs=-1, **best_params)
-modelo_final.fit(X_treino, y_treino)
-print("Modelo final treinado.")
-
-print("\n6. Fazendo previsões para a temporada de 2024...")
-previsoes_2024 = modelo_final.predict(X_teste)
-
-print("\n--- AVALIAÇÃO DO MODELO NA TEMPORADA 2024 ---")
-
-df_resultados = df_teste[['Ano', 'GP', 'Piloto', 'Pos_Corrida']].copy()
-df_resultados['Posicao_Prevista'] = previsoes_2024
-df_resultados['Posicao_Prevista_Arr'] = np.round(df_resultados['Posicao_Prevista'])
-
-mae = mean_absolute_error(y_teste, previsoes_2024)
-rmse = np.sqrt(mean_squared_error(y_teste, previsoes_2024))
-r2 = r2_score(y_teste, previsoes_2024)
-
-print("\n--- Métricas de Regressão ---")
-print(f"Erro Médio Absoluto (MAE): {mae:.4f} (Em média, o modelo erra a posição por ~{mae:.1f} posições)")
-print(f"Raiz do Erro Quadrático Médio (RMSE): {rmse:.4f}")
-print(f"Coeficiente de Determinação (R²): {r2:.4f} ({r2:.2%})")
-
-total_corridas = df_resultados['GP'].nunique()
-acertos_vencedor = 0
-acertos_podio = 0
-total_membros_podio = 0
-acertos_top10 = 0
-total_membros_top10 = 0
-
-for gp in df_resultados['GP'].unique():
-    df_gp = df_resultados[df_resultados['GP'] == gp].copy()
-    df_gp_real = df_gp.sort_values('Pos_Corrida')
-    df_gp_previsto = df_gp.sort_values('Posicao_Prevista')
-    
-    vencedor_real = df_gp_real.iloc[0]['Piloto']
-    vencedor_previsto = df_gp_previsto.iloc[0]['Piloto']
-    if vencedor_real == vencedor_previsto:
-        acertos_vencedor += 1
-        
-    podio_real = set(df_gp_real.head(3)['Piloto'])
-    podio_previsto = set(df_gp_previsto.head(3)['Piloto'])
-    acertos_podio += len(podio_real.intersection(podio_previsto))
-    total_membros_podio += 3
-    
-    top10_real = set(df_gp_real.head(10)['Piloto'])
-    top10_previsto = set(df_gp_previsto.head(10)['Piloto'])
-    acertos_top10 += len(top10_real.intersection(top10_previsto))
-    total_membros_top10 += 10
-
-print("\n--- Métricas de Acurácia de Corrida ---")
-print(f"Total de Corridas em 2024: {total_corridas}")
-print(f"Acurácia do Vencedor: {acertos_vencedor}/{total_corridas} = {(acertos_vencedor/total_corridas):.2%}")
-print(f"Acurácia de Pódio (membros corretos no pódio): {acertos_podio}/{total_membros_podio} = {(acertos_podio/total_membros_podio):.2%}")
-print(f"Acurácia de Top 10 (membros corretos na zona de pontos): {acertos_top10}/{total_membros_top10} = {(acertos_top10/total_membros_top10):.2%}")
-
-print("\n--- Exemplo de Previsão vs. Real (Top 5) ---")
-exemplo_gp = df_resultados['GP'].unique()[0]
-df_exemplo = df_resultados[df_resultados['GP'] == exemplo_gp]
-
-print(f"\nResultado para: {exemplo_gp}")
-print(df_exemplo[['Piloto', 'Pos_Corrida', 'Posicao_Prevista']].sort_values('Pos_Corrida').head(5).to_string(index=False))
-
-print("\nPrevisão do Modelo:")
-print(df_exemplo[['Piloto', 'Pos_Corrida', 'Posicao_Prevista']].sort_values('Posicao_Prevista').head(5).to_string(index=False))
\ No newline at end of file
+        tuple: (xgb.Booster, metadados), ou (None, None) se não houver modelo salvo.
+    """
+    modelo, metadados = registro.carregar(versao, diretorio)
+    if modelo is None:
+        print(f"ERRO: Nenhum modelo {'na versão ' + versao if versao else 'treinado'} em '{diretorio}'. Rode o treino primeiro.")
+    return modelo, metadados
+
+def prever(modelo, df, features, vocabulario_equipes=None):
+    """
+    Prevê a posição final de cada linha de `df`.
+
+    Construtores que não existiam no treino entram como equipe ausente (ou
+    com todos os dummies em 0).
+
+    Args:
+        modelo (xgb.Booster or xgb.XGBRegressor): Modelo treinado.
+        df (pd.DataFrame): Linhas da matriz de features.
+        features (list[str]): Colunas usadas no treino.
+        vocabulario_equipes (list[str], optional): `metadados['vocabulario_equipes']` do modelo gravado;
+            desnecessário quando `df` é a mesma matriz do treino.
+
+    Returns:
+        np.ndarray: Posição prevista (contínua) de cada linha.
+    """
+    booster = modelo.get_booster() if hasattr(modelo, 'get_booster') else modelo
+    return registro.prever(booster, df, features, vocabulario_equipes=vocabulario_equipes)
+
+def avaliar_previsoes(df_teste, previsoes, ano_teste=ANO_TESTE, banco=None):
+    """
+    Mostra as métricas de regressão, de acurácia por corrida (vencedor, pódio e top 10) e de ordenação.
+
+    Args:
+        df_teste (pd.DataFrame): Linhas avaliadas, com 'Ano', 'GP', 'Piloto' e 'Pos_Corrida'.
+        previsoes (np.ndarray): Posição prevista de cada linha.
+        ano_teste (int): Temporada avaliada, usada nos títulos.
+        banco (BancoF1, optional): Banco de consultas; se informado, o exemplo mostra o resultado oficial da corrida.
+
+    Returns:
+        dict: MAE, RMSE, R², as acurácias de vencedor, pódio e top 10 e as médias de Spearman, Kendall e NDCG@10.
+    """
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    y_teste = df_teste['Pos_Corrida']
+
+    print(f"\n--- AVALIAÇÃO DO MODELO NA TEMPORADA {ano_teste} ---")
+
+    df_resultados = df_teste[['Ano', 'GP', 'Piloto', 'Pos_Corrida']].copy()
+    df_resultados['Posicao_Prevista'] = previsoes
+    df_resultados['Posicao_Prevista_Arr'] = np.round(df_resultados['Posicao_Prevista'])
+
+    mae = mean_absolute_error(y_teste, previsoes)
+    rmse = np.sqrt(mean_squared_error(y_teste, previsoes))
+    r2 = r2_score(y_teste, previsoes)
+
+    print("\n--- Métricas de Regressão ---")
+    print(f"Erro Médio Absoluto (MAE): {mae:.4f} (Em média, o modelo erra a posição por ~{mae:.1f} posições)")
+    print(f"Raiz do Erro Quadrático Médio (RMSE): {rmse:.4f}")
+    print(f"Coeficiente de Determinação (R²): {r2:.4f} ({r2:.2%})")
+
+    resumo = resumir(metricas_por_corrida(df_resultados))
+    total_corridas = resumo['corridas']
+    acertos_vencedor = resumo['acertos_vencedor']
+    acertos_podio, total_membros_podio = resumo['acertos_podio'], 3 * total_corridas
+    acertos_top10, total_membros_top10 = resumo['acertos_top10'], 10 * total_corridas
+
+    print("\n--- Métricas de Acurácia de Corrida ---")
+    print(f"Total de Corridas em {ano_teste}: {total_corridas}")
+    print(f"Acurácia do Vencedor: {acertos_vencedor}/{total_corridas} = {(acertos_vencedor/total_corridas):.2%}")
+    print(f"Acurácia de Pódio (membros corretos no pódio): {acertos_podio}/{total_membros_podio} = {(acertos_podio/total_membros_podio):.2%}")
+    print(f"Acurácia de Top 10 (membros corretos na zona de pontos): {acertos_top10}/{total_membros_top10} = {(acertos_top10/total_membros_top10):.2%}")
+
+    print("\n--- Métricas de Ordenação (média por corrida) ---")
+    print(f"Spearman: {resumo['spearman']:.4f}")
+    print(f"Kendall (tau-b): {resumo['kendall']:.4f}")
+    print(f"NDCG@10: {resumo['ndcg10']:.4f}")
+
+    print("\n--- Exemplo de Previsão vs. Real (Top 5) ---")
+    exemplo_gp = df_resultados['GP'].unique()[0]
+    df_exemplo = df_resultados[df_resultados['GP'] == exemplo_gp]
+
+    print(f"\nResultado para: {exemplo_gp}")
+    if banco is not None:
+        # Resultado oficial completo, inclusive de pilotos que ficaram fora da matriz de features.
+        df_oficial = banco.resultados_do_gp(ano_teste, exemplo_gp).rename(columns={'Pos': 'Pos_Corrida'})
+        df_oficial = df_oficial.merge(df_exemplo[['Piloto', 'Posicao_Prevista']], on='Piloto', how='left')
+        print(df_oficial[['Piloto', 'Pos_Corrida', 'Posicao_Prevista']].head(5).to_string(index=False))
+    else:
+        print(df_exemplo[['Piloto', 'Pos_Corrida', 'Posicao_Prevista']].sort_values('Pos_Corrida').head(5).to_string(index=False))
+
+    print("\nPrevisão do Modelo:")
+    print(df_exemplo[['Piloto', 'Pos_Corrida', 'Posicao_Prevista']].sort_values('Posicao_Prevista').head(5).to_string(index=False))
+
+    return {
+        'mae': mae,
+        'rmse': rmse,
+        'r2': r2,
+        'acuracia_vencedor': resumo['acuracia_vencedor'],
+        'acuracia_podio': resumo['acuracia_podio'],
+        'acuracia_top10': resumo['acuracia_top10'],
+        'spearman': resumo['spearman'],
+        'kendall': resumo['kendall'],
+        'ndcg10': resumo['ndcg10'],
+    }
+
+def treinar(ano_teste=ANO_TESTE, n_iter=50, params=None, diretorio=DIRETORIO_REGISTRO, buscar=False, objetivo=OBJETIVO_PADRAO,
+            codificacao=construtores.CODIFICACAO_PADRAO):
+    """
+    Treina o modelo final com as temporadas anteriores a `ano_teste` e o grava em disco.
+
+    Sem `params`, reaproveita os hiperparâmetros gravados pela última busca
+    para o mesmo `ano_teste`; se não houver (ou com `buscar=True`), roda a
+    busca no próprio conjunto de treino e grava o resultado. A busca sempre
+    otimiza o regressor; os modelos de ranking usam os mesmos hiperparâmetros.
+
+    Args:
+        ano_teste (int): Primeira temporada fora do treino.
+        n_iter (int): Combinações avaliadas na busca de hiperparâmetros.
+        params (dict, optional): Hiperparâmetros fixos; dispensam a busca.
+        diretorio (str): Raiz do registro onde o modelo é gravado.
+        buscar (bool): Refaz a busca mesmo havendo hiperparâmetros gravados.
+        objetivo (str): Objetivo do XGBoost, um de OBJETIVOS.
+        codificacao (str): Codificação dos construtores, uma de `construtores.CODIFICACOES`.
+
+    Returns:
+        xgb.XGBRegressor, xgb.XGBRanker or None: O modelo treinado, ou None se os dados não existirem.
+    """
+    from src.modelos.modelo_momentum import (buscar_hiperparametros, carregar_melhores_parametros,
+                                             salvar_melhores_parametros)
+
+    print(f"1. Carregando e processando todos os dados (até {ano_teste})...")
+    df_processado = gerar_matriz_features()
+    if df_processado is None:
+        return None
+    print("Dados carregados e processados.")
+
+    df_treino, df_teste = separar_treino_teste(df_processado, ano_teste)
+    print(f"\nTamanho do conjunto de treino: {len(df_treino)} registros")
+    print(f"Tamanho do conjunto de teste: {len(df_teste)} registros")
+
+    features_finais = colunas_de_features(df_processado, codificacao)
+    X_treino = montar_x(df_treino, features_finais)
+    y_treino = df_treino['Pos_Corrida']
+
+    if params is None and not buscar:
+        params = carregar_melhores_parametros(ano_teste)
+        if params is not None:
+            print("\n4. Usando os hiperparâmetros da última busca:", params)
+    if params is None:
+        print(f"\n4. Iniciando a busca de hiperparâmetros no conjunto de treino (até {ano_teste - 1})...")
+        resultado = buscar_hiperparametros(df_treino, features_finais, n_candidatos=n_iter)
+        salvar_melhores_parametros(resultado, ano_teste)
+        params = resultado['params']
+        print("\nMelhores hiperparâmetros encontrados:", params)
+
+    print(f"\n5. Treinando modelo final ({objetivo}, construtores: {codificacao}) com os melhores parâmetros no conjunto de treino...")
+    modelo_final = treinar_modelo(X_treino, y_treino, params, objetivo=objetivo, grupos=df_treino['race_id'])
+    caminho_modelo = salvar_modelo(modelo_final, features_finais, params, diretorio,
+                                   impressao=impressao_digital(list(caminhos_limpos())), ano_teste=ano_teste,
+                                   vocabulario_equipes=construtores.vocabulario(df_processado, features_finais))
+    print(f"Modelo final treinado e salvo em: {caminho_modelo}")
+    return modelo_final
+
+def avaliar(ano_teste=ANO_TESTE, diretorio=DIRETORIO_REGISTRO):
+    """
+    Avalia o modelo salvo na temporada `ano_teste`.
+
+    Args:
+        ano_teste (int): Temporada avaliada.
+        diretorio (str): Raiz do registro de modelos.
+
+    Returns:
+        dict or None: Métricas de `avaliar_previsoes`, ou None se faltar modelo ou dados.
+    """
+    from src.armazenamento.consultas import abrir_banco
+
+    modelo, metadados = carregar_modelo(diretorio)
+    if modelo is None:
+        return None
+    df_processado = gerar_matriz_features()
+    if df_processado is None:
+        return None
+    _, df_teste = separar_treino_teste(df_processado, ano_teste)
+
+    print(f"\n6. Fazendo previsões para a temporada de {ano_teste}...")
+    previsoes = prever(modelo, df_teste, metadados['features'], metadados.get('vocabulario_equipes'))
+    banco = abrir_banco()
+    try:
+        return avaliar_previsoes(df_teste, previsoes, ano_teste, banco)
+    finally:
+        if banco is not None:
+            banco.fechar()
+
+def main(ano_teste=ANO_TESTE, n_iter=50):
+    """
+    Fluxo completo: treino até `ano_teste - 1` (com a busca de hiperparâmetros, se ainda não houver uma gravada), seguido da avaliação em `ano_teste`.
+    """
+    if treinar(ano_teste, n_iter) is not None:
+        avaliar(ano_teste)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""
+Registro dos modelos treinados (dados/modelos/registro).
+
+Cada treino vira uma versão: uma pasta com o booster no formato binário nativo
+do XGBoost (UBJSON, `modelo.ubj`) e um `metadados.json` com tudo o que a
+previsão precisa para montar a entrada sem refazer o pipeline de treino: as
+colunas de features na ordem do treino, os nomes aceitos pelo XGBoost, a
+codificação dos construtores e o seu vocabulário (as categorias de 'Equipe'
+ou os nomes dos dummies, ver `construtores`), os hiperparâmetros e a impressão
+digital dos dados. O arquivo `ATUAL` aponta a versão usada por padrão.
+
+A previsão usa só `xgb.Booster` e NumPy: não passa pela API do scikit-learn
+do XGBoost nem pelo código da busca de hiperparâmetros. Modelos de ranking
+(objetivos `rank:*`) dão um escore por piloto, maior para quem chega antes;
+`prever` o converte na posição dentro da corrida, de modo que o resto do
+pipeline trata os dois tipos de modelo do mesmo jeito.
+"""
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from src import instrumentacao
+from src.modelos import construtores
+
+DIRETORIO_REGISTRO = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'modelos', 'registro'))
+ARQUIVO_MODELO = 'modelo.ubj'
+ARQUIVO_METADADOS = 'metadados.json'
+ARQUIVO_ATUAL = 'ATUAL'
+PREFIXO_CONSTRUTOR = construtores.PREFIXO_CONSTRUTOR
+CHAVES_CORRIDA = ('Ano', 'GP')
+
+
+def nomes_sanitizados(features):
+    """Nomes das colunas como o XGBoost os recebe: '[', ']' e '<' viram '_' (o mesmo que `montar_x`)."""
+    return [nome.replace('[', '_').replace(']', '_').replace('<', '_') for nome in features]
+
+
+def registrar(booster, features, params, impressao=None, diretorio=DIRETORIO_REGISTRO, **extras):
+    """
+    Grava uma versão nova no registro e a torna a atual.
+
+    Os metadados guardam também o objetivo do booster ('objetivo'), para que
+    versões de regressão e de ranking sejam distinguíveis sem abrir o modelo.
+
+    Args:
+        booster (xgb.Booster): Modelo treinado (de um XGBRegressor, use `get_booster()`).
+        features (list[str]): Colunas de features, na ordem usada no treino.
+        params (dict): Hiperparâmetros do modelo.
+        impressao (str, optional): Impressão digital dos dados e do código de features (`impressao_digital`).
+        diretorio (str): Raiz do registro.
+        **extras: Outros campos a guardar nos metadados (por exemplo `ano_teste` e,
+            na codificação categórica, `vocabulario_equipes`).
+
+    Returns:
+        str: Pasta da versão gravada.
+    """
+    import xgboost as xgb
+
+    versao = time.strftime('%Y%m%d-%H%M%S') + (f'-{impressao[:8]}' if impressao else '')
+    pasta = os.path.join(diretorio, versao)
+    temporaria = pasta + '.tmp'
+    shutil.rmtree(temporaria, ignore_errors=True)
+    os.makedirs(temporaria)
+
+    booster.save_model(os.path.join(temporaria, ARQUIVO_MODELO))
+    metadados = {
+        'versao': versao,
+        'features': list(features),
+        'features_sanitizadas': nomes_sanitizados(features),
+        'codificacao': construtores.codificacao(features),
+        'vocabulario_construtores': [f[len(PREFIXO_CONSTRUTOR):] for f in features if f.startswith(PREFIXO_CONSTRUTOR)],
+        'params': params,
+        'objetivo': objetivo(booster),
+        'impressao': impressao,
+        'xgboost': xgb.__version__,
+        **extras,
+    }
+    with open(os.path.join(temporaria, ARQUIVO_METADADOS), 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=1)
+
+    shutil.rmtree(pasta, ignore_errors=True)
+    os.replace(temporaria, pasta)
+    atual = os.path.join(diretorio, ARQUIVO_ATUAL)
+    with open(atual + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(versao)
+    os.replace(atual + '.tmp', atual)
+    return pasta
+
+
+def versoes(diretorio=DIRETORIO_REGISTRO):
+    """
+    Lista as versões gravadas, da mais antiga para a mais recente.
+
+    Args:
+        diretorio (str): Raiz do registro.
+
+    Returns:
+        list[str]: Nomes das versões.
+    """
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(nome for nome in os.listdir(diretorio)
+                  if os.path.isfile(os.path.join(diretorio, nome, ARQUIVO_METADADOS)))
+
+
+def versao_atual(diretorio=DIRETORIO_REGISTRO):
+    """Nome da versão apontada por `ATUAL`, ou None se o registro estiver vazio."""
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_ATUAL), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def carregar(versao=None, diretorio=DIRETORIO_REGISTRO):
+    """
+    Abre uma versão do registro.
+
+    Args:
+        versao (str, optional): Versão a abrir; por padrão, a atual.
+        diretorio (str): Raiz do registro.
+
+    Returns:
+        tuple: (xgb.Booster, metadados), ou (None, None) se a versão não existir.
+    """
+    import xgboost as xgb
+
+    versao = versao or versao_atual(diretorio)
+    pasta = os.path.join(diretorio, versao) if versao else None
+    if pasta is None or not os.path.isfile(os.path.join(pasta, ARQUIVO_MODELO)):
+        return None, None
+    with open(os.path.join(pasta, ARQUIVO_METADADOS), encoding='utf-8') as f:
+        metadados = json.load(f)
+    booster = xgb.Booster(model_file=os.path.join(pasta, ARQUIVO_MODELO))
+    return booster, metadados
+
+
+def objetivo(booster):
+    """Objetivo com que o booster foi treinado (por exemplo 'reg:squarederror' ou 'rank:ndcg')."""
+    return json.loads(booster.save_config())['learner']['objective']['name']
+
+
+def e_ranking(nome_objetivo):
+    """Indica se o objetivo é de ranking, cujo modelo devolve escores em vez de posições."""
+    return nome_objetivo.startswith('rank:')
+
+
+def posicoes_dos_escores(escores, grupos):
+    """
+    Converte escores de ranking (maior = melhor) na posição de cada linha dentro do seu grupo.
+
+    Args:
+        escores (np.ndarray): Escore de cada linha.
+        grupos (np.ndarray): Código inteiro do grupo (a corrida) de cada linha.
+
+    Returns:
+        np.ndarray: float32 com as posições 1, 2, ... de cada linha no seu grupo.
+    """
+    grupos = np.asarray(grupos)
+    ordem = np.lexsort((-np.asarray(escores), grupos))
+    ordenados = grupos[ordem]
+    indices = np.arange(len(ordem))
+    novo_grupo = np.r_[True, ordenados[1:] != ordenados[:-1]] if len(ordem) else np.zeros(0, dtype=bool)
+    inicio_do_grupo = np.maximum.accumulate(np.where(novo_grupo, indices, 0))
+    posicoes = np.empty(len(ordem), dtype=np.float32)
+    posicoes[ordem] = indices - inicio_do_grupo + 1
+    return posicoes
+
+
+def matriz_de_entrada(df, features, vocabulario_equipes=None):
+    """
+    Monta a entrada do modelo a partir de linhas da matriz de features.
+
+    As colunas de construtor são codificadas com o vocabulário do treino: a
+    'Equipe' vira o código da categoria (ausente se a equipe não existia no
+    treino) e os dummies saem da coluna 'Construtor', com 0 para os nomes fora dele.
+
+    Args:
+        df (pd.DataFrame): Linhas da matriz de features.
+        features (list[str]): Colunas do treino, na ordem (`metadados['features']`).
+        vocabulario_equipes (list[str], optional): `metadados['vocabulario_equipes']`; sem ele,
+            valem as categorias de 'Equipe' em `df`, o que só serve para a matriz do próprio treino.
+
+    Returns:
+        np.ndarray: Matriz float32 (linhas x features).
+    """
+    posicoes = [j for j, nome in enumerate(features) if not construtores.e_coluna_de_construtor(nome)]
+    X = np.zeros((len(df), len(features)), dtype=np.float32)
+    X[:, posicoes] = df.reindex(columns=[features[j] for j in posicoes], fill_value=0).to_numpy(dtype=np.float32, na_value=np.nan)
+    construtores.Codificador(features, vocabulario_equipes).preencher(X, df)
+    return X
+
+
+@instrumentacao.etapa('previsao')
+def prever(booster, df, features, chaves=CHAVES_CORRIDA, vocabulario_equipes=None):
+    """
+    Prevê a posição final de cada linha de `df` com o booster, sem montar um DMatrix.
+
+    Args:
+        booster (xgb.Booster): Modelo aberto com `carregar`.
+        df (pd.DataFrame): Linhas da matriz de features.
+        features (list[str]): Colunas do treino, na ordem.
+        chaves (tuple[str]): Colunas que identificam a corrida; só usadas por modelos de ranking.
+        vocabulario_equipes (list[str], optional): Vocabulário de equipes do treino (`matriz_de_entrada`).
+
+    Returns:
+        np.ndarray: Posição prevista de cada linha: contínua nos modelos de regressão e
+            1, 2, ... dentro de cada corrida nos de ranking.
+    """
+    instrumentacao.linhas(entrada=len(df), saida=len(df))
+    previsto = booster.inplace_predict(matriz_de_entrada(df, features, vocabulario_equipes), validate_features=False)
+    if e_ranking(objetivo(booster)):
+        return posicoes_dos_escores(previsto, df.groupby(list(chaves), sort=False).ngroup().to_numpy())
+    return previsto
@@ -0,0 +1,290 @@
+"""
+Serviço de previsão de longa duração para o fim de semana de corrida.
+
+O `ServicoPrevisao` abre uma vez o modelo do registro e o momentum mais
+recente de cada piloto (a partir do banco de consultas) e, a cada pedido,
+recebe a classificação de um GP e devolve a ordem de chegada prevista. Os
+pedidos que chegam juntos são agrupados num lote: as features do lote são
+montadas numa única operação vetorizada e o XGBoost é chamado uma vez só, o
+que dilui o custo fixo de cada chamada quando muitos cenários (grids
+alternativos, por exemplo) são pedidos ao mesmo tempo.
+
+O serviço pode ser usado dentro do processo (`prever`, `prever_lote`) ou por
+HTTP (`servir`, subcomando `serve` da linha de comando).
+"""
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from src.modelos import construtores, registro
+from src.modelos.features import CONFIG_PADRAO, calcular_features_base, ordem_das_corridas
+from src.modelos.momentum import ALVOS_MOMENTUM, EstadoMomentum, calcular_momentum
+
+MAX_LOTE = 64
+ESPERA_MAX_MS = 0.0
+PORTA_PADRAO = 8765
+
+
+class ServicoPrevisao:
+    """
+    Mantém em memória o modelo e o momentum dos pilotos e atende pedidos de previsão em lotes.
+
+    Cada pedido é uma classificação de um GP, com uma linha por piloto e as
+    colunas 'Piloto', 'Construtor', 'Pos' e 'Q1'/'Q2'/'Q3' (texto 'm:ss.fff' ou
+    segundos); 'Grid' é opcional e, se faltar, vale a posição na classificação.
+    Pilotos sem histórico recebem a mediana de cada feature de momentum, como
+    na matriz de treino.
+
+    Args:
+        booster (xgb.Booster): Modelo aberto do registro.
+        metadados (dict): Metadados da versão (colunas de features e vocabulário de construtores).
+        momentum (pd.DataFrame): Features de momentum por piloto (índice 'Piloto').
+        medianas (pd.Series): Mediana de cada feature de momentum, para pilotos sem histórico.
+        config (dict, optional): Parâmetros das features; ausentes usam CONFIG_PADRAO.
+        max_lote (int): Maior número de pedidos previstos numa única chamada ao modelo.
+        espera_max_ms (float): Quanto o primeiro pedido de um lote espera por outros; com 0, o lote junta
+            só os pedidos que já estavam na fila (chegados enquanto o lote anterior era previsto).
+    """
+
+    def __init__(self, booster, metadados, momentum, medianas, config=None, max_lote=MAX_LOTE, espera_max_ms=ESPERA_MAX_MS):
+        self.booster = booster
+        self.metadados = metadados
+        self._ranking = registro.e_ranking(registro.objetivo(booster))
+        self.features = metadados['features']
+        self.momentum = momentum
+        self.medianas = medianas
+        self.config = {**CONFIG_PADRAO, **(config or {})}
+        self.max_lote = max_lote
+        self.espera_max_ms = espera_max_ms
+        self._fila = queue.Queue()
+        self._thread = None
+
+        # Tudo o que não depende do pedido é resolvido aqui, em posições de
+        # coluna e arrays: o momentum vira uma matriz com a linha das medianas
+        # no fim (índice -1, o que `get_indexer` devolve para pilotos sem histórico).
+        posicao = {nome: j for j, nome in enumerate(self.features)}
+        self._base = [(posicao[nome], nome) for nome in self.features
+                      if nome not in momentum.columns and not construtores.e_coluna_de_construtor(nome)]
+        colunas_momentum = [nome for nome in momentum.columns if nome in posicao]
+        self._posicoes_momentum = np.array([posicao[nome] for nome in colunas_momentum], dtype=np.intp)
+        self._momentum = np.vstack([momentum[colunas_momentum].fillna(medianas).to_numpy(dtype=np.float32),
+                                    medianas[colunas_momentum].to_numpy(dtype=np.float32)])
+        self._pilotos = pd.Index(momentum.index)
+        self._construtores = construtores.Codificador(self.features, metadados.get('vocabulario_equipes'))
+
+    @classmethod
+    def carregar(cls, versao=None, diretorio=registro.DIRETORIO_REGISTRO, config=None, **kwargs):
+        """
+        Abre o modelo do registro e monta o momentum atual de todos os pilotos do histórico.
+
+        Args:
+            versao (str, optional): Versão do registro; por padrão, a atual.
+            diretorio (str): Raiz do registro.
+            config (dict, optional): Parâmetros das features.
+            **kwargs: Repassados ao construtor (`max_lote`, `espera_max_ms`).
+
+        Returns:
+            ServicoPrevisao or None: O serviço, ou None se faltar modelo ou dados.
+        """
+        from src.armazenamento.consultas import abrir_banco
+        from src.modelos.features import carregar_e_unir_dados
+
+        booster, metadados = registro.carregar(versao, diretorio)
+        if booster is None:
+            print(f"ERRO: Nenhum modelo em '{diretorio}'. Rode o treino primeiro.")
+            return None
+        banco = abrir_banco()
+        df_completo = carregar_e_unir_dados()
+        if banco is None or df_completo is None:
+            return None
+
+        config = {**CONFIG_PADRAO, **(config or {})}
+        with banco:
+            pilotos = banco.consultar('SELECT DISTINCT Piloto FROM resultados ORDER BY Piloto')['Piloto']
+            estado = EstadoMomentum.do_banco(banco, pilotos, janelas=config['janelas_momentum'], span_ewm=config['span_ewm'])
+        momentum = estado.features(pd.DataFrame({'Piloto': pilotos})).set_axis(pilotos)
+
+        # Mesmas medianas que `preparar_dados_final` usa para preencher o momentum:
+        # calculadas sobre todo o histórico, antes de descartar as linhas sem resultado.
+        historico = df_completo.copy()
+        for coluna in ALVOS_MOMENTUM.values():
+            historico[coluna] = pd.to_numeric(historico[coluna], errors='coerce')
+        historico['race_id'] = ordem_das_corridas(historico)
+        medianas = calcular_momentum(historico, janelas=config['janelas_momentum'], span_ewm=config['span_ewm']).median()
+        return cls(booster, metadados, momentum, medianas, config, **kwargs)
+
+    def montar_features(self, classificacao):
+        """
+        Monta as linhas de features de uma ou mais classificações.
+
+        Args:
+            classificacao (pd.DataFrame): Uma linha por piloto (ver a descrição da classe).
+
+        Returns:
+            np.ndarray: Matriz float32 na ordem de colunas do modelo.
+        """
+        df = classificacao.rename(columns={'Pos': 'Pos_Quali', 'Grid': 'Grid_Final'})
+        df['Pos_Quali'] = pd.to_numeric(df['Pos_Quali'], errors='coerce')
+        df['Grid_Final'] = pd.to_numeric(df['Grid_Final'], errors='coerce') if 'Grid_Final' in df else df['Pos_Quali']
+        for coluna in self.config['colunas_tempo']:
+            if coluna not in df:
+                df[coluna] = np.nan
+        calcular_features_base(df, self.config)
+
+        X = np.zeros((len(df), len(self.features)), dtype=np.float32)
+        for j, nome in self._base:
+            X[:, j] = df[nome].to_numpy(dtype=np.float32)
+        X[:, self._posicoes_momentum] = self._momentum[self._pilotos.get_indexer(df['Piloto'])]
+        self._construtores.preencher(X, df)
+        return X
+
+    def prever_lote(self, classificacoes):
+        """
+        Prevê várias classificações com uma única chamada ao modelo.
+
+        Args:
+            classificacoes (list[pd.DataFrame]): Classificações, uma por pedido.
+
+        Returns:
+            list[pd.DataFrame]: Para cada pedido, 'Piloto', 'Posicao_Prevista' e 'Ordem',
+                ordenados pela posição prevista.
+        """
+        tamanhos = [len(c) for c in classificacoes]
+        previsto = self.booster.inplace_predict(self.montar_features(pd.concat(classificacoes, ignore_index=True)),
+                                                validate_features=False)
+        if self._ranking:
+            previsto = registro.posicoes_dos_escores(previsto, np.repeat(np.arange(len(tamanhos)), tamanhos))
+        respostas = []
+        for classificacao, parte in zip(classificacoes, np.split(previsto, np.cumsum(tamanhos)[:-1])):
+            resposta = pd.DataFrame({'Piloto': classificacao['Piloto'].to_numpy(), 'Posicao_Prevista': parte})
+            resposta = resposta.sort_values('Posicao_Prevista', kind='stable', ignore_index=True)
+            resposta['Ordem'] = np.arange(1, len(resposta) + 1)
+            respostas.append(resposta)
+        return respostas
+
+    def prever(self, classificacao, timeout=None):
+        """
+        Prevê uma classificação, agrupando-a com outros pedidos simultâneos se o serviço estiver iniciado.
+
+        Args:
+            classificacao (pd.DataFrame): Classificação de um GP.
+            timeout (float, optional): Segundos de espera pela resposta.
+
+        Returns:
+            pd.DataFrame: 'Piloto', 'Posicao_Prevista' e 'Ordem', ordenados pela posição prevista.
+        """
+        if self._thread is None:
+            return self.prever_lote([classificacao])[0]
+        futuro = Future()
+        self._fila.put((classificacao, futuro))
+        return futuro.result(timeout)
+
+    def iniciar(self):
+        """Inicia a thread que junta os pedidos de `prever` em lotes."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._atender, name='servico-previsao', daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        """Encerra a thread de lotes depois de responder aos pedidos já recebidos."""
+        if self._thread is not None:
+            self._fila.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _atender(self):
+        while True:
+            pedido = self._fila.get()
+            if pedido is None:
+                return
+            lote = [pedido]
+            prazo = time.perf_counter() + self.espera_max_ms / 1000
+            encerrar = False
+            while len(lote) < self.max_lote:
+                try:
+                    pedido = self._fila.get(timeout=max(prazo - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                if pedido is None:
+                    encerrar = True
+                    break
+                lote.append(pedido)
+            try:
+                respostas = self.prever_lote([classificacao for classificacao, _ in lote])
+            except Exception as erro:
+                for _, futuro in lote:
+                    futuro.set_exception(erro)
+            else:
+                for (_, futuro), resposta in zip(lote, respostas):
+                    futuro.set_result(resposta)
+            if encerrar:
+                return
+
+
+def _criar_handler(servico):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 mantém a conexão aberta entre pedidos do mesmo cliente; sem o
+        # algoritmo de Nagle, cabeçalho e corpo saem sem esperar o ACK atrasado.
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path == '/saude':
+                self._responder(200, {'versao': servico.metadados.get('versao'), 'pilotos': len(servico.momentum)})
+            else:
+                self._responder(404, {'erro': 'caminho desconhecido'})
+
+        def do_POST(self):
+            if self.path != '/prever':
+                self._responder(404, {'erro': 'caminho desconhecido'})
+                return
+            try:
+                pedido = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                resposta = servico.prever(pd.DataFrame(pedido['classificacao']))
+            except (ValueError, KeyError, TypeError) as erro:
+                self._responder(400, {'erro': f'pedido inválido: {erro}'})
+                return
+            self._responder(200, {**{k: v for k, v in pedido.items() if k != 'classificacao'},
+                                  'previsao': resposta.to_dict(orient='records')})
+
+        def log_message(self, *_):
+            pass
+
+    return Handler
+
+
+def servir(servico, host='127.0.0.1', porta=PORTA_PADRAO):
+    """
+    Cria o servidor HTTP do serviço (sem iniciá-lo; use `serve_forever`).
+
+    Rotas:
+        GET  /saude   Versão do modelo e número de pilotos com momentum.
+        POST /prever  Corpo {"classificacao": [{"Piloto": ..., "Construtor": ..., "Pos": ..., "Q1": ..., ...}, ...]};
+                      outros campos (como "ano" e "gp") voltam na resposta, junto com "previsao".
+
+    Args:
+        servico (ServicoPrevisao): Serviço já iniciado com `iniciar`.
+        host (str): Endereço de escuta.
+        porta (int): Porta; 0 escolhe uma livre.
+
+    Returns:
+        ThreadingHTTPServer: O servidor.
+    """
+    servidor = ThreadingHTTPServer((host, porta), _criar_handler(servico))
+    servidor.daemon_threads = True
+    return servidor
@@ -0,0 +1,227 @@
+"""
+Simulação de Monte Carlo dos resultados de corrida a partir das previsões do regressor.
+
+O regressor só dá uma posição prevista por piloto. Para transformar isso em
+probabilidades, cada simulação soma à previsão um erro sorteado (bootstrap)
+dos resíduos fora da amostra de um backtest walk-forward, ordena os pilotos
+pelo resultado e converte a posição sorteada em pontos. Tudo é feito em
+matrizes (simulações x pilotos): uma corrida com 100 mil simulações é um único
+`argsort`, e a temporada acumula os pontos de cada corrida na mesma matriz.
+"""
+import numpy as np
+import pandas as pd
+
+from src import instrumentacao
+
+N_SIMULACOES = 100_000
+MAX_CLASSE = 20
+MIN_AMOSTRAS_CLASSE = 30
+
+
+def pontos_por_posicao(df, coluna_posicao='Pos_Corrida', coluna_pontos='Pontos_Ganhos', max_posicao=30):
+    """
+    Tabela de pontos por posição de chegada, tirada dos próprios dados.
+
+    Para cada posição vale o valor de 'Pontos_Ganhos' mais frequente; posições
+    que nunca pontuam (pontos ausentes nos dados) valem 0. Nos dados de
+    2014–2024 isso dá 25, 18, 15, 12, 10, 8, 6, 4, 2, 1.
+
+    Args:
+        df (pd.DataFrame): Resultados com posição e pontos.
+        coluna_posicao (str): Posição de chegada.
+        coluna_pontos (str): Pontos da corrida.
+        max_posicao (int): Tamanho da tabela.
+
+    Returns:
+        np.ndarray: float32 de tamanho `max_posicao`; o índice 0 é o vencedor.
+    """
+    pontos = np.zeros(max_posicao, dtype=np.float32)
+    validos = df[[coluna_posicao, coluna_pontos]].dropna()
+    validos = validos[validos[coluna_posicao].between(1, max_posicao)]
+    moda = validos.groupby(coluna_posicao)[coluna_pontos].agg(lambda s: s.value_counts().index[0])
+    pontos[moda.index.to_numpy(dtype=int) - 1] = moda.to_numpy(dtype=np.float32)
+    return pontos
+
+
+def _posicao_prevista_na_corrida(df, coluna_prevista='Posicao_Prevista', chaves=('Ano', 'GP')):
+    """Ordem (1, 2, ...) de cada piloto dentro da sua corrida pela posição prevista."""
+    return df.groupby(list(chaves), sort=False)[coluna_prevista].rank(method='first').to_numpy(dtype=int)
+
+
+class ResiduosBootstrap:
+    """
+    Erros de previsão (real - previsto) para sortear, separados pela posição prevista na corrida.
+
+    O erro de quem é previsto em 1º é bem diferente do de quem é previsto no
+    meio do pelotão, então cada piloto sorteia só entre os resíduos da sua
+    classe (a ordem prevista na corrida, limitada a `max_classe`). Classes com
+    menos de `min_amostras` resíduos usam todos os resíduos.
+
+    Args:
+        residuos (np.ndarray): Resíduos.
+        classes (np.ndarray): Classe (1 a `max_classe`) de cada resíduo.
+        max_classe (int): Maior classe.
+        min_amostras (int): Mínimo de resíduos para uma classe usar só os seus.
+    """
+
+    def __init__(self, residuos, classes, max_classe=MAX_CLASSE, min_amostras=MIN_AMOSTRAS_CLASSE):
+        classes = np.clip(np.asarray(classes), 1, max_classe)
+        ordem = np.argsort(classes, kind='stable')
+        residuos = np.asarray(residuos, dtype=np.float32)[ordem]
+        contagem = np.bincount(classes, minlength=max_classe + 1)
+        inicio = np.concatenate(([0], np.cumsum(contagem)[:-1]))
+
+        # Os resíduos de todas as classes ficam no fim do array, para as classes pequenas.
+        self.valores = np.concatenate([residuos, residuos])
+        pequenas = contagem < min_amostras
+        self.inicio = np.where(pequenas, len(residuos), inicio)
+        self.tamanho = np.where(pequenas, len(residuos), contagem)
+        self.max_classe = max_classe
+
+    @classmethod
+    def do_backtest(cls, df_previsoes, **kwargs):
+        """
+        Monta os resíduos a partir das previsões fora da amostra de `rodar_backtest(previsoes=True)`.
+
+        Args:
+            df_previsoes (pd.DataFrame): 'Ano', 'GP', 'Pos_Corrida' e 'Posicao_Prevista'.
+            **kwargs: Repassados ao construtor.
+
+        Returns:
+            ResiduosBootstrap: Os resíduos por classe.
+        """
+        residuos = df_previsoes['Pos_Corrida'].to_numpy(dtype=float) - df_previsoes['Posicao_Prevista'].to_numpy(dtype=float)
+        return cls(residuos, _posicao_prevista_na_corrida(df_previsoes), **kwargs)
+
+    def amostrar(self, classes, n_simulacoes, rng):
+        """
+        Sorteia um resíduo por piloto e simulação.
+
+        Args:
+            classes (np.ndarray): Classe de cada piloto (ordem prevista na corrida).
+            n_simulacoes (int): Número de simulações.
+            rng (np.random.Generator): Gerador de números aleatórios.
+
+        Returns:
+            np.ndarray: float32 (simulações x pilotos).
+        """
+        classes = np.clip(classes, 1, self.max_classe)
+        sorteio = rng.random((n_simulacoes, len(classes)), dtype=np.float32)
+        indices = self.inicio[classes] + (sorteio * self.tamanho[classes]).astype(np.int64)
+        # O float32 pode arredondar u * tamanho para o próprio tamanho.
+        np.minimum(indices, self.inicio[classes] + self.tamanho[classes] - 1, out=indices)
+        return self.valores[indices]
+
+
+def simular_posicoes(previsto, residuos, n_simulacoes=N_SIMULACOES, rng=None):
+    """
+    Sorteia as posições de chegada de uma corrida.
+
+    Args:
+        previsto (np.ndarray): Posição prevista (contínua) de cada piloto.
+        residuos (ResiduosBootstrap): Erros para sortear.
+        n_simulacoes (int): Número de simulações.
+        rng (np.random.Generator, optional): Gerador; por padrão, um novo sem semente.
+
+    Returns:
+        np.ndarray: int16 (simulações x pilotos) com a posição de cada piloto, a partir de 0.
+    """
+    rng = rng or np.random.default_rng()
+    previsto = np.asarray(previsto, dtype=np.float32)
+    classes = np.argsort(np.argsort(previsto, kind='stable'), kind='stable') + 1
+    resultado = previsto + residuos.amostrar(classes, n_simulacoes, rng)
+    ordem = np.argsort(resultado, axis=1)
+    posicoes = np.empty(ordem.shape, dtype=np.int16)
+    np.put_along_axis(posicoes, ordem, np.arange(len(previsto), dtype=np.int16)[None, :], axis=1)
+    return posicoes
+
+
+def resumir_posicoes(posicoes, pontos):
+    """
+    Probabilidades por piloto a partir das posições sorteadas.
+
+    Args:
+        posicoes (np.ndarray): Saída de `simular_posicoes`.
+        pontos (np.ndarray): Tabela de `pontos_por_posicao`.
+
+    Returns:
+        dict[str, np.ndarray]: 'prob_vitoria', 'prob_podio', 'prob_top10', 'posicao_media' e 'pontos_esperados'.
+    """
+    tabela = np.zeros(max(posicoes.shape[1], len(pontos)), dtype=np.float32)
+    tabela[:len(pontos)] = pontos
+    return {
+        'prob_vitoria': (posicoes == 0).mean(axis=0),
+        'prob_podio': (posicoes < 3).mean(axis=0),
+        'prob_top10': (posicoes < 10).mean(axis=0),
+        'posicao_media': posicoes.mean(axis=0) + 1,
+        'pontos_esperados': tabela[posicoes].mean(axis=0),
+    }
+
+
+def simular_gp(df_gp, residuos, pontos, n_simulacoes=N_SIMULACOES, semente=None):
+    """
+    Probabilidades de vitória, pódio e top 10 e pontos esperados dos pilotos de um GP.
+
+    Args:
+        df_gp (pd.DataFrame): Uma linha por piloto, com 'Piloto' e 'Posicao_Prevista'.
+        residuos (ResiduosBootstrap): Erros para sortear.
+        pontos (np.ndarray): Tabela de `pontos_por_posicao`.
+        n_simulacoes (int): Número de simulações.
+        semente (int, optional): Semente do sorteio.
+
+    Returns:
+        pd.DataFrame: Uma linha por piloto, ordenada pela probabilidade de vitória.
+    """
+    posicoes = simular_posicoes(df_gp['Posicao_Prevista'].to_numpy(), residuos, n_simulacoes, np.random.default_rng(semente))
+    resultado = pd.DataFrame({'Piloto': df_gp['Piloto'].to_numpy(), 'Posicao_Prevista': df_gp['Posicao_Prevista'].to_numpy(),
+                              **resumir_posicoes(posicoes, pontos)})
+    return resultado.sort_values(['prob_vitoria', 'posicao_media'], ascending=[False, True], ignore_index=True)
+
+
+@instrumentacao.etapa('simulacao')
+def simular_temporada(df_previsoes, residuos, pontos, n_simulacoes=N_SIMULACOES, semente=None, pontos_iniciais=None):
+    """
+    Simula todas as corridas de `df_previsoes` juntas e projeta os pontos do campeonato.
+
+    Cada simulação sorteia todas as corridas e soma os pontos de cada piloto
+    numa matriz (simulações x pilotos da temporada), da qual saem a
+    distribuição dos pontos finais e a probabilidade de título.
+
+    Args:
+        df_previsoes (pd.DataFrame): 'Ano', 'GP', 'Piloto' e 'Posicao_Prevista' das corridas a simular.
+        residuos (ResiduosBootstrap): Erros para sortear.
+        pontos (np.ndarray): Tabela de `pontos_por_posicao`.
+        n_simulacoes (int): Número de simulações.
+        semente (int, optional): Semente do sorteio.
+        pontos_iniciais (pd.Series, optional): Pontos já conquistados por piloto (corridas fora da simulação).
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: (por corrida, por piloto). A primeira tem uma linha por
+            piloto e GP com as colunas de `resumir_posicoes`; a segunda, 'pontos_esperados',
+            'pontos_p5', 'pontos_p95' e 'prob_titulo', ordenada pelos pontos esperados.
+    """
+    rng = np.random.default_rng(semente)
+    pilotos = pd.Index(pd.unique(df_previsoes['Piloto']))
+    iniciais = pontos_iniciais.reindex(pilotos).fillna(0).to_numpy(dtype=np.float32) if pontos_iniciais is not None else 0
+    totais = np.zeros((n_simulacoes, len(pilotos)), dtype=np.float32) + iniciais
+    tabela = np.zeros(max(df_previsoes.groupby(['Ano', 'GP']).size().max(), len(pontos)), dtype=np.float32)
+    tabela[:len(pontos)] = pontos
+
+    por_corrida = []
+    for (ano, gp), df_gp in df_previsoes.groupby(['Ano', 'GP'], sort=False):
+        posicoes = simular_posicoes(df_gp['Posicao_Prevista'].to_numpy(), residuos, n_simulacoes, rng)
+        # Um piloto aparece uma vez por corrida, então a soma por coluna não tem índices repetidos.
+        totais[:, pilotos.get_indexer(df_gp['Piloto'])] += tabela[posicoes]
+        por_corrida.append(pd.DataFrame({'Ano': ano, 'GP': gp, 'Piloto': df_gp['Piloto'].to_numpy(),
+                                         'Posicao_Prevista': df_gp['Posicao_Prevista'].to_numpy(),
+                                         **resumir_posicoes(posicoes, pontos)}))
+
+    # Empates na liderança são divididos entre os empatados.
+    lider = totais == totais.max(axis=1, keepdims=True)
+    por_piloto = pd.DataFrame({
+        'pontos_esperados': totais.mean(axis=0),
+        'pontos_p5': np.percentile(totais, 5, axis=0),
+        'pontos_p95': np.percentile(totais, 95, axis=0),
+        'prob_titulo': (lider / lider.sum(axis=1, keepdims=True)).mean(axis=0),
+    }, index=pilotos.rename('Piloto'))
+    return pd.concat(por_corrida, ignore_index=True), por_piloto.sort_values('pontos_esperados', ascending=False)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+
+def tempo_para_segundos(tempo_str):
+    """
+    Converte um tempo em string no formato 'M:S.ms' ou 'S.ms' para um valor numérico em segundos.
+
+    Args:
+        tempo_str (str): Tempo representado como string.
+
+    Returns:
+        float: Tempo convertido para segundos, ou NaN se inválido.
+    """
+    if pd.isna(tempo_str) or not isinstance(tempo_str, str):
+        return np.nan
+    partes = tempo_str.replace(':', '.').split('.')
+    try:
+        if len(partes) == 3:
+            return (int(partes[0]) * 60) + int(partes[1]) + (int(partes[2]) / 1000)
+        elif len(partes) == 2:
+            return int(partes[0]) + (int(partes[1]) / 1000)
+    except (ValueError, IndexError):
+        return np.nan
+    return np.nan
+
+
+def tempos_para_segundos(tempos):
+    """
+    Versão de `tempo_para_segundos` para uma coluna inteira.
+
+    Cada valor distinto é convertido uma vez só pela função escalar e o
+    resultado é espalhado pelas linhas, então a saída é idêntica à de
+    `coluna.apply(tempo_para_segundos)`. O ganho depende das repetições: os
+    valores ausentes, as voltas de atraso e as retiradas se repetem muito, os
+    tempos de volta quase nada.
+
+    Args:
+        tempos (pd.Series or array-like): Tempos em texto; valores que não são str resultam em NaN.
+
+    Returns:
+        pd.Series or np.ndarray: Tempos em segundos (float). Uma Series com o
+                                 mesmo índice se a entrada for uma Series.
+    """
+    codigos, unicos = pd.factorize(np.asarray(tempos, dtype=object).ravel())
+    # O código -1 (valor ausente) cai no NaN do fim.
+    segundos = np.array([tempo_para_segundos(v) for v in unicos] + [np.nan], dtype=float)[codigos]
+    if isinstance(tempos, pd.Series):
+        return pd.Series(segundos, index=tempos.index, name=tempos.name)
+    return segundos
@@ -0,0 +1,370 @@
+"""
+Orquestrador do pipeline: roda as etapas na ordem das dependências e só refaz o que mudou.
+
+    scrape -> limpeza_quali  -> features -> tune -> train -> evaluate
+           -> limpeza_corrida ->
+
+Cada tarefa declara o código que a define, os arquivos que lê, os parâmetros
+de `config` que usa e os arquivos que grava. Antes de rodá-la, o orquestrador
+calcula o hash do conteúdo dessas entradas e o compara com o da última
+execução bem-sucedida (em dados/pipeline/estado.json): se nada mudou e as
+saídas existem, a tarefa é pulada. Como as entradas de uma tarefa são as
+saídas das anteriores, só é refeito o que fica depois de uma mudança, e uma
+tarefa refeita com saída idêntica não propaga nada. Por exemplo, alterar os
+sinônimos de `src/limpeza/colunas.py` refaz as duas limpezas; se os CSVs
+limpos saírem iguais, features, tune, train e evaluate continuam em dia.
+
+O scrape é o incremental: uma corrida nova no calendário baixa só aquela
+corrida. As tarefas prontas rodam em paralelo em processos separados (as
+duas limpezas, uma para cada tabela), e a saída de cada uma vai para
+dados/pipeline/logs/<tarefa>.log.
+"""
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+RAIZ = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+DIRETORIO_PIPELINE = os.path.join(RAIZ, 'dados', 'pipeline')
+CAMINHO_ESTADO = os.path.join(DIRETORIO_PIPELINE, 'estado.json')
+DIRETORIO_LOGS = os.path.join(DIRETORIO_PIPELINE, 'logs')
+# Impressão do conteúdo da matriz de features: o cache e o Parquet não têm bytes reprodutíveis.
+CAMINHO_MATRIZ = os.path.join(DIRETORIO_PIPELINE, 'matriz.json')
+CAMINHO_AVALIACAO = os.path.join(DIRETORIO_PIPELINE, 'avaliacao.json')
+
+CONFIG_PADRAO = {'ano_teste': 2024, 'n_iter': 50, 'objetivo': 'reg:squarederror', 'codificacao': 'categorica'}
+
+
+def _src(*partes):
+    return os.path.join(RAIZ, 'src', *partes)
+
+
+def _dados(*partes):
+    return os.path.join(RAIZ, 'dados', *partes)
+
+
+BRUTO_QUALI = _dados('brutos', 'f1_classificacao_bruto.csv')
+BRUTO_CORRIDA = _dados('brutos', 'f1_corrida_bruto.csv')
+LIMPO_QUALI = _dados('limpos', 'f1_classificacao_limpo.csv')
+LIMPO_CORRIDA = _dados('limpos', 'f1_corrida_limpo.csv')
+MELHORES_PARAMETROS = _dados('modelos', 'melhores_parametros.json')
+MODELO_ATUAL = _dados('modelos', 'registro', 'ATUAL')
+
+_CODIGO_LIMPEZA = [_src('limpeza', 'colunas.py'), _src('limpeza', 'em_blocos.py'), _src('armazenamento', 'colunar.py')]
+_CODIGO_FEATURES = [_src('modelos', nome) for nome in ('features.py', 'tempos.py', 'momentum.py', 'construtores.py', 'cache_features.py')]
+_CODIGO_FEATURES.append(_src('scrapers', 'calendario.py'))
+
+
+def _scrape(config):
+    from src.scrapers.scraper_incremental import main
+    main()
+
+
+def _limpeza_quali(config):
+    from src.limpeza.limpeza_quali import limpar_quali
+    limpar_quali()
+
+
+def _limpeza_corrida(config):
+    from src.limpeza.limpeza_corrida import limpar_corrida
+    limpar_corrida()
+
+
+def _features(config):
+    import pandas as pd
+
+    from src.armazenamento import colunar
+    from src.modelos.features import gerar_matriz_features
+
+    df = gerar_matriz_features()
+    if df is None:
+        raise RuntimeError("Dados limpos não encontrados.")
+    print(f"Armazenamento colunar salvo em: {colunar.gravar(df, 'features')}")
+    conteudo = hashlib.sha256(json.dumps(list(map(str, df.columns))).encode('utf-8'))
+    conteudo.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    _gravar_json(CAMINHO_MATRIZ, {'linhas': len(df), 'colunas': df.shape[1], 'conteudo': conteudo.hexdigest()})
+
+
+def _tune(config):
+    from src.modelos.modelo_momentum import main
+    if main(ano_teste=config['ano_teste'], n_iter=config['n_iter']) is None:
+        raise RuntimeError("Busca de hiperparâmetros sem dados.")
+
+
+def _train(config):
+    from src.modelos.previsao import treinar
+    if treinar(ano_teste=config['ano_teste'], n_iter=config['n_iter'], objetivo=config['objetivo'],
+               codificacao=config['codificacao']) is None:
+        raise RuntimeError("Treino sem dados.")
+
+
+def _evaluate(config):
+    from src.modelos.previsao import avaliar
+    metricas = avaliar(ano_teste=config['ano_teste'])
+    if metricas is None:
+        raise RuntimeError("Avaliação sem modelo ou sem dados.")
+    _gravar_json(CAMINHO_AVALIACAO, {k: v for k, v in metricas.items() if isinstance(v, (int, float, str))})
+
+
+class Tarefa:
+    """
+    Um nó do pipeline.
+
+    Args:
+        nome (str): Nome da tarefa.
+        funcao (callable): Função de nível de módulo que recebe `config` e levanta exceção se falhar.
+        dependencias (tuple[str]): Tarefas que precisam terminar antes.
+        codigo (list[str]): Arquivos ou pastas de código que definem a tarefa.
+        entradas (list[str]): Arquivos de dados lidos (em geral, saídas das dependências).
+        saidas (list[str]): Arquivos gravados; se algum faltar, a tarefa é refeita.
+        parametros (tuple[str]): Chaves de `config` que mudam o resultado.
+    """
+
+    def __init__(self, nome, funcao, dependencias=(), codigo=(), entradas=(), saidas=(), parametros=()):
+        self.nome = nome
+        self.funcao = funcao
+        self.dependencias = tuple(dependencias)
+        self.codigo = list(codigo)
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        self.parametros = tuple(parametros)
+
+    def impressoes(self, config):
+        """Hash do código, dos dados de entrada e dos parâmetros, separados para explicar o que mudou."""
+        return {
+            'codigo': hash_conteudo(self.codigo),
+            'dados': hash_conteudo(self.entradas),
+            'parametros': hashlib.sha256(json.dumps({p: config[p] for p in self.parametros}, sort_keys=True).encode('utf-8')).hexdigest(),
+        }
+
+    def saidas_existem(self):
+        return all(os.path.exists(caminho) for caminho in self.saidas)
+
+
+TAREFAS = [
+    Tarefa('scrape', _scrape, codigo=[_src('scrapers')], saidas=[BRUTO_QUALI, BRUTO_CORRIDA]),
+    Tarefa('limpeza_quali', _limpeza_quali, ['scrape'], codigo=[_src('limpeza', 'limpeza_quali.py')] + _CODIGO_LIMPEZA,
+           entradas=[BRUTO_QUALI], saidas=[LIMPO_QUALI]),
+    Tarefa('limpeza_corrida', _limpeza_corrida, ['scrape'], codigo=[_src('limpeza', 'limpeza_corrida.py')] + _CODIGO_LIMPEZA,
+           entradas=[BRUTO_CORRIDA], saidas=[LIMPO_CORRIDA]),
+    Tarefa('features', _features, ['limpeza_quali', 'limpeza_corrida'], codigo=_CODIGO_FEATURES,
+           entradas=[LIMPO_QUALI, LIMPO_CORRIDA], saidas=[CAMINHO_MATRIZ]),
+    Tarefa('tune', _tune, ['features'], codigo=[_src('modelos', 'modelo_momentum.py')],
+           entradas=[CAMINHO_MATRIZ], saidas=[MELHORES_PARAMETROS], parametros=('ano_teste', 'n_iter')),
+    Tarefa('train', _train, ['tune'], codigo=[_src('modelos', 'previsao.py'), _src('modelos', 'registro.py')],
+           entradas=[CAMINHO_MATRIZ, MELHORES_PARAMETROS], saidas=[MODELO_ATUAL], parametros=('ano_teste', 'objetivo', 'codificacao')),
+    Tarefa('evaluate', _evaluate, ['train'], codigo=[_src('modelos', 'previsao.py'), _src('modelos', 'avaliacao.py')],
+           entradas=[CAMINHO_MATRIZ, MODELO_ATUAL], saidas=[CAMINHO_AVALIACAO], parametros=('ano_teste',)),
+]
+NOMES = [tarefa.nome for tarefa in TAREFAS]
+
+
+def hash_conteudo(caminhos):
+    """
+    Hash SHA-256 do conteúdo de arquivos e pastas (nas pastas, só os .py, em ordem de caminho).
+
+    Args:
+        caminhos (list[str]): Arquivos ou pastas; os ausentes entram como ausentes.
+
+    Returns:
+        str: O hash em hexadecimal.
+    """
+    h = hashlib.sha256()
+    for caminho in caminhos:
+        h.update(os.path.relpath(caminho, RAIZ).encode('utf-8'))
+        if os.path.isdir(caminho):
+            arquivos = sorted(os.path.join(pasta, nome) for pasta, _, nomes in os.walk(caminho) for nome in nomes if nome.endswith('.py'))
+        elif os.path.exists(caminho):
+            arquivos = [caminho]
+        else:
+            h.update(b'\0ausente')
+            continue
+        for arquivo in arquivos:
+            h.update(os.path.relpath(arquivo, caminho).encode('utf-8'))
+            with open(arquivo, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    h.update(bloco)
+    return h.hexdigest()
+
+
+def _gravar_json(caminho, dados):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=1)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def carregar_estado(caminho=CAMINHO_ESTADO):
+    """Impressões e tempos da última execução bem-sucedida de cada tarefa ({} se não houver)."""
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _motivo(tarefa, impressoes, anterior, forcar):
+    """Por que a tarefa precisa rodar, ou None se ela está em dia."""
+    if tarefa.nome in forcar:
+        return 'forçada'
+    if anterior is None:
+        return 'nunca rodou'
+    mudaram = [parte for parte, valor in impressoes.items() if anterior['impressoes'].get(parte) != valor]
+    if mudaram:
+        return 'mudou: ' + ', '.join(mudaram)
+    if not tarefa.saidas_existem():
+        return 'saída ausente'
+    return None
+
+
+def selecionar(ate=None, tarefas=TAREFAS):
+    """Tarefas até `ate` (ela e tudo de que depende), na ordem do pipeline; sem `ate`, todas."""
+    if ate is None:
+        return list(tarefas)
+    por_nome = {tarefa.nome: tarefa for tarefa in tarefas}
+    if ate not in por_nome:
+        raise ValueError(f"Tarefa desconhecida: {ate!r}. Use uma de {[t.nome for t in tarefas]}.")
+    necessarias, pilha = set(), [ate]
+    while pilha:
+        nome = pilha.pop()
+        if nome not in necessarias:
+            necessarias.add(nome)
+            pilha.extend(por_nome[nome].dependencias)
+    return [tarefa for tarefa in tarefas if tarefa.nome in necessarias]
+
+
+def planejar(config=None, ate=None, forcar=(), pular=(), caminho_estado=CAMINHO_ESTADO):
+    """
+    O que `executar` faria agora, sem rodar nada.
+
+    Uma tarefa em dia cujas dependências vão rodar aparece como "depois de
+    ...": se ela roda ou não depende do conteúdo que essas dependências gravarem.
+
+    Returns:
+        list[tuple[str, str]]: (tarefa, situação) na ordem do pipeline.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    estado = carregar_estado(caminho_estado)
+    vao_rodar, plano = set(), []
+    for tarefa in selecionar(ate):
+        if tarefa.nome in pular:
+            plano.append((tarefa.nome, 'pulada'))
+            continue
+        motivo = _motivo(tarefa, tarefa.impressoes(config), estado.get(tarefa.nome), forcar)
+        antes = [d for d in tarefa.dependencias if d in vao_rodar]
+        if motivo:
+            vao_rodar.add(tarefa.nome)
+            plano.append((tarefa.nome, f'roda ({motivo})'))
+        elif antes:
+            vao_rodar.add(tarefa.nome)
+            plano.append((tarefa.nome, f"depois de {', '.join(antes)}, se a saída mudar"))
+        else:
+            plano.append((tarefa.nome, 'em dia'))
+    return plano
+
+
+def _rodar_tarefa(nome, config, caminho_log):
+    """Roda uma tarefa no processo atual (um processo do pool), com a saída no log."""
+    tarefa = next(t for t in TAREFAS if t.nome == nome)
+    os.makedirs(os.path.dirname(caminho_log), exist_ok=True)
+    inicio = time.perf_counter()
+    with open(caminho_log, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        tarefa.funcao(config)
+    return time.perf_counter() - inicio
+
+
+def _final_do_log(caminho_log, n=15):
+    try:
+        with open(caminho_log, encoding='utf-8') as f:
+            return ''.join(f.readlines()[-n:])
+    except OSError:
+        return ''
+
+
+def executar(config=None, ate=None, forcar=(), pular=(), processos=None, caminho_estado=CAMINHO_ESTADO, verbose=1):
+    """
+    Roda as tarefas desatualizadas, em paralelo quando as dependências permitem.
+
+    Uma tarefa roda quando todas as dependências terminaram (rodando ou em
+    dia) e o hash das suas entradas difere do da última execução, quando
+    alguma saída falta ou quando ela está em `forcar`. O estado é gravado
+    a cada tarefa concluída; uma tarefa que falha interrompe só o que
+    depende dela.
+
+    Args:
+        config (dict, optional): Parâmetros (ver CONFIG_PADRAO); ausentes usam o padrão.
+        ate (str, optional): Última tarefa a considerar (ela e suas dependências).
+        forcar (Iterable[str]): Tarefas refeitas mesmo em dia.
+        pular (Iterable[str]): Tarefas nunca rodadas (por exemplo 'scrape', sem rede); as saídas
+            que já estão em disco valem como estão.
+        processos (int, optional): Tarefas simultâneas; por padrão, uma por núcleo.
+        caminho_estado (str): Arquivo de estado.
+        verbose (int): 0 para silencioso; 1 mostra cada tarefa.
+
+    Returns:
+        dict[str, str]: Situação final de cada tarefa: 'em dia', 'pulada', 'rodou', 'falhou' ou 'cancelada'.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    forcar, pular = set(forcar), set(pular)
+    tarefas = selecionar(ate)
+    selecionadas = {tarefa.nome for tarefa in tarefas}
+    estado = carregar_estado(caminho_estado)
+    situacao = {}
+    pendentes = list(tarefas)
+    rodando = {}
+
+    def mostrar(nome, texto):
+        if verbose:
+            print(f"  {nome:<16}{texto}")
+
+    contexto = multiprocessing.get_context('spawn')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1, mp_context=contexto) as pool:
+        while pendentes or rodando:
+            prontas = True
+            while prontas:
+                prontas = False
+                for tarefa in list(pendentes):
+                    dependencias = [situacao.get(d) for d in tarefa.dependencias if d in selecionadas]
+                    if any(s in ('falhou', 'cancelada') for s in dependencias):
+                        situacao[tarefa.nome] = 'cancelada'
+                    elif any(s is None for s in dependencias):
+                        continue
+                    elif tarefa.nome in pular:
+                        situacao[tarefa.nome] = 'pulada'
+                    else:
+                        impressoes = tarefa.impressoes(config)
+                        motivo = _motivo(tarefa, impressoes, estado.get(tarefa.nome), forcar)
+                        if motivo is None:
+                            situacao[tarefa.nome] = 'em dia'
+                        else:
+                            caminho_log = os.path.join(DIRETORIO_LOGS, f'{tarefa.nome}.log')
+                            futuro = pool.submit(_rodar_tarefa, tarefa.nome, config, caminho_log)
+                            rodando[futuro] = (tarefa, impressoes, caminho_log)
+                            mostrar(tarefa.nome, f'rodando ({motivo})')
+                            pendentes.remove(tarefa)
+                            continue
+                    mostrar(tarefa.nome, situacao[tarefa.nome])
+                    pendentes.remove(tarefa)
+                    prontas = True
+            if not rodando:
+                continue
+
+            concluidas, _ = concurrent.futures.wait(rodando, return_when=concurrent.futures.FIRST_COMPLETED)
+            for futuro in concluidas:
+                tarefa, impressoes, caminho_log = rodando.pop(futuro)
+                try:
+                    tempo = futuro.result()
+                except Exception as e:
+                    situacao[tarefa.nome] = 'falhou'
+                    mostrar(tarefa.nome, f'FALHOU: {e!r} (log: {caminho_log})')
+                    if verbose:
+                        print(_final_do_log(caminho_log))
+                    continue
+                situacao[tarefa.nome] = 'rodou'
+                estado[tarefa.nome] = {'impressoes': impressoes, 'tempo_s': tempo, 'data': time.strftime('%Y-%m-%dT%H:%M:%S')}
+                _gravar_json(caminho_estado, estado)
+                mostrar(tarefa.nome, f'concluída em {tempo:.1f}s')
+    return situacao
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+DIRETORIO_CACHE = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'cache', 'paginas'))
+TTL_PADRAO = 7 * 24 * 3600
+TAMANHO_MAXIMO_PADRAO = 512 * 1024 * 1024
+
+
+class CachePaginas:
+    """
+    Cache persistente em disco das páginas baixadas, endereçado pelo SHA-256 da URL.
+
+    Cada entrada ocupa dois arquivos: `<hash>.html` com o corpo da resposta e
+    `<hash>.json` com a URL, o ETag, o Last-Modified e o instante da última
+    validação. Dentro do TTL a página é servida sem tocar a rede; fora dele o
+    `Coletor` revalida com um GET condicional e uma resposta 304 apenas renova
+    a entrada. Quando o total em disco passa de `tamanho_maximo`, as entradas
+    usadas há mais tempo são removidas.
+
+    Args:
+        diretorio (str): Pasta onde as entradas são gravadas.
+        ttl (float): Segundos durante os quais uma entrada é usada sem revalidação.
+                     Use 0 para revalidar sempre.
+        tamanho_maximo (int): Limite, em bytes, do conteúdo armazenado.
+        offline (bool): Se True, nenhuma requisição é feita e só o cache é consultado.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_CACHE, ttl=TTL_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO, offline=False):
+        self.diretorio = diretorio
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.offline = offline
+        self._trava = threading.Lock()
+        self._tamanho_total = None
+
+    @classmethod
+    def do_ambiente(cls):
+        """
+        Cria o cache a partir das variáveis de ambiente, úteis para CI e execuções offline.
+
+        Variáveis lidas: F1_CACHE_DIR, F1_CACHE_TTL (segundos), F1_CACHE_MAX_MB e
+        F1_OFFLINE ('1' ativa o modo offline).
+
+        Returns:
+            CachePaginas: Cache configurado.
+        """
+        return cls(
+            diretorio=os.environ.get('F1_CACHE_DIR', DIRETORIO_CACHE),
+            ttl=float(os.environ.get('F1_CACHE_TTL', TTL_PADRAO)),
+            tamanho_maximo=int(float(os.environ.get('F1_CACHE_MAX_MB', TAMANHO_MAXIMO_PADRAO / 2**20)) * 2**20),
+            offline=os.environ.get('F1_OFFLINE') == '1',
+        )
+
+    def _caminhos(self, url):
+        chave = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.diretorio, chave[:2], chave)
+        return base + '.html', base + '.json'
+
+    def ler(self, url):
+        """
+        Lê uma entrada do cache.
+
+        Args:
+            url (str): URL da página.
+
+        Returns:
+            tuple: (html, metadados), ou (None, None) se a URL não estiver em cache.
+        """
+        caminho_html, caminho_meta = self._caminhos(url)
+        try:
+            with open(caminho_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(caminho_html, encoding='utf-8') as f:
+                html = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None, None
+        os.utime(caminho_html)
+        return html, meta
+
+    def esta_fresca(self, meta):
+        return time.time() - meta.get('validado_em', 0) < self.ttl
+
+    @staticmethod
+    def cabecalhos_condicionais(meta):
+        """
+        Monta os cabeçalhos de um GET condicional a partir dos metadados da entrada.
+
+        Args:
+            meta (dict): Metadados retornados por `ler`.
+
+        Returns:
+            dict: Cabeçalhos If-None-Match e/ou If-Modified-Since.
+        """
+        cabecalhos = {}
+        if meta.get('etag'):
+            cabecalhos['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = meta['last_modified']
+        return cabecalhos
+
+    def _gravar_meta(self, caminho_meta, meta):
+        temporario = f'{caminho_meta}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temporario, caminho_meta)
+
+    def salvar(self, url, html, cabecalhos_resposta):
+        """
+        Grava (ou substitui) a página e seus validadores HTTP.
+
+        Args:
+            url (str): URL da página.
+            html (str): Corpo da resposta.
+            cabecalhos_resposta (Mapping): Cabeçalhos da resposta 200.
+        """
+        caminho_html, caminho_meta = self._caminhos(url)
+        os.makedirs(os.path.dirname(caminho_html), exist_ok=True)
+        tamanho_anterior = os.path.getsize(caminho_html) if os.path.exists(caminho_html) else 0
+
+        temporario = f'{caminho_html}.{threading.get_ident()}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(temporario, caminho_html)
+        self._gravar_meta(caminho_meta, {
+            'url': url,
+            'etag': cabecalhos_resposta.get('ETag'),
+            'last_modified': cabecalhos_resposta.get('Last-Modified'),
+            'validado_em': time.time(),
+        })
+
+        with self._trava:
+            if self._tamanho_total is not None:
+                self._tamanho_total += os.path.getsize(caminho_html) - tamanho_anterior
+        self.despejar()
+
+    def renovar(self, url, meta):
+        """
+        Marca uma entrada como validada agora (após uma resposta 304).
+
+        Args:
+            url (str): URL da página.
+            meta (dict): Metadados atuais da entrada.
+        """
+        _, caminho_meta = self._caminhos(url)
+        self._gravar_meta(caminho_meta, {**meta, 'validado_em': time.time()})
+
+    def _entradas(self):
+        for raiz, _, arquivos in os.walk(self.diretorio):
+            for nome in arquivos:
+                if nome.endswith('.html'):
+                    caminho = os.path.join(raiz, nome)
+                    estado = os.stat(caminho)
+                    yield estado.st_mtime, estado.st_size, caminho
+
+    def despejar(self):
+        """
+        Remove as entradas menos usadas recentemente até o cache caber em `tamanho_maximo`.
+
+        Returns:
+            int: Número de entradas removidas.
+        """
+        with self._trava:
+            if self._tamanho_total is None:
+                self._tamanho_total = sum(tamanho for _, tamanho, _ in self._entradas())
+            if self._tamanho_total <= self.tamanho_maximo:
+                return 0
+
+            removidas = 0
+            for _, tamanho, caminho in sorted(self._entradas()):
+                if self._tamanho_total <= self.tamanho_maximo:
+                    break
+                for arquivo in (caminho, caminho[:-len('.html')] + '.json'):
+                    try:
+                        os.remove(arquivo)
+                    except FileNotFoundError:
+                        pass
+                self._tamanho_total -= tamanho
+                removidas += 1
+            return removidas
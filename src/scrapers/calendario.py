@@ -0,0 +1,155 @@
+RACES_BY_YEAR = {
+    'Grande_Prêmio_da_Austrália': [2014, 2015, 2016, 2017, 2018, 2019, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Malásia': [2014, 2015, 2016, 2017],
+    'Grande_Prêmio_do_Barém': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_China': [2014, 2015, 2016, 2017, 2018, 2019, 2024],
+    'Grande_Prêmio_da_Espanha': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_de_Mônaco': [2014, 2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_do_Canadá': [2014, 2015, 2016, 2017, 2018, 2019, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Áustria': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Grã-Bretanha': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Alemanha': [2014, 2016, 2018, 2019],
+    'Grande_Prêmio_da_Hungria': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Bélgica': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Itália': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_de_Singapura': [2014, 2015, 2016, 2017, 2018, 2019, 2022, 2023, 2024],
+    'Grande_Prêmio_do_Japão': [2014, 2015, 2016, 2017, 2018, 2019, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Rússia': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021],
+    'Grande_Prêmio_dos_Estados_Unidos': [2014, 2015, 2016, 2017, 2018, 2019, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_do_Brasil': [2014, 2015, 2016, 2017, 2018, 2019],
+    'Grande_Prêmio_de_São_Paulo': [2021, 2022, 2023, 2024],
+    'Grande_Prêmio_do_México': [2015, 2016, 2017, 2018, 2019],
+    'Grande_Prêmio_da_Cidade_do_México': [2021, 2022, 2023, 2024],
+    'Grande_Prêmio_de_Abu_Dhabi': [2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_Europa': [2016],
+    'Grande_Prêmio_do_Azerbaijão': [2017, 2018, 2019, 2021, 2022, 2023, 2024],
+    'Grande_Prêmio_da_França': [2018, 2019, 2021, 2022],
+    'Grande_Prêmio_da_Estíria': [2020, 2021],
+    'Grande_Prêmio_do_70.º_Aniversário': [2020],
+    'Grande_Prêmio_da_Toscana': [2020],
+    'Grande_Prêmio_de_Eifel': [2020],
+    'Grande_Prêmio_de_Portugal': [2020, 2021],
+    'Grande_Prêmio_da_Emília-Romanha': [2020, 2021, 2022, 2024],
+    'Grande_Prêmio_da_Turquia': [2020, 2021],
+    'Grande_Prêmio_de_Sakhir': [2020],
+    'Grande_Prêmio_dos_Países_Baixos': [2021, 2022, 2023, 2024],
+    'Grande_Prêmio_do_Catar': [2021, 2023, 2024],
+    'Grande_Prêmio_da_Arábia_Saudita': [2021, 2022, 2023, 2024],
+    'Grande_Prêmio_de_Miami': [2022, 2023, 2024],
+    'Grande_Prêmio_de_Las_Vegas': [2023, 2024]
+}
+
+# Ordem das etapas de cada temporada (a 1ª etapa primeiro). É o que dá a ordem
+# cronológica das corridas: as features de momentum e o backtest por corrida só
+# podem usar corridas de etapas anteriores.
+CALENDARIO = {
+    2014: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_da_Malásia', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_China',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_Áustria',
+           'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Alemanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica',
+           'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_do_Japão', 'Grande_Prêmio_da_Rússia',
+           'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_do_Brasil', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2015: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_da_Malásia', 'Grande_Prêmio_da_China', 'Grande_Prêmio_do_Barém',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_Áustria',
+           'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_da_Itália',
+           'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_do_Japão', 'Grande_Prêmio_da_Rússia', 'Grande_Prêmio_dos_Estados_Unidos',
+           'Grande_Prêmio_do_México', 'Grande_Prêmio_do_Brasil', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2016: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_China', 'Grande_Prêmio_da_Rússia',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_Europa',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Alemanha',
+           'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_da_Malásia',
+           'Grande_Prêmio_do_Japão', 'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_do_México', 'Grande_Prêmio_do_Brasil',
+           'Grande_Prêmio_de_Abu_Dhabi'],
+    2017: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_da_China', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_Rússia',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_do_Azerbaijão',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica',
+           'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_da_Malásia', 'Grande_Prêmio_do_Japão',
+           'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_do_México', 'Grande_Prêmio_do_Brasil', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2018: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_China', 'Grande_Prêmio_do_Azerbaijão',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_França',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Alemanha', 'Grande_Prêmio_da_Hungria',
+           'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_da_Rússia',
+           'Grande_Prêmio_do_Japão', 'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_do_México', 'Grande_Prêmio_do_Brasil',
+           'Grande_Prêmio_de_Abu_Dhabi'],
+    2019: ['Grande_Prêmio_da_Austrália', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_China', 'Grande_Prêmio_do_Azerbaijão',
+           'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_França',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Alemanha', 'Grande_Prêmio_da_Hungria',
+           'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_da_Rússia',
+           'Grande_Prêmio_do_Japão', 'Grande_Prêmio_do_México', 'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_do_Brasil',
+           'Grande_Prêmio_de_Abu_Dhabi'],
+    2020: ['Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Estíria', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Grã-Bretanha',
+           'Grande_Prêmio_do_70.º_Aniversário', 'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_da_Itália',
+           'Grande_Prêmio_da_Toscana', 'Grande_Prêmio_da_Rússia', 'Grande_Prêmio_de_Eifel', 'Grande_Prêmio_de_Portugal',
+           'Grande_Prêmio_da_Emília-Romanha', 'Grande_Prêmio_da_Turquia', 'Grande_Prêmio_do_Barém', 'Grande_Prêmio_de_Sakhir',
+           'Grande_Prêmio_de_Abu_Dhabi'],
+    2021: ['Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_Emília-Romanha', 'Grande_Prêmio_de_Portugal', 'Grande_Prêmio_da_Espanha',
+           'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Azerbaijão', 'Grande_Prêmio_da_França', 'Grande_Prêmio_da_Estíria',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica',
+           'Grande_Prêmio_dos_Países_Baixos', 'Grande_Prêmio_da_Itália', 'Grande_Prêmio_da_Rússia', 'Grande_Prêmio_da_Turquia',
+           'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_da_Cidade_do_México', 'Grande_Prêmio_de_São_Paulo',
+           'Grande_Prêmio_do_Catar', 'Grande_Prêmio_da_Arábia_Saudita', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2022: ['Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_Arábia_Saudita', 'Grande_Prêmio_da_Austrália', 'Grande_Prêmio_da_Emília-Romanha',
+           'Grande_Prêmio_de_Miami', 'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_do_Azerbaijão',
+           'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_França',
+           'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_dos_Países_Baixos', 'Grande_Prêmio_da_Itália',
+           'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_do_Japão', 'Grande_Prêmio_dos_Estados_Unidos',
+           'Grande_Prêmio_da_Cidade_do_México', 'Grande_Prêmio_de_São_Paulo', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2023: ['Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_Arábia_Saudita', 'Grande_Prêmio_da_Austrália', 'Grande_Prêmio_do_Azerbaijão',
+           'Grande_Prêmio_de_Miami', 'Grande_Prêmio_de_Mônaco', 'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_do_Canadá',
+           'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha', 'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica',
+           'Grande_Prêmio_dos_Países_Baixos', 'Grande_Prêmio_da_Itália', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_do_Japão',
+           'Grande_Prêmio_do_Catar', 'Grande_Prêmio_dos_Estados_Unidos', 'Grande_Prêmio_da_Cidade_do_México',
+           'Grande_Prêmio_de_São_Paulo', 'Grande_Prêmio_de_Las_Vegas', 'Grande_Prêmio_de_Abu_Dhabi'],
+    2024: ['Grande_Prêmio_do_Barém', 'Grande_Prêmio_da_Arábia_Saudita', 'Grande_Prêmio_da_Austrália', 'Grande_Prêmio_do_Japão',
+           'Grande_Prêmio_da_China', 'Grande_Prêmio_de_Miami', 'Grande_Prêmio_da_Emília-Romanha', 'Grande_Prêmio_de_Mônaco',
+           'Grande_Prêmio_do_Canadá', 'Grande_Prêmio_da_Espanha', 'Grande_Prêmio_da_Áustria', 'Grande_Prêmio_da_Grã-Bretanha',
+           'Grande_Prêmio_da_Hungria', 'Grande_Prêmio_da_Bélgica', 'Grande_Prêmio_dos_Países_Baixos', 'Grande_Prêmio_da_Itália',
+           'Grande_Prêmio_do_Azerbaijão', 'Grande_Prêmio_de_Singapura', 'Grande_Prêmio_dos_Estados_Unidos',
+           'Grande_Prêmio_da_Cidade_do_México', 'Grande_Prêmio_de_São_Paulo', 'Grande_Prêmio_de_Las_Vegas', 'Grande_Prêmio_do_Catar',
+           'Grande_Prêmio_de_Abu_Dhabi'],
+}
+
+URL_BASE = 'https://pt.wikipedia.org/wiki/'
+
+
+def url_da_corrida(gp, ano, url_base=URL_BASE):
+    """
+    Monta a URL da página da Wikipédia de um GP em um determinado ano.
+
+    Args:
+        gp (str): Nome do GP no formato usado em `RACES_BY_YEAR`.
+        ano (int): Ano da corrida.
+        url_base (str): Prefixo das páginas. Pode apontar para um servidor local em testes.
+
+    Returns:
+        str: URL completa da página.
+    """
+    return f'{url_base}{gp.replace(" ", "_")}_de_{ano}'
+
+
+def listar_corridas(races_by_year=RACES_BY_YEAR):
+    """
+    Expande o calendário em uma lista de pares (GP, ano), na ordem do dicionário.
+
+    Args:
+        races_by_year (dict): Mapeamento de GP para a lista de anos disputados.
+
+    Returns:
+        list[tuple[str, int]]: Pares (GP, ano).
+    """
+    return [(gp, ano) for gp, anos_gp in races_by_year.items() for ano in anos_gp]
+
+
+def rodada(gp, ano, calendario=CALENDARIO):
+    """
+    Número da etapa de um GP na sua temporada.
+
+    Args:
+        gp (str): Nome do GP no formato usado em `RACES_BY_YEAR`.
+        ano (int): Ano da corrida.
+        calendario (dict): Mapeamento do ano para os GPs na ordem das etapas.
+
+    Returns:
+        int or None: A etapa (1 para a primeira), ou None se o GP não estiver no calendário do ano.
+    """
+    etapas = calendario.get(int(ano), [])
+    return etapas.index(gp) + 1 if gp in etapas else None
@@ -0,0 +1,176 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import instrumentacao
+
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+
+class BaldeDeFichas:
+    """
+    Limitador de taxa no formato token bucket, seguro para uso entre threads.
+
+    O balde começa cheio com `capacidade` fichas e é reabastecido continuamente
+    a `taxa` fichas por segundo. Cada requisição consome uma ficha; quando o
+    balde está vazio, `adquirir` bloqueia até a próxima ficha ficar disponível.
+
+    Args:
+        taxa (float): Fichas repostas por segundo (requisições/s em regime).
+        capacidade (int): Tamanho máximo da rajada permitida.
+    """
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self._fichas = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def adquirir(self):
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            time.sleep(espera)
+
+
+class Coletor:
+    """
+    Camada de download compartilhada pelos scrapers.
+
+    Mantém uma `requests.Session` com pool de conexões keep-alive, distribui as
+    requisições em um pool limitado de threads, aplica um token bucket por host
+    e repete falhas transitórias (erros de rede, 429 e 5xx) com backoff exponencial.
+
+    Args:
+        user_agent (str): Cabeçalho User-Agent enviado em todas as requisições.
+        max_workers (int): Número máximo de downloads simultâneos.
+        taxa_por_host (float): Requisições por segundo permitidas para cada host.
+        rajada (int): Capacidade do token bucket de cada host.
+        tentativas (int): Número total de tentativas por URL.
+        backoff (float): Espera base, em segundos, antes da segunda tentativa; dobra a cada nova falha.
+        timeout (float): Timeout de cada requisição, em segundos.
+        cache (CachePaginas or None): Cache em disco consultado antes de cada download.
+    """
+
+    def __init__(self, user_agent, max_workers=8, taxa_por_host=10.0, rajada=5,
+                 tentativas=3, backoff=0.5, timeout=15, cache=None):
+        self.max_workers = max_workers
+        self.taxa_por_host = taxa_por_host
+        self.rajada = rajada
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+
+        self.sessao = requests.Session()
+        self.sessao.headers['User-Agent'] = user_agent
+        adaptador = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.sessao.mount('http://', adaptador)
+        self.sessao.mount('https://', adaptador)
+
+        self._baldes = {}
+        self._trava_baldes = threading.Lock()
+
+    def _balde(self, url):
+        host = urlsplit(url).netloc
+        with self._trava_baldes:
+            if host not in self._baldes:
+                self._baldes[host] = BaldeDeFichas(self.taxa_por_host, self.rajada)
+            return self._baldes[host]
+
+    def _espera_retry(self, tentativa, response=None):
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** tentativa)
+
+    def _baixar(self, url, cabecalhos=None):
+        balde = self._balde(url)
+        for tentativa in range(self.tentativas):
+            balde.adquirir()
+            try:
+                response = self.sessao.get(url, headers=cabecalhos, timeout=self.timeout)
+            except requests.RequestException as e:
+                if tentativa == self.tentativas - 1:
+                    print(f"--> ERRO: Falha ao baixar {url}. Detalhes: {e}")
+                    return None
+                time.sleep(self._espera_retry(tentativa))
+                continue
+
+            if response.status_code not in STATUS_REPETIVEIS or tentativa == self.tentativas - 1:
+                return response
+            time.sleep(self._espera_retry(tentativa, response))
+        return None
+
+    def buscar(self, url):
+        """
+        Baixa uma página respeitando o limite de taxa do host.
+
+        Com cache configurado, uma entrada dentro do TTL é devolvida sem acesso à
+        rede; uma entrada vencida é revalidada com GET condicional, e uma resposta
+        304 reaproveita o conteúdo salvo. No modo offline só o cache é consultado.
+
+        Args:
+            url (str): Endereço da página.
+
+        Returns:
+            str or None: O HTML da página se a resposta for 200, caso contrário None
+                         (página inexistente ou falha persistente após todas as tentativas).
+        """
+        html_cache, meta = (None, None) if self.cache is None else self.cache.ler(url)
+        if self.cache is not None and (self.cache.offline or (html_cache is not None and self.cache.esta_fresca(meta))):
+            instrumentacao.contar('cache_acertos' if html_cache is not None else 'cache_falhas')
+            return html_cache
+
+        cabecalhos = self.cache.cabecalhos_condicionais(meta) if html_cache is not None else None
+        response = self._baixar(url, cabecalhos)
+        if response is None or response.status_code in STATUS_REPETIVEIS:
+            return html_cache
+
+        if response.status_code == 304 and html_cache is not None:
+            self.cache.renovar(url, meta)
+            instrumentacao.contar('cache_acertos')
+            return html_cache
+        if response.status_code != 200:
+            return None
+        if self.cache is not None:
+            instrumentacao.contar('cache_falhas')
+            self.cache.salvar(url, response.text, response.headers)
+        return response.text
+
+    def buscar_varios(self, urls):
+        """
+        Baixa várias páginas em paralelo.
+
+        Args:
+            urls (iterable[str]): Endereços das páginas.
+
+        Returns:
+            list[str or None]: O HTML de cada página, na mesma ordem de `urls`.
+        """
+        urls = list(urls)
+        with instrumentacao.etapa('download') as e, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            paginas = list(executor.map(self.buscar, urls))
+            e.linhas(entrada=len(urls), saida=sum(pagina is not None for pagina in paginas))
+        return paginas
+
+    def fechar(self):
+        self.sessao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
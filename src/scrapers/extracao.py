@@ -0,0 +1,237 @@
+import pandas as pd
+from lxml import etree, html as lxml_html
+from pandas.io.parsers import TextParser
+import os
+import re
+
+from src import instrumentacao
+
+TIPOS_TABELA = ('classificacao', 'corrida')
+
+ARQUIVOS_BRUTOS = {
+    'classificacao': 'f1_classificacao_bruto.csv',
+    'corrida': 'f1_corrida_bruto.csv',
+}
+
+DIRETORIO_BRUTOS = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'dados', 'brutos'))
+
+_RE_ESPACOS = re.compile(r"[\r\n]+|\s{2,}")
+_PARSER_HTML = lxml_html.HTMLParser(encoding='utf-8')
+
+
+def eh_tabela_classificacao(cabecalhos):
+    """
+    Indica se os cabeçalhos pertencem à tabela de classificação (Q1/Q2 e coluna de piloto).
+
+    Args:
+        cabecalhos (list[str]): Textos das células <th> da tabela.
+
+    Returns:
+        bool: True se a tabela for a de classificação.
+    """
+    return 'Q1' in cabecalhos and 'Q2' in cabecalhos and ('Piloto' in cabecalhos or 'Driver' in cabecalhos)
+
+
+def eh_tabela_corrida(cabecalhos):
+    """
+    Indica se os cabeçalhos pertencem à tabela de resultado da corrida (Voltas, Pontos e Tempo).
+
+    Args:
+        cabecalhos (list[str]): Textos das células <th> da tabela.
+
+    Returns:
+        bool: True se a tabela for a de resultado da corrida.
+    """
+    tem_voltas = any(h in cabecalhos for h in ['Voltas', "Voltas'", 'Laps'])
+    tem_pontos = any(h in cabecalhos for h in ['Pontos', 'Pts.', 'Points'])
+    tem_tempo = any(h.startswith('Tempo') or h.startswith('Time') for h in cabecalhos)
+    return tem_voltas and tem_pontos and tem_tempo
+
+
+CLASSIFICADORES = {
+    'classificacao': eh_tabela_classificacao,
+    'corrida': eh_tabela_corrida,
+}
+
+
+def _cabecalhos(tabela):
+    # Equivalente ao th.get_text(strip=True) do BeautifulSoup: cada trecho de texto é aparado e concatenado.
+    return [''.join(trecho.strip() for trecho in th.itertext()) for th in tabela.iter('th')]
+
+
+def _expandir_spans(linhas):
+    """
+    Converte as linhas <tr> em listas de textos, replicando células com rowspan/colspan.
+
+    Segue o mesmo algoritmo de `pd.read_html`, para que os DataFrames gerados
+    sejam idênticos aos obtidos com a serialização e o novo parse da tabela.
+
+    Args:
+        linhas (list[lxml.html.HtmlElement]): Elementos <tr> de uma seção da tabela.
+
+    Returns:
+        list[list[str]]: Textos de cada linha, já expandidos.
+    """
+    todas = []
+    pendentes = []
+    for tr in linhas:
+        textos = []
+        proximos = []
+        indice = 0
+        for celula in tr.xpath('./td|./th'):
+            while pendentes and pendentes[0][0] <= indice:
+                i_ant, texto_ant, rowspan_ant = pendentes.pop(0)
+                textos.append(texto_ant)
+                if rowspan_ant > 1:
+                    proximos.append((i_ant, texto_ant, rowspan_ant - 1))
+                indice += 1
+
+            texto = _RE_ESPACOS.sub(' ', celula.text_content().strip())
+            rowspan = int(celula.get('rowspan') or 1)
+            colspan = int(celula.get('colspan') or 1)
+            for _ in range(colspan):
+                textos.append(texto)
+                if rowspan > 1:
+                    proximos.append((indice, texto, rowspan - 1))
+                indice += 1
+
+        for i_ant, texto_ant, rowspan_ant in pendentes:
+            textos.append(texto_ant)
+            if rowspan_ant > 1:
+                proximos.append((i_ant, texto_ant, rowspan_ant - 1))
+        todas.append(textos)
+        pendentes = proximos
+
+    while pendentes:
+        proximos = []
+        textos = []
+        for i_ant, texto_ant, rowspan_ant in pendentes:
+            textos.append(texto_ant)
+            if rowspan_ant > 1:
+                proximos.append((i_ant, texto_ant, rowspan_ant - 1))
+        todas.append(textos)
+        pendentes = proximos
+    return todas
+
+
+def tabela_para_dataframe(tabela):
+    """
+    Monta o DataFrame de uma tabela já parseada, sem serializá-la de volta para HTML.
+
+    Reproduz as regras de `pd.read_html`: elementos ocultos (display:none) são
+    descartados, <br> vira espaço, as linhas iniciais só com <th> formam o
+    cabeçalho (MultiIndex quando há mais de uma) e a inferência de tipos é a do
+    `TextParser` do pandas.
+
+    Args:
+        tabela (lxml.html.HtmlElement): Elemento <table>.
+
+    Returns:
+        pd.DataFrame: A tabela convertida.
+    """
+    for elemento in tabela.xpath('.//style'):
+        elemento.drop_tree()
+    for elemento in tabela.xpath('.//*[@style]'):
+        if 'display:none' in elemento.get('style', '').replace(' ', ''):
+            elemento.drop_tree()
+    for br in tabela.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+
+    linhas_cabecalho = []
+    for thead in tabela.xpath('.//thead'):
+        linhas_cabecalho.extend(thead.xpath('./tr'))
+    linhas_corpo = tabela.xpath('.//tbody//tr') + tabela.xpath('./tr')
+    linhas_rodape = []
+    for tfoot in tabela.xpath('.//tfoot'):
+        linhas_rodape.extend(tfoot.xpath('./tr'))
+
+    if not linhas_cabecalho:
+        while linhas_corpo and all(c.tag == 'th' for c in linhas_corpo[0].xpath('./td|./th')):
+            linhas_cabecalho.append(linhas_corpo.pop(0))
+
+    cabecalho = _expandir_spans(linhas_cabecalho)
+    corpo = cabecalho + _expandir_spans(linhas_corpo) + _expandir_spans(linhas_rodape)
+
+    header = None
+    if cabecalho:
+        header = 0 if len(cabecalho) == 1 else [i for i, linha in enumerate(cabecalho) if any(linha)]
+
+    largura = max(len(linha) for linha in corpo)
+    corpo = [linha + [''] * (largura - len(linha)) for linha in corpo]
+    with TextParser(corpo, header=header, thousands=',', decimal='.') as parser:
+        return parser.read()
+
+
+@instrumentacao.etapa('extracao')
+def extrair_tabelas(html, tipos=TIPOS_TABELA):
+    """
+    Faz o parse de uma página uma única vez e extrai as tabelas pedidas.
+
+    A página é lida com o parser do lxml e as tabelas `wikitable` são
+    localizadas por XPath. Cada uma tem suas notas (<sup>) removidas e seus
+    cabeçalhos testados por todos os classificadores ainda não satisfeitos; a
+    primeira tabela aceita por cada classificador é convertida em DataFrame
+    diretamente das células já parseadas. A varredura termina assim que todos
+    os tipos pedidos forem encontrados.
+
+    Args:
+        html (str): Conteúdo HTML da página do GP.
+        tipos (iterable[str]): Tipos de tabela desejados, entre 'classificacao' e 'corrida'.
+
+    Returns:
+        dict: Mapeamento de cada tipo pedido para o DataFrame encontrado, ou None.
+    """
+    encontradas = {tipo: None for tipo in tipos}
+    documento = lxml_html.document_fromstring(html.encode('utf-8'), parser=_PARSER_HTML)
+
+    for tabela in documento.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " wikitable ")]'):
+        pendentes = [tipo for tipo, df in encontradas.items() if df is None]
+        if not pendentes:
+            break
+
+        etree.strip_elements(tabela, 'sup', with_tail=False)
+        cabecalhos = _cabecalhos(tabela)
+
+        for tipo in pendentes:
+            if CLASSIFICADORES[tipo](cabecalhos):
+                encontradas[tipo] = tabela_para_dataframe(tabela)
+                break
+
+    return encontradas
+
+
+def achatar_colunas(df):
+    """
+    Converte colunas MultiIndex (cabeçalhos de duas linhas) em nomes de texto.
+
+    Reproduz o formato que `pd.concat` já gera nos CSVs brutos, em que cada
+    coluna de cabeçalho duplo aparece como "('Tempos Qualificatórios', 'Q1')".
+
+    Args:
+        df (pd.DataFrame): Tabela lida com `pd.read_html`.
+
+    Returns:
+        pd.DataFrame: O mesmo DataFrame, com nomes de colunas simples.
+    """
+    df.columns = [str(c) if isinstance(c, tuple) else c for c in df.columns.to_flat_index()]
+    return df
+
+
+def salvar_bruto(lista_dfs, tipo):
+    """
+    Concatena as tabelas coletadas de um tipo e grava o CSV bruto correspondente.
+
+    Args:
+        lista_dfs (list[pd.DataFrame]): Tabelas já marcadas com 'Ano' e 'GP'.
+        tipo (str): 'classificacao' ou 'corrida'.
+
+    Returns:
+        str or None: Caminho do arquivo salvo, ou None se não houver dados.
+    """
+    if not lista_dfs:
+        return None
+    df_historico_bruto = pd.concat([achatar_colunas(df) for df in lista_dfs], ignore_index=True)
+    caminho_arquivo = os.path.join(DIRETORIO_BRUTOS, ARQUIVOS_BRUTOS[tipo])
+    os.makedirs(os.path.dirname(caminho_arquivo), exist_ok=True)
+    df_historico_bruto.to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
+    return caminho_arquivo
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from src.scrapers.extracao import ARQUIVOS_BRUTOS, DIRETORIO_BRUTOS, TIPOS_TABELA, achatar_colunas, extrair_tabelas
+
+CAMINHO_MANIFESTO = os.path.join(DIRETORIO_BRUTOS, 'manifesto.json')
+
+
+def chave_corrida(ano, gp):
+    return f'{int(ano)}|{gp}'
+
+
+def hash_tabela(df):
+    """
+    Calcula o hash do conteúdo de uma tabela extraída, usado para detectar páginas alteradas.
+
+    Args:
+        df (pd.DataFrame): Tabela de um único GP, antes das colunas 'Ano' e 'GP'.
+
+    Returns:
+        str: SHA-256 hexadecimal da tabela serializada em CSV.
+    """
+    return hashlib.sha256(df.to_csv(index=False).encode('utf-8')).hexdigest()
+
+
+COLUNAS_ANO = ['Ano', "('Ano', '')"]
+COLUNAS_GP = ['GP', "('GP', '')"]
+
+
+def _chaves_das_linhas(df):
+    """
+    Calcula a chave "ano|gp" de cada linha de um CSV bruto.
+
+    Tabelas com cabeçalho de duas linhas gravam 'Ano' e 'GP' nas colunas
+    "('Ano', '')" e "('GP', '')", por isso as variantes são combinadas antes.
+
+    Args:
+        df (pd.DataFrame): CSV bruto lido como texto.
+
+    Returns:
+        list[str or None]: Chave de cada linha, ou None se ano/GP estiverem ausentes.
+    """
+    anos = pd.to_numeric(df.reindex(columns=COLUNAS_ANO).bfill(axis=1).iloc[:, 0], errors='coerce')
+    gps = df.reindex(columns=COLUNAS_GP).bfill(axis=1).iloc[:, 0]
+    return [chave_corrida(ano, gp) if pd.notna(ano) and pd.notna(gp) else None for ano, gp in zip(anos, gps)]
+
+
+def _chaves_do_csv(caminho_arquivo):
+    if not os.path.exists(caminho_arquivo):
+        return []
+    colunas = COLUNAS_ANO + COLUNAS_GP
+    df = pd.read_csv(caminho_arquivo, usecols=lambda c: c in colunas, dtype=str, encoding='utf-8-sig')
+    return sorted({chave for chave in _chaves_das_linhas(df) if chave is not None})
+
+
+def carregar_manifesto(caminho=CAMINHO_MANIFESTO):
+    """
+    Lê o manifesto das chaves (Ano, GP) já presentes nos CSVs brutos.
+
+    Se o manifesto ainda não existir, ele é reconstruído a partir dos próprios
+    CSVs brutos, com hash desconhecido (None) para cada chave encontrada.
+
+    Args:
+        caminho (str): Caminho do arquivo JSON do manifesto.
+
+    Returns:
+        dict: {tipo: {"ano|gp": hash ou None}} para 'classificacao' e 'corrida'.
+    """
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    else:
+        manifesto = {
+            tipo: dict.fromkeys(_chaves_do_csv(os.path.join(DIRETORIO_BRUTOS, arquivo)))
+            for tipo, arquivo in ARQUIVOS_BRUTOS.items()
+        }
+    for tipo in TIPOS_TABELA:
+        manifesto.setdefault(tipo, {})
+    return manifesto
+
+
+def salvar_manifesto(manifesto, caminho=CAMINHO_MANIFESTO):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+
+def selecionar_pendentes(corridas, manifesto, anos_revalidar=()):
+    """
+    Escolhe quais páginas precisam ser baixadas.
+
+    Uma corrida é pendente se alguma das tabelas ainda não está no manifesto, ou
+    se o seu ano está em `anos_revalidar` (por exemplo, a temporada em andamento,
+    cujos resultados ainda podem mudar por punições).
+
+    Args:
+        corridas (list[tuple[str, int]]): Pares (GP, ano) do calendário.
+        manifesto (dict): Manifesto retornado por `carregar_manifesto`.
+        anos_revalidar (iterable[int]): Anos cujas páginas são sempre baixadas de novo.
+
+    Returns:
+        list[tuple[str, int]]: Pares (GP, ano) a baixar.
+    """
+    anos_revalidar = set(anos_revalidar)
+    return [
+        (gp, ano) for gp, ano in corridas
+        if ano in anos_revalidar or any(chave_corrida(ano, gp) not in manifesto[tipo] for tipo in TIPOS_TABELA)
+    ]
+
+
+def upsert_bruto(tipo, tabelas, chaves_substituidas):
+    """
+    Insere ou substitui no CSV bruto apenas as linhas das corridas informadas.
+
+    Quando nenhuma das corridas já existe no arquivo e as colunas novas cabem no
+    cabeçalho atual, as linhas são simplesmente anexadas ao fim do CSV, sem
+    reler o histórico. Caso contrário (corrida alterada ou colunas inéditas), o
+    arquivo é relido, as linhas antigas dessas corridas são descartadas e o CSV
+    é regravado.
+
+    Args:
+        tipo (str): 'classificacao' ou 'corrida'.
+        tabelas (list[pd.DataFrame]): Tabelas novas, já com 'Ano' e 'GP'.
+        chaves_substituidas (set[str]): Chaves "ano|gp" que já existiam no arquivo.
+
+    Returns:
+        str or None: Caminho do CSV atualizado, ou None se não havia o que gravar.
+    """
+    if not tabelas:
+        return None
+    df_novo = pd.concat([achatar_colunas(df) for df in tabelas], ignore_index=True)
+    caminho_arquivo = os.path.join(DIRETORIO_BRUTOS, ARQUIVOS_BRUTOS[tipo])
+
+    if not os.path.exists(caminho_arquivo):
+        os.makedirs(os.path.dirname(caminho_arquivo), exist_ok=True)
+        df_novo.to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
+        return caminho_arquivo
+
+    cabecalho = pd.read_csv(caminho_arquivo, nrows=0, encoding='utf-8-sig').columns.tolist()
+    if not chaves_substituidas and set(df_novo.columns) <= set(cabecalho):
+        df_novo.reindex(columns=cabecalho).to_csv(caminho_arquivo, mode='a', header=False, index=False, encoding='utf-8')
+        return caminho_arquivo
+
+    df_existente = pd.read_csv(caminho_arquivo, dtype=str, encoding='utf-8-sig')
+    if chaves_substituidas:
+        chaves = _chaves_das_linhas(df_existente)
+        df_existente = df_existente[[c not in chaves_substituidas for c in chaves]]
+    df_final = pd.concat([df_existente, df_novo], ignore_index=True)
+    df_final.to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
+    return caminho_arquivo
+
+
+def coletar_incremental(coletor, corridas, url_da_corrida, anos_revalidar=(), caminho_manifesto=CAMINHO_MANIFESTO):
+    """
+    Baixa apenas as corridas novas ou revalidadas e atualiza os CSVs brutos e o manifesto.
+
+    Tabelas cujo hash coincide com o do manifesto são ignoradas; páginas sem a
+    tabela esperada (por exemplo, um GP que ainda não aconteceu) não entram no
+    manifesto e serão tentadas de novo na próxima execução.
+
+    Args:
+        coletor (Coletor): Camada de download.
+        corridas (list[tuple[str, int]]): Pares (GP, ano) do calendário.
+        url_da_corrida (callable): Função (gp, ano) -> URL.
+        anos_revalidar (iterable[int]): Anos cujas páginas são sempre verificadas.
+        caminho_manifesto (str): Caminho do manifesto.
+
+    Returns:
+        dict: Número de corridas gravadas por tipo de tabela.
+    """
+    manifesto = carregar_manifesto(caminho_manifesto)
+    pendentes = selecionar_pendentes(corridas, manifesto, anos_revalidar)
+    print(f"{len(pendentes)} de {len(corridas)} páginas precisam ser verificadas.")
+
+    paginas = coletor.buscar_varios(url_da_corrida(gp, ano) for gp, ano in pendentes)
+
+    novas = {tipo: [] for tipo in TIPOS_TABELA}
+    substituidas = {tipo: set() for tipo in TIPOS_TABELA}
+    for (gp, ano), html in zip(pendentes, paginas):
+        if html is None:
+            continue
+        try:
+            encontradas = extrair_tabelas(html)
+        except Exception:
+            continue
+
+        chave = chave_corrida(ano, gp)
+        for tipo, df in encontradas.items():
+            if df is None:
+                continue
+            assinatura = hash_tabela(df)
+            if manifesto[tipo].get(chave) == assinatura:
+                continue
+            if chave in manifesto[tipo]:
+                substituidas[tipo].add(chave)
+            df['Ano'] = ano
+            df['GP'] = gp
+            novas[tipo].append(df)
+            manifesto[tipo][chave] = assinatura
+
+    for tipo in TIPOS_TABELA:
+        caminho_arquivo = upsert_bruto(tipo, novas[tipo], substituidas[tipo])
+        if caminho_arquivo:
+            print(f"{len(novas[tipo])} corrida(s) de {tipo} gravada(s) em: {caminho_arquivo}")
+    salvar_manifesto(manifesto, caminho_manifesto)
+    return {tipo: len(novas[tipo]) for tipo in TIPOS_TABELA}
@@ -0,0 +1,41 @@
+from src.scrapers.cache import CachePaginas
+from src.scrapers.calendario import listar_corridas, url_da_corrida
+from src.scrapers.coletor import Coletor
+from src.scrapers.extracao import TIPOS_TABELA, extrair_tabelas, salvar_bruto
+
+
+def main():
+    """
+    Baixa todas as páginas do calendário e grava os CSVs brutos de classificação e corrida.
+    """
+    tabelas_por_tipo = {tipo: [] for tipo in TIPOS_TABELA}
+
+    corridas = listar_corridas()
+    with Coletor(user_agent='Meu-Projeto-de-Dados-F1/Final/v2', cache=CachePaginas.do_ambiente()) as coletor:
+        paginas = coletor.buscar_varios(url_da_corrida(gp, ano) for gp, ano in corridas)
+
+    for (gp, ano), html in zip(corridas, paginas):
+        if html is None:
+            continue
+
+        try:
+            encontradas = extrair_tabelas(html)
+        except Exception:
+            continue
+
+        for tipo, df in encontradas.items():
+            if df is not None:
+                df['Ano'] = ano
+                df['GP'] = gp
+                tabelas_por_tipo[tipo].append(df)
+
+    for tipo, lista_dfs in tabelas_por_tipo.items():
+        caminho_arquivo = salvar_bruto(lista_dfs, tipo)
+        if caminho_arquivo:
+            print(f"Arquivo salvo em: {caminho_arquivo}")
+        else:
+            print(f"Nenhum dado de {tipo} foi coletado.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+from src.scrapers.cache import CachePaginas
+from src.scrapers.calendario import listar_corridas, url_da_corrida
+from src.scrapers.coletor import Coletor
+from src.scrapers.incremental import coletar_incremental
+
+
+def main():
+    """
+    Baixa apenas as corridas novas ou alteradas e atualiza os CSVs brutos.
+    """
+    corridas = listar_corridas()
+    temporada_atual = max(ano for _, ano in corridas)
+
+    with Coletor(user_agent='Meu-Projeto-de-Dados-F1/Final/v2', cache=CachePaginas.do_ambiente()) as coletor:
+        gravadas = coletar_incremental(coletor, corridas, url_da_corrida, anos_revalidar=[temporada_atual])
+
+    if not any(gravadas.values()):
+        print("Nenhuma corrida nova ou alterada encontrada.")
+
+
+if __name__ == '__main__':
+    main()